@@ -0,0 +1,14 @@
+from django.contrib import admin
+
+from api_yamdb.settings import EMPTY
+
+from .models import OutgoingEmail
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'to', 'subject', 'created',
+                    'sent_at', 'attempts')
+    search_fields = ('to',)
+    list_filter = ('sent_at',)
+    empty_value_display = EMPTY
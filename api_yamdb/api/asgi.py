@@ -0,0 +1,190 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlencode
+
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from django.conf import settings
+from django.db import connections
+
+
+class AsgiInstance(WsgiToAsgiInstance):
+    '''
+    Один запрос. Тело запроса, окружение и start_response — из asgiref;
+    WSGI-обработчик выполняется в пуле потоков приложения, а не в общем
+    пуле asgiref. Обычный ответ собирается в потоке и отправляется
+    из цикла событий, потоковый (выгрузки) — из потока по частям.
+    '''
+
+    def __init__(self, wsgi_application, executor):
+        super().__init__(wsgi_application)
+        self.executor = executor
+
+    async def __call__(self, scope, receive, send):
+        self.send = send
+        await super().__call__(scope, receive, send)
+
+    def build_environ(self, scope, body):
+        environ = super().build_environ(scope, body)
+        # В WSGI путь передаётся байтами, декодированными как latin-1;
+        # старые версии asgiref передают строку как есть.
+        environ['SCRIPT_NAME'] = scope.get('root_path', '').encode(
+            'utf-8'
+        ).decode('latin-1')
+        environ['PATH_INFO'] = scope['path'].encode('utf-8').decode(
+            'latin-1'
+        )
+        return environ
+
+    async def run_wsgi_app(self, body):
+        loop = asyncio.get_running_loop()
+        content = await loop.run_in_executor(
+            self.executor, self.run_in_thread, body
+        )
+        if content is not None:
+            await self.send(self.response_start)
+            await self.send({'type': 'http.response.body', 'body': content})
+
+    def run_in_thread(self, body):
+        '''Обычный ответ возвращает целиком, потоковый отправляет сам.'''
+        response = self.wsgi_application(
+            self.build_environ(self.scope, body), self.start_response
+        )
+        try:
+            if not getattr(response, 'streaming', False):
+                return b''.join(response)
+            self.sync_send(self.response_start)
+            for chunk in response:
+                self.sync_send({'type': 'http.response.body', 'body': chunk,
+                                'more_body': True})
+            self.sync_send({'type': 'http.response.body'})
+            return None
+        finally:
+            # Отправляет request_finished: Django закрывает или оставляет
+            # соединения с базой по CONN_MAX_AGE. asgiref его не вызывает.
+            response.close()
+
+
+class AsgiApplication(WsgiToAsgi):
+    '''
+    ASGI-приложение (uvicorn и другие ASGI-серверы) поверх WSGI-обработчика.
+    В Django 2.2 нет асинхронных view и ORM, поэтому запрос выполняется
+    в ограниченном пуле потоков (ASGI_THREADS), а готовый ответ
+    отправляется клиенту из цикла событий: поток занят только работой
+    Django, медленные клиенты его не держат. Кроме asgiref.wsgi здесь
+    только пул потоков и lifespan, по которому закрываются соединения
+    с базой.
+    '''
+
+    def __init__(self, wsgi_application, threads=None):
+        super().__init__(wsgi_application)
+        self.threads = threads or settings.ASGI_THREADS
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.threads,
+            thread_name_prefix='asgi',
+        )
+        self.closed = False
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        return await AsgiInstance(self.wsgi_application, self.executor)(
+            scope, receive, send
+        )
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.close()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def close(self):
+        '''Закрывает соединения с базой в каждом потоке и останавливает пул.'''
+        if self.closed:
+            return
+        self.closed = True
+        # Задачи ждут друг друга на барьере, поэтому каждая выполняется
+        # в своём потоке.
+        barrier = threading.Barrier(self.threads)
+
+        def close_connections():
+            barrier.wait()
+            connections.close_all()
+
+        for _ in range(self.threads):
+            self.executor.submit(close_connections)
+        self.executor.shutdown(wait=True)
+
+
+class AsgiResponse:
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class AsgiClient:
+    '''
+    Клиент для тестов и бенчмарка: get и post возвращают корутины,
+    которые выполняют запрос к ASGI-приложению без сервера.
+    '''
+
+    def __init__(self, application, **headers):
+        self.application = application
+        self.headers = [
+            (name.lower().encode('latin-1'), value.encode('latin-1'))
+            for name, value in headers.items()
+        ]
+
+    def get(self, path, method='GET'):
+        return self.request(method, path)
+
+    def post(self, path, data):
+        return self.request(
+            'POST', path, urlencode(data).encode(),
+            'application/x-www-form-urlencoded'
+        )
+
+    async def request(self, method, path, body=b'', content_type=None):
+        path, _, query = path.partition('?')
+        headers = [(b'host', b'testserver'), *self.headers]
+        if content_type:
+            headers.append((b'content-type', content_type.encode()))
+        if body:
+            headers.append((b'content-length', str(len(body)).encode()))
+        scope = {
+            'type': 'http', 'http_version': '1.1', 'method': method,
+            'scheme': 'http', 'path': path, 'root_path': '',
+            'query_string': quote(query, safe='=&').encode(),
+            'headers': headers, 'server': ('testserver', 80),
+            'client': ('127.0.0.1', 0),
+        }
+        messages = [{'type': 'http.request', 'body': body}]
+        started, chunks = {}, []
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                started.update(message)
+            else:
+                chunks.append(message.get('body', b''))
+
+        await self.application(scope, receive, send)
+        return AsgiResponse(
+            started['status'],
+            {name.decode(): value.decode()
+             for name, value in started['headers']},
+            b''.join(chunks),
+        )
@@ -0,0 +1,97 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from user.models import ADMIN, MODERATOR, USER, User
+
+TOKEN_CLAIMS = ('username', 'role', 'is_staff', 'is_superuser',
+                'token_version')
+TOKEN_VERSION_KEY = 'token_version:{}'
+
+
+def token_for_user(user):
+    '''Токен с правами пользователя: access-токен копирует эти claims.'''
+    token = RefreshToken.for_user(user)
+    for claim in TOKEN_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+def remember_token_version(user):
+    cache.set(TOKEN_VERSION_KEY.format(user.pk), user.token_version,
+              settings.TOKEN_VERSION_CACHE_TIMEOUT)
+
+
+def forget_token_version(user_id):
+    cache.delete(TOKEN_VERSION_KEY.format(user_id))
+
+
+def get_token_version(user_id):
+    '''
+    Текущая версия токенов пользователя: из кэша, при промахе — из базы.
+    None, если пользователь удалён или отключён.
+    '''
+    key = TOKEN_VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = User.objects.filter(pk=user_id, is_active=True).values_list(
+            'token_version', flat=True
+        ).first()
+        if version is not None:
+            cache.set(key, version, settings.TOKEN_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+class RoleTokenUser(TokenUser):
+    '''Пользователь из claims токена, без обращения к базе.'''
+
+    @cached_property
+    def role(self):
+        return self.token.get('role', USER)
+
+    @property
+    def is_admin(self):
+        return self.is_staff or self.role == ADMIN
+
+    @property
+    def is_moderator(self):
+        return self.role == MODERATOR
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    '''
+    Для безопасных методов строит пользователя из claims токена,
+    проверяя только версию токенов (обычно из кэша). Для изменяющих
+    запросов и токенов без claims загружает пользователя из базы.
+    '''
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        if (request.method in SAFE_METHODS
+                and all(claim in validated_token for claim in TOKEN_CLAIMS)):
+            return self.get_token_user(validated_token), validated_token
+        return self.get_user(validated_token), validated_token
+
+    def get_token_user(self, validated_token):
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        if get_token_version(user_id) != validated_token['token_version']:
+            raise AuthenticationFailed('Токен отозван', code='token_revoked')
+        return RoleTokenUser(validated_token)
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        version = validated_token.get('token_version')
+        if version is not None and version != user.token_version:
+            raise AuthenticationFailed('Токен отозван', code='token_revoked')
+        return user
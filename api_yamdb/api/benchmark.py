@@ -0,0 +1,306 @@
+import asyncio
+import json
+import random
+import statistics
+import time
+from collections import OrderedDict
+
+from api.asgi import AsgiClient
+from api.renderers import FastJSONRenderer
+from api.rows import CommentRows, ReviewRows, TitleRows
+from api.serializers import (CommentSerializer, ReviewSerializer,
+                             TitleSerializer)
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.rankings import refresh_rankings
+from reviews.ratings import rebuild_ratings
+from reviews.signals import titles_changed
+from user.models import User
+
+PREFIX = 'bench'
+
+DEFAULT_SIZES = OrderedDict((
+    ('categories', 5),
+    ('genres', 20),
+    ('titles', 500),
+    ('users', 200),
+    ('reviews', 20),
+    ('comments', 2),
+))
+
+
+def pks(queryset):
+    return list(queryset.order_by('pk').values_list('pk', flat=True))
+
+
+def seed(sizes, batch_size=None, seed_value=0):
+    '''
+    Заполняет базу синтетическими данными. reviews — отзывов
+    на произведение (не больше числа пользователей), comments —
+    комментариев на отзыв.
+    '''
+    rnd = random.Random(seed_value)
+    password = make_password(None)
+    User.objects.bulk_create((
+        User(username=f'{PREFIX}_user_{i}', email=f'{PREFIX}_{i}@yamdb.fake',
+             password=password)
+        for i in range(sizes['users'])
+    ), batch_size=batch_size)
+    Category.objects.bulk_create((
+        Category(name=f'{PREFIX} категория {i}', slug=f'{PREFIX}-cat-{i}')
+        for i in range(sizes['categories'])
+    ), batch_size=batch_size)
+    Genre.objects.bulk_create((
+        Genre(name=f'{PREFIX} жанр {i}', slug=f'{PREFIX}-genre-{i}')
+        for i in range(sizes['genres'])
+    ), batch_size=batch_size)
+    user_ids = pks(User.objects.filter(username__startswith=f'{PREFIX}_'))
+    category_ids = pks(Category.objects.filter(slug__startswith=PREFIX))
+    genre_ids = pks(Genre.objects.filter(slug__startswith=PREFIX))
+
+    Title.objects.bulk_create((
+        Title(name=f'{PREFIX} произведение {i}', year=1900 + i % 120,
+              description=f'Описание произведения номер {i}',
+              category_id=rnd.choice(category_ids))
+        for i in range(sizes['titles'])
+    ), batch_size=batch_size)
+    title_ids = pks(Title.objects.filter(name__startswith=PREFIX))
+    Title.genre.through.objects.bulk_create((
+        Title.genre.through(title_id=title_id, genre_id=genre_id)
+        for title_id in title_ids
+        for genre_id in rnd.sample(genre_ids, min(3, len(genre_ids)))
+    ), batch_size=batch_size)
+
+    per_title = min(sizes['reviews'], len(user_ids))
+    Review.objects.bulk_create((
+        Review(title_id=title_id, author_id=author_id,
+               score=rnd.randint(1, 10), text=f'Отзыв {author_id}')
+        for title_id in title_ids
+        for author_id in rnd.sample(user_ids, per_title)
+    ), batch_size=batch_size)
+    review_ids = pks(Review.objects.filter(title_id__in=title_ids))
+    Comment.objects.bulk_create((
+        Comment(review_id=review_id, author_id=rnd.choice(user_ids),
+                text=f'Комментарий {i}')
+        for review_id in review_ids
+        for i in range(sizes['comments'])
+    ), batch_size=batch_size)
+    rebuild_ratings()
+    refresh_rankings(batch_size=batch_size or 1000)
+    titles_changed.send(sender=seed)
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1,
+                max(0, int(round(percent / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(timings, queries, statuses, elapsed=None):
+    total = elapsed or sum(timings)
+    return OrderedDict((
+        ('requests', len(timings)),
+        ('p50_ms', round(percentile(timings, 50) * 1000, 3)),
+        ('p95_ms', round(percentile(timings, 95) * 1000, 3)),
+        ('p99_ms', round(percentile(timings, 99) * 1000, 3)),
+        ('mean_ms', round(statistics.mean(timings) * 1000, 3)),
+        ('rps', round(len(timings) / total, 1) if total else None),
+        ('queries', max(queries) if queries else None),
+        ('statuses', sorted(set(statuses))),
+    ))
+
+
+def build_scenarios():
+    '''
+    Возвращает (имя, функция запроса): функция принимает клиент
+    и номер итерации и выполняет один запрос.
+    '''
+    title = Title.objects.filter(review_count__gt=0).order_by('pk').first()
+    review = title.reviews.order_by('pk').first()
+    genre = title.genre.order_by('pk').first()
+    user = review.author
+    code = default_token_generator.make_token(user)
+    titles = '/api/v1/titles/'
+    reviews = f'{titles}{title.pk}/reviews/'
+    comments = f'{reviews}{review.pk}/comments/'
+    return OrderedDict((
+        ('title-list', lambda client, i: client.get(titles)),
+        ('title-list-genre', lambda client, i: client.get(
+            f'{titles}?genre={genre.slug}')),
+        ('title-search', lambda client, i: client.get(
+            f'{titles}?search=произведение')),
+        ('title-detail', lambda client, i: client.get(
+            f'{titles}{title.pk}/')),
+        ('title-top-genre', lambda client, i: client.get(
+            f'{titles}top/?genre={genre.slug}')),
+        ('review-list', lambda client, i: client.get(reviews)),
+        ('review-list-cursor', lambda client, i: client.get(
+            f'{reviews}?pagination=cursor')),
+        ('review-detail', lambda client, i: client.get(
+            f'{reviews}{review.pk}/')),
+        ('comment-list', lambda client, i: client.get(comments)),
+        ('signup', lambda client, i: client.post('/api/v1/auth/signup/', {
+            'username': f'{PREFIX}_signup_{time.time_ns()}_{i}',
+            'email': f'{PREFIX}_signup_{time.time_ns()}_{i}@yamdb.fake',
+        })),
+        ('token', lambda client, i: client.post('/api/v1/auth/token/', {
+            'username': user.username, 'confirmation_code': code,
+        })),
+    ))
+
+
+def run(scenarios, requests=100, warmup=5, cold=False, client=None,
+        only=None):
+    '''
+    Прогоняет сценарии через тестовый клиент Django и собирает
+    задержки, пропускную способность и число SQL-запросов.
+    cold=True очищает кэш перед каждым запросом.
+    '''
+    client = client or Client()
+    results = OrderedDict()
+    for name, request in scenarios.items():
+        if only and name not in only:
+            continue
+        for i in range(warmup):
+            request(client, i)
+        timings, queries, statuses = [], [], []
+        for i in range(requests):
+            if cold:
+                cache.clear()
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                response = request(client, warmup + i)
+                timings.append(time.perf_counter() - started)
+            queries.append(len(context.captured_queries))
+            statuses.append(response.status_code)
+        results[name] = summarize(timings, queries, statuses)
+    return results
+
+
+async def timed(request):
+    started = time.perf_counter()
+    response = await request
+    return time.perf_counter() - started, response.status_code
+
+
+async def gather(requests):
+    return await asyncio.gather(*requests)
+
+
+def run_asgi(scenarios, application, requests=100, warmup=5,
+             concurrency=10, cold=False, only=None):
+    '''
+    Прогоняет сценарии через ASGI-приложение: по concurrency запросов
+    одновременно. Пропускная способность считается по общему времени;
+    SQL-запросы выполняются в потоках приложения и здесь не считаются.
+    '''
+    client = AsgiClient(application)
+    loop = asyncio.new_event_loop()
+    results = OrderedDict()
+    try:
+        for name, request in scenarios.items():
+            if only and name not in only:
+                continue
+            loop.run_until_complete(gather(
+                request(client, i) for i in range(warmup)
+            ))
+            timings, statuses = [], []
+            started = time.perf_counter()
+            for offset in range(warmup, warmup + requests, concurrency):
+                if cold:
+                    cache.clear()
+                batch = range(offset, min(offset + concurrency,
+                                          warmup + requests))
+                for timing, status in loop.run_until_complete(gather(
+                    timed(request(client, i)) for i in batch
+                )):
+                    timings.append(timing)
+                    statuses.append(status)
+            results[name] = summarize(
+                timings, [], statuses, elapsed=time.perf_counter() - started
+            )
+    finally:
+        loop.close()
+    return results
+
+
+def median_time(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def run_serialization(page_size=100, repeat=20):
+    '''
+    Сравнивает чтение, сборку и рендеринг страницы списка через
+    сериализатор с JSONRenderer и через api.rows с FastJSONRenderer.
+    identical — совпали ли ответы байт в байт.
+    '''
+    cases = (
+        ('titles', Title.objects.select_related('category').prefetch_related(
+            'genre').order_by('name'), TitleSerializer, TitleRows),
+        ('reviews', Review.objects.order_by('pk'), ReviewSerializer,
+         ReviewRows),
+        ('comments', Comment.objects.order_by('pk'), CommentSerializer,
+         CommentRows),
+    )
+    results = OrderedDict()
+    for name, queryset, serializer_class, rows_class in cases:
+        def serializer():
+            return JSONRenderer().render(
+                serializer_class(queryset[:page_size], many=True).data
+            )
+
+        def rows():
+            page = rows_class(serializer_class())
+            return FastJSONRenderer().render(page.to_representation(
+                list(page.values(queryset)[:page_size])
+            ))
+
+        identical = serializer() == rows()
+        serializer_time = median_time(serializer, repeat)
+        rows_time = median_time(rows, repeat)
+        results[name] = OrderedDict((
+            ('serializer_ms', round(serializer_time * 1000, 3)),
+            ('rows_ms', round(rows_time * 1000, 3)),
+            ('speedup', round(serializer_time / rows_time, 1)),
+            ('identical', identical),
+        ))
+    return results
+
+
+def compare(results, baseline, metrics=('p50_ms', 'p95_ms', 'queries')):
+    '''Возвращает {эндпоинт: {метрика: (было, стало, изменение в %)}}.'''
+    diff = OrderedDict()
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        diff[name] = OrderedDict()
+        for metric in metrics:
+            old, new = previous.get(metric), current.get(metric)
+            change = None
+            if old and new is not None:
+                change = round((new - old) / old * 100, 1)
+            diff[name][metric] = (old, new, change)
+    return diff
+
+
+def dump(report, path):
+    with open(path, 'w', encoding='utf-8') as output:
+        json.dump(report, output, ensure_ascii=False, indent=2)
+
+
+def load(path):
+    with open(path, encoding='utf-8') as source:
+        return json.load(source, object_pairs_hook=OrderedDict)
@@ -0,0 +1,295 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from reviews.models import Category, Genre, Title
+
+from .cache import bump_versions
+from .permissions import IsRoleAdmin
+from .serializers import (RESERVED_SLUG, RESERVED_SLUGS,
+                          CategoryBulkSerializer, CategorySerializer,
+                          GenreBulkSerializer, GenreSerializer,
+                          TitleBulkSerializer, TitleSerializer)
+
+REQUIRED = 'Обязательное поле.'
+DUPLICATE = 'Повторяется в списке или уже существует.'
+NOT_FOUND = 'Объект {} не найден.'
+
+
+def mark_duplicates(errors, keys, taken, field):
+    '''
+    Помечает элементы, ключ которых повторяется в списке или уже занят
+    сохранённым объектом не из этого списка.
+    '''
+    counts = Counter(keys)
+    for index, key in enumerate(keys):
+        if key is not None and (counts[key] > 1 or key in taken):
+            errors[index].setdefault(field, []).append(DUPLICATE)
+
+
+class BulkWriter:
+    '''
+    Массовое создание и изменение объектов одного типа: проверки идут
+    сразу по всему списку, сохранение — всё или ничего.
+    '''
+    serializer_class = None
+    read_serializer_class = None
+    resource = None
+
+    def __init__(self, items):
+        self.items = items
+        self.errors = [{} for _ in items]
+
+    def add_error(self, index, field, message):
+        self.errors[index].setdefault(field, []).append(message)
+
+    def create(self):
+        return self.save(self.prepare_create, self.save_created)
+
+    def update(self):
+        return self.save(self.prepare_update, self.save_updated)
+
+    def save(self, prepare, saver):
+        objects = prepare()
+        if any(self.errors):
+            return None
+        try:
+            with transaction.atomic():
+                saver(objects)
+        except IntegrityError:
+            # Другой запрос занял те же ключи после проверки: повторная
+            # проверка превращает ошибку базы в ошибки по элементам.
+            self.errors = [{} for _ in self.items]
+            prepare()
+            if not any(self.errors):
+                raise
+            return None
+        bump_versions(self.resource)
+        return objects
+
+    def for_response(self, objects):
+        return objects
+
+
+class SlugBulkWriter(BulkWriter):
+    '''Жанры и категории: создание списком и переименование по слагу.'''
+    model = None
+
+    def prepare_create(self):
+        names = [item['name'] for item in self.items]
+        slugs = [item['slug'] for item in self.items]
+        taken = self.model.objects.filter(
+            Q(name__in=names) | Q(slug__in=slugs)
+        ).values_list('name', 'slug')
+        mark_duplicates(self.errors, names, {name for name, _ in taken},
+                        'name')
+        mark_duplicates(self.errors, slugs, {slug for _, slug in taken},
+                        'slug')
+        for index, slug in enumerate(slugs):
+            if slug in RESERVED_SLUGS:
+                self.add_error(index, 'slug', RESERVED_SLUG.format(slug))
+        return [self.model(**item) for item in self.items]
+
+    def save_created(self, objects):
+        self.model.objects.bulk_create(objects)
+
+    def prepare_update(self):
+        slugs = [item.get('slug') for item in self.items]
+        found = self.model.objects.in_bulk(
+            [slug for slug in slugs if slug], field_name='slug'
+        )
+        objects = []
+        for index, item in enumerate(self.items):
+            if 'slug' not in item:
+                self.add_error(index, 'slug', REQUIRED)
+            elif item['slug'] not in found:
+                self.add_error(index, 'slug', NOT_FOUND.format(item['slug']))
+            else:
+                instance = found[item['slug']]
+                instance.name = item.get('name', instance.name)
+                objects.append(instance)
+        mark_duplicates(self.errors, slugs, (), 'slug')
+        if not any(self.errors):
+            names = [instance.name for instance in objects]
+            taken = self.model.objects.filter(name__in=names).exclude(
+                slug__in=slugs
+            ).values_list('name', flat=True)
+            mark_duplicates(self.errors, names, set(taken), 'name')
+        return objects
+
+    def save_updated(self, objects):
+        self.model.objects.bulk_update(objects, ('name',))
+
+
+class CategoryBulkWriter(SlugBulkWriter):
+    model = Category
+    serializer_class = CategoryBulkSerializer
+    read_serializer_class = CategorySerializer
+    resource = 'category'
+
+
+class GenreBulkWriter(SlugBulkWriter):
+    model = Genre
+    serializer_class = GenreBulkSerializer
+    read_serializer_class = GenreSerializer
+    resource = 'genre'
+
+
+class TitleBulkWriter(BulkWriter):
+    '''
+    Произведения: слаги жанров и категорий разрешаются двумя запросами,
+    связи с жанрами вставляются в промежуточную таблицу одним запросом.
+    '''
+    serializer_class = TitleBulkSerializer
+    read_serializer_class = TitleSerializer
+    resource = 'title'
+    fields = ('name', 'year', 'description')
+
+    def resolve_slugs(self):
+        genre_slugs = {slug for item in self.items
+                       for slug in item.get('genre', ())}
+        category_slugs = {item['category'] for item in self.items
+                          if 'category' in item}
+        self.genres = dict(Genre.objects.filter(
+            slug__in=genre_slugs
+        ).values_list('slug', 'id')) if genre_slugs else {}
+        self.categories = dict(Category.objects.filter(
+            slug__in=category_slugs
+        ).values_list('slug', 'id')) if category_slugs else {}
+        for index, item in enumerate(self.items):
+            for slug in item.get('genre', ()):
+                if slug not in self.genres:
+                    self.add_error(index, 'genre', NOT_FOUND.format(slug))
+            category = item.get('category')
+            if category is not None and category not in self.categories:
+                self.add_error(index, 'category', NOT_FOUND.format(category))
+
+    def apply(self, title, item):
+        for field in self.fields:
+            if field in item:
+                setattr(title, field, item[field])
+        if 'category' in item:
+            title.category_id = self.categories.get(item['category'])
+        return title
+
+    def check_unique(self, titles):
+        '''
+        Название, год и категория не повторяются, как в TitleCreate.
+        Элементы с другими ошибками не проверяются.
+        '''
+        keys = [None if errors else (title.name, title.year, title.category_id)
+                for title, errors in zip(titles, self.errors)]
+        own = {title.pk for title in titles if title.pk}
+        rows = Title.objects.filter(
+            name__in={title.name for title in titles}
+        ).values_list('pk', 'name', 'year', 'category_id')
+        taken = {tuple(row[1:]) for row in rows if row[0] not in own}
+        mark_duplicates(self.errors, keys, taken,
+                        api_settings.NON_FIELD_ERRORS_KEY)
+
+    def prepare_create(self):
+        self.resolve_slugs()
+        titles = [self.apply(Title(), item) for item in self.items]
+        self.check_unique(titles)
+        return titles
+
+    def prepare_update(self):
+        ids = [item.get('id') for item in self.items]
+        mark_duplicates(self.errors, ids, (), 'id')
+        found = Title.objects.in_bulk([pk for pk in ids if pk is not None])
+        self.resolve_slugs()
+        titles = []
+        for index, item in enumerate(self.items):
+            if 'id' not in item:
+                self.add_error(index, 'id', REQUIRED)
+            elif item['id'] not in found:
+                self.add_error(index, 'id', NOT_FOUND.format(item['id']))
+            else:
+                titles.append(self.apply(found[item['id']], item))
+        if not any(self.errors):
+            self.check_unique(titles)
+        return titles
+
+    def save_created(self, titles):
+        Title.objects.bulk_create(titles)
+        if any(title.pk is None for title in titles):
+            # Без RETURNING (SQLite) id находим по уникальному ключу.
+            rows = Title.objects.filter(
+                name__in={title.name for title in titles}
+            ).values_list('name', 'year', 'category_id', 'pk')
+            ids = {tuple(row[:3]): row[3] for row in rows}
+            for title in titles:
+                title.pk = ids[(title.name, title.year, title.category_id)]
+        self.save_genres(titles)
+
+    def save_updated(self, titles):
+        Title.objects.bulk_update(titles, (*self.fields, 'category'))
+        Title.genre.through.objects.filter(title_id__in=[
+            title.pk for title, item in zip(titles, self.items)
+            if 'genre' in item
+        ]).delete()
+        self.save_genres(titles)
+
+    def save_genres(self, titles):
+        through = Title.genre.through
+        through.objects.bulk_create(
+            through(title_id=title.pk, genre_id=self.genres[slug])
+            for title, item in zip(titles, self.items)
+            for slug in dict.fromkeys(item.get('genre', ()))
+        )
+
+    def for_response(self, titles):
+        found = Title.objects.select_related('category').prefetch_related(
+            'genre'
+        ).in_bulk([title.pk for title in titles])
+        return [found[title.pk] for title in titles]
+
+
+class BulkWriteMixin:
+    '''
+    Добавляет эндпоинт bulk/: POST создаёт список объектов, PATCH
+    изменяет. При ошибке возвращается список ошибок по элементам
+    и ничего не сохраняется.
+    '''
+    bulk_writer_class = None
+
+    @action(detail=False, methods=['post', 'patch'], url_path='bulk',
+            permission_classes=(IsRoleAdmin,))
+    def bulk(self, request):
+        data = request.data
+        if not isinstance(data, list) or not data:
+            return Response(
+                {api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Ожидается непустой список объектов.'
+                ]}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(data) > settings.BULK_MAX_ITEMS:
+            return Response(
+                {api_settings.NON_FIELD_ERRORS_KEY: [
+                    f'Не больше {settings.BULK_MAX_ITEMS} объектов за запрос.'
+                ]}, status=status.HTTP_400_BAD_REQUEST
+            )
+        partial = request.method == 'PATCH'
+        writer_class = self.bulk_writer_class
+        serializer = writer_class.serializer_class(
+            data=data, many=True, partial=partial
+        )
+        if not serializer.is_valid():
+            return Response(serializer.errors,
+                            status=status.HTTP_400_BAD_REQUEST)
+        writer = writer_class(serializer.validated_data)
+        objects = writer.update() if partial else writer.create()
+        if objects is None:
+            return Response(writer.errors, status=status.HTTP_400_BAD_REQUEST)
+        output = writer_class.read_serializer_class(
+            writer.for_response(objects), many=True,
+            context=self.get_serializer_context()
+        )
+        return Response(output.data, status=(
+            status.HTTP_200_OK if partial else status.HTTP_201_CREATED
+        ))
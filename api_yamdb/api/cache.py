@@ -0,0 +1,144 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from rest_framework.response import Response
+
+from api_yamdb.db_router import read_from_replicas
+
+VERSION_KEY = 'api-cache:version:{}'
+COUNTER_KEY = 'api-cache:{}:{}'
+RESPONSE_KEY = 'api-cache:response:{}:{}'
+
+
+def initial_version():
+    # Версия от текущего времени не повторит старую после очистки кэша.
+    return int(time.time() * 1000)
+
+
+def get_versions(resources):
+    '''
+    Версии живут API_CACHE_VERSION_TIMEOUT секунд, затем создаются
+    заново: если запись прошла мимо этого кэша (кэш в памяти другого
+    процесса), устаревшая версия не остаётся навсегда.
+    '''
+    keys = [VERSION_KEY.format(resource) for resource in resources]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, initial_version(),
+                      settings.API_CACHE_VERSION_TIMEOUT)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*resources):
+    '''Инвалидирует все ответы, зависящие от перечисленных ресурсов.'''
+    for resource in resources:
+        key = VERSION_KEY.format(resource)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, initial_version(),
+                      settings.API_CACHE_VERSION_TIMEOUT)
+
+
+def count(resource, event):
+    key = COUNTER_KEY.format(event, resource)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def cache_stats(resources):
+    '''Возвращает счётчики попаданий и промахов по ресурсам.'''
+    keys = {
+        (resource, event): COUNTER_KEY.format(event, resource)
+        for resource in resources for event in ('hits', 'misses')
+    }
+    values = cache.get_many(keys.values())
+    return {
+        resource: {
+            event: values.get(keys[resource, event], 0)
+            for event in ('hits', 'misses')
+        }
+        for resource in resources
+    }
+
+
+class ConditionalGetMixin:
+    '''
+    ETag для list/retrieve по версиям ресурсов из get_cache_dependencies(),
+    которые увеличиваются сигналами при изменении моделей.
+    Если ETag совпал с If-None-Match, возвращается 304 без запросов
+    к базе и сериализации.
+    '''
+    cache_resource = None
+    cache_dependencies = ()
+
+    def get_cache_dependencies(self):
+        # catalog меняется после массовых операций в обход сигналов.
+        return ('catalog', self.cache_resource, *self.cache_dependencies)
+
+    def get_response_version(self, request):
+        versions = get_versions(self.get_cache_dependencies())
+        source = '|'.join((
+            request.build_absolute_uri(),
+            request.META.get('HTTP_ACCEPT', ''),
+            '.'.join(map(str, versions)),
+        ))
+        return hashlib.md5(source.encode('utf-8')).hexdigest()
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        version = self.get_response_version(request)
+        etag = f'"{version}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = self.build_response(
+                version, handler, request, *args, **kwargs
+            )
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+        return response
+
+    def build_response(self, version, handler, request, *args, **kwargs):
+        return handler(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class CachedResponseMixin(ConditionalGetMixin):
+    '''
+    Дополнительно кэширует данные ответов list/retrieve: версия ответа
+    входит в ключ, поэтому устаревшие ответы просто перестают находиться.
+    Промах читает с основной базы: ответ отстающей реплики попал бы
+    в общий кэш и отдавался бы всем клиентам до API_CACHE_TIMEOUT.
+    '''
+
+    def build_response(self, version, handler, request, *args, **kwargs):
+        key = RESPONSE_KEY.format(self.cache_resource, version)
+        data = cache.get(key)
+        if data is not None:
+            count(self.cache_resource, 'hits')
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+        count(self.cache_resource, 'misses')
+        read_from_replicas.set(False)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
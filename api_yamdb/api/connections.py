@@ -0,0 +1,87 @@
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+POOL_ENGINE = 'api_yamdb.db_pool'
+
+connects = Counter()
+connects_lock = threading.Lock()
+
+
+@receiver(connection_created)
+def count_connect(sender, connection, **kwargs):
+    '''
+    Сколько раз Django открывал соединение. С пулом это взятия из пула,
+    новые подключения к серверу считает сам пул (created).
+    '''
+    with connects_lock:
+        connects[connection.alias] += 1
+
+
+def check_on_first_use(connection):
+    '''
+    ensure_connection, который при первом вызове после начала запроса
+    проверяет открытое соединение и закрывает неработающее: Django сразу
+    откроет новое. В Django 2.2 нет CONN_HEALTH_CHECKS.
+    '''
+    ensure_connection = connection.ensure_connection
+
+    def checked_ensure_connection():
+        if connection.health_check_needed:
+            connection.health_check_needed = False
+            if (connection.connection is not None
+                    and not connection.in_atomic_block
+                    and not connection.is_usable()):
+                # Пул (api_yamdb.db_pool) не вернёт такое соединение.
+                connection.errors_occurred = True
+                connection.close()
+        ensure_connection()
+
+    return checked_ensure_connection
+
+
+@receiver(request_started)
+def schedule_health_checks(sender, **kwargs):
+    '''
+    Помечает соединения с CONN_HEALTH_CHECKS. Проверяется только
+    соединение, к которому запрос обратился, и не больше раза за запрос:
+    неиспользованные (например, реплики) не получают лишний SELECT 1.
+    '''
+    for connection in connections.all():
+        if not connection.settings_dict.get('CONN_HEALTH_CHECKS'):
+            continue
+        if 'ensure_connection' not in vars(connection):
+            connection.ensure_connection = check_on_first_use(connection)
+        connection.health_check_needed = True
+
+
+def db_stats():
+    '''
+    Настройки соединений, число подключений к серверу (connects),
+    открытий соединения в Django (checkouts) и статистика пулов.
+    Без пула connects и checkouts совпадают.
+    '''
+    pools = {}
+    if any(database['ENGINE'] == POOL_ENGINE
+           for database in settings.DATABASES.values()):
+        # Бэкенд пула требует psycopg2, без пула он не нужен.
+        from api_yamdb.db_pool.base import pool_stats
+        pools = pool_stats()
+    with connects_lock:
+        opened = dict(connects)
+    stats = {}
+    for alias in connections:
+        pool = pools.get(alias)
+        checkouts = opened.get(alias, 0)
+        stats[alias] = {
+            'conn_max_age': connections[alias].settings_dict['CONN_MAX_AGE'],
+            'connects': pool['created'] if pool else checkouts,
+            'checkouts': checkouts,
+            'pool': pool,
+        }
+    return stats
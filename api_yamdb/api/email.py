@@ -1,6 +1,28 @@
+from datetime import timedelta
+
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage, get_connection, send_mail
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+
+def queue_mail(subject, message, from_email, recipient_list):
+    '''
+    Ставит письмо в очередь вместо отправки во время запроса.
+    При EMAIL_OUTBOX = False письмо отправляется сразу.
+    '''
+    if not settings.EMAIL_OUTBOX:
+        return send_mail(subject, message, from_email, recipient_list)
+    OutgoingEmail.objects.bulk_create(
+        OutgoingEmail(subject=subject, body=message,
+                      from_email=from_email, to=recipient)
+        for recipient in recipient_list
+    )
+    return len(recipient_list)
 
 
 def send_confirmation_code(user):
@@ -9,4 +31,102 @@ def send_confirmation_code(user):
     message = f'{confirmation_code} - ваш код для авторизации на YaMDb'
     admin_email = settings.ADMIN_EMAIL
     user_email = [user.email]
-    return send_mail(subject, message, admin_email, user_email)
+    return queue_mail(subject, message, admin_email, user_email)
+
+
+def postpone(email, error, now, retry_delay):
+    email.last_error = repr(error)
+    email.send_after = now + timedelta(
+        seconds=retry_delay * 2 ** (email.attempts - 1)
+    )
+
+
+def send_emails(connection, emails, now, retry_delay):
+    sent = failed = 0
+    for email in emails:
+        email.attempts += 1
+        try:
+            connection.send_messages([EmailMessage(
+                email.subject, email.body, email.from_email,
+                [email.to], connection=connection,
+            )])
+        except Exception as error:
+            postpone(email, error, now, retry_delay)
+            failed += 1
+        else:
+            email.sent_at = timezone.now()
+            email.last_error = ''
+            sent += 1
+    return sent, failed
+
+
+def claim_batch(batch_size, max_attempts, lease):
+    '''
+    Забирает пачку писем: строки блокируются с SKIP LOCKED только на
+    время короткой транзакции, в которой send_after сдвигается на lease
+    секунд. Другие обработчики не возьмут эти письма, пока идёт отправка,
+    а если процесс упал, письма вернутся в очередь после lease.
+    '''
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True)
+            .filter(sent_at__isnull=True, attempts__lt=max_attempts,
+                    send_after__lte=now)
+            .order_by('send_after', 'pk')[:batch_size]
+        )
+        OutgoingEmail.objects.filter(
+            pk__in=[email.pk for email in emails]
+        ).update(send_after=now + timedelta(seconds=lease))
+    return emails
+
+
+def send_outbox_batch(batch_size=100, max_attempts=5, retry_delay=60,
+                      lease=600):
+    '''
+    Отправляет пачку писем из очереди через одно SMTP-соединение.
+    Отправка идёт вне транзакции, поэтому медленный SMTP не держит
+    блокировки строк; результаты записываются одним запросом после неё.
+    Неудачные письма откладываются с экспоненциальной задержкой; если
+    соединение не открылось, неудачей считается вся пачка. Текст
+    отправленных и больше не отправляемых писем (в нём код
+    подтверждения) стирается. Возвращает (отправлено, ошибок).
+    '''
+    emails = claim_batch(batch_size, max_attempts, lease)
+    if not emails:
+        return 0, 0
+    now = timezone.now()
+    try:
+        connection = get_connection(fail_silently=False)
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            email.attempts += 1
+            postpone(email, error, now, retry_delay)
+        sent, failed = 0, len(emails)
+    else:
+        try:
+            sent, failed = send_emails(connection, emails, now, retry_delay)
+        finally:
+            connection.close()
+    for email in emails:
+        if email.sent_at is not None or email.attempts >= max_attempts:
+            email.body = ''
+    OutgoingEmail.objects.bulk_update(
+        emails, ('attempts', 'sent_at', 'send_after', 'last_error', 'body')
+    )
+    return sent, failed
+
+
+def purge_outbox(keep_days=7, max_attempts=5):
+    '''
+    Удаляет письма, отправленные больше keep_days дней назад, и письма,
+    которые исчерпали max_attempts попыток и не отправлялись столько же.
+    '''
+    cutoff = timezone.now() - timedelta(days=keep_days)
+    deleted, _ = OutgoingEmail.objects.filter(
+        Q(sent_at__lt=cutoff)
+        | Q(sent_at__isnull=True, attempts__gte=max_attempts,
+            send_after__lt=cutoff)
+    ).delete()
+    return deleted
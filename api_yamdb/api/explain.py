@@ -0,0 +1,127 @@
+import re
+from collections import OrderedDict
+
+from api.authentication import token_for_user
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Title
+from user.models import User
+
+# Полный просмотр таблицы в плане: Seq Scan в PostgreSQL, SCAN без
+# индекса в SQLite (SEARCH и SCAN ... USING INDEX — по индексу).
+SEQ_SCAN = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    'sqlite': re.compile(r'^SCAN (?:TABLE )?(\w+)$'),
+}
+
+
+def build_endpoints():
+    '''
+    {имя: (URL, нужен ли администратор)} для GET-эндпоинтов API
+    на данных из benchmark.seed().
+    '''
+    title = Title.objects.filter(review_count__gt=0).order_by('pk').first()
+    review = title.reviews.order_by('pk').first()
+    genre = title.genre.order_by('pk').first()
+    titles = '/api/v1/titles/'
+    reviews = f'{titles}{title.pk}/reviews/'
+    comments = f'{reviews}{review.pk}/comments/'
+    users = '/api/v1/users/'
+    return OrderedDict((
+        ('title-list', (titles, False)),
+        ('title-list-page', (f'{titles}?page=3', False)),
+        ('title-list-category', (
+            f'{titles}?category={title.category.slug}', False)),
+        ('title-list-genre', (f'{titles}?genre={genre.slug}', False)),
+        ('title-list-year', (f'{titles}?year={title.year}', False)),
+        ('title-search', (f'{titles}?search=произведение', False)),
+        ('title-detail', (f'{titles}{title.pk}/', False)),
+        ('title-ratings', (f'{titles}{title.pk}/ratings/', False)),
+        ('title-top', (f'{titles}top/', False)),
+        ('title-trending-genre', (f'{titles}trending/?genre={genre.slug}',
+                                  False)),
+        ('review-list', (reviews, False)),
+        ('review-list-cursor', (f'{reviews}?pagination=cursor', False)),
+        ('review-detail', (f'{reviews}{review.pk}/', False)),
+        ('comment-list', (comments, False)),
+        ('user-reviews', (f'{users}{review.author.username}/reviews/', False)),
+        ('user-comments', (f'{users}{review.author.username}/comments/',
+                           False)),
+        ('category-list', ('/api/v1/categories/', False)),
+        ('genre-list', ('/api/v1/genres/', False)),
+        ('user-list', (users, True)),
+    ))
+
+
+def explain(sql):
+    '''Строки плана запроса.'''
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'EXPLAIN {sql}')
+            return [row[0] for row in cursor.fetchall()]
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def seq_scans(plan):
+    pattern = SEQ_SCAN[connection.vendor]
+    return [
+        match.group(1) for match in (
+            pattern.search(line.strip()) for line in plan
+        ) if match
+    ]
+
+
+def table_sizes(tables):
+    sizes = {}
+    with connection.cursor() as cursor:
+        for table in tables:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}'
+            )
+            sizes[table] = cursor.fetchone()[0]
+    return sizes
+
+
+def explain_endpoints(endpoints, min_rows=1000):
+    '''
+    Выполняет запросы к эндпоинтам и EXPLAIN для каждого их SELECT.
+    Возвращает {имя: {'queries': [{'sql', 'plan', 'seq_scans'}],
+    'flagged': [таблица]}}; в flagged — таблицы не меньше min_rows
+    строк, которые читаются полным просмотром в запросах с условием
+    (запрос без WHERE, например общий COUNT, читает таблицу целиком
+    в любом случае).
+    '''
+    admin = User.objects.create_user(username='explain_admin',
+                                     email='explain@yamdb.fake',
+                                     role='admin')
+    token = token_for_user(admin).access_token
+    results = OrderedDict()
+    sizes = {}
+    for name, (url, as_admin) in endpoints.items():
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if as_admin else {}
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = Client().get(url, **headers)
+        queries = []
+        for query in context.captured_queries:
+            if not query['sql'].lstrip().upper().startswith('SELECT'):
+                continue
+            plan = explain(query['sql'])
+            queries.append({
+                'sql': query['sql'], 'plan': plan,
+                'seq_scans': seq_scans(plan) if ' WHERE ' in query['sql']
+                else [],
+            })
+        scanned = {table for query in queries for table in query['seq_scans']}
+        sizes.update(table_sizes(scanned - set(sizes)))
+        results[name] = {
+            'status': response.status_code,
+            'queries': queries,
+            'flagged': sorted(
+                table for table in scanned if sizes[table] >= min_rows
+            ),
+        }
+    return results
@@ -0,0 +1,92 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from reviews.models import Review, Title
+
+# Строк за одно чтение из серверного курсора.
+CHUNK_SIZE = 2000
+
+TITLE_FIELDS = ('id', 'name', 'year', 'description', 'rating',
+                'review_count', 'category', 'genre')
+REVIEW_FIELDS = ('id', 'title_id', 'author', 'score', 'text', 'pub_date')
+
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+def merge_genres(titles, links):
+    '''
+    Склеивает строки произведений со слагами их жанров.
+    Обе последовательности упорядочены по id произведения, поэтому
+    в памяти только текущая строка каждой из них.
+    '''
+    links = iter(links)
+    link = next(links, None)
+    for title in titles:
+        genres = []
+        while link is not None and link[0] < title[0]:
+            link = next(links, None)
+        while link is not None and link[0] == title[0]:
+            genres.append(link[1])
+            link = next(links, None)
+        yield (*title, genres)
+
+
+def export_titles(using=None):
+    titles = Title.objects.using(using).order_by('pk').values_list(
+        'id', 'name', 'year', 'description', 'rating', 'review_count',
+        'category__slug'
+    ).iterator(chunk_size=CHUNK_SIZE)
+    links = Title.genre.through.objects.using(using).order_by(
+        'title_id', 'genre__slug'
+    ).values_list('title_id', 'genre__slug').iterator(chunk_size=CHUNK_SIZE)
+    for row in merge_genres(titles, links):
+        yield dict(zip(TITLE_FIELDS, row))
+
+
+def export_reviews(using=None):
+    reviews = Review.objects.using(using).order_by('pk').values_list(
+        'id', 'title_id', 'author__username', 'score', 'text', 'pub_date'
+    ).iterator(chunk_size=CHUNK_SIZE)
+    for *row, pub_date in reviews:
+        yield dict(zip(REVIEW_FIELDS, (*row, pub_date.isoformat())))
+
+
+class Echo:
+    '''Файл для csv.writer, который возвращает строку вместо записи.'''
+
+    def write(self, value):
+        return value
+
+
+def ndjson_lines(rows, fields):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False, cls=DjangoJSONEncoder) + '\n'
+
+
+def csv_lines(rows, fields):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(
+            ','.join(value) if isinstance(value, list) else value
+            for value in (row[field] for field in fields)
+        )
+
+
+WRITERS = {'ndjson': ndjson_lines, 'csv': csv_lines}
+
+
+def stream_export(name, rows, fields, output):
+    '''Ответ, который читает базу по мере отправки клиенту.'''
+    response = StreamingHttpResponse(
+        WRITERS[output](rows, fields), content_type=CONTENT_TYPES[output]
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{name}.{output}"'
+    )
+    return response
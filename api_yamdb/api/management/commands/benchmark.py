@@ -0,0 +1,175 @@
+import json
+import platform
+
+import django
+from api import benchmark
+from api.asgi import AsgiApplication
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.test.utils import (override_settings, setup_test_environment,
+                               teardown_test_environment)
+
+
+class Command(BaseCommand):
+    help = ('Нагрузочный прогон основных эндпоинтов API на синтетических '
+            'данных во временной тестовой базе. Выводит p50/p95/p99, '
+            'пропускную способность и число SQL-запросов.')
+
+    def add_arguments(self, parser):
+        for name, default in benchmark.DEFAULT_SIZES.items():
+            parser.add_argument(
+                f'--{name}', type=int, default=default,
+                help=f'Размер набора данных: {name}.'
+            )
+        parser.add_argument('--requests', type=int, default=100,
+                            help='Запросов на эндпоинт.')
+        parser.add_argument('--warmup', type=int, default=5,
+                            help='Прогревочных запросов на эндпоинт.')
+        parser.add_argument('--only', nargs='*',
+                            help='Прогнать только эти эндпоинты.')
+        parser.add_argument('--cold', action='store_true',
+                            help='Очищать кэш перед каждым запросом.')
+        parser.add_argument('--output',
+                            help='Сохранить результат в JSON-файл.')
+        parser.add_argument('--baseline',
+                            help='JSON-файл прошлого прогона для сравнения.')
+        parser.add_argument(
+            '--max-regression', type=float,
+            help='Завершиться с ошибкой, если p95 вырос больше, чем на N%%.'
+        )
+        parser.add_argument(
+            '--asgi', action='store_true',
+            help='Прогнать эндпоинты ещё и через ASGI-приложение.'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=10,
+            help='Одновременных запросов в режиме ASGI.'
+        )
+        parser.add_argument(
+            '--asgi-threads', type=int,
+            help='Потоков ASGI-приложения (по умолчанию ASGI_THREADS).'
+        )
+        parser.add_argument(
+            '--serialization', action='store_true',
+            help='Сравнить сериализаторы и быстрые списки (api.rows).'
+        )
+        parser.add_argument('--page-size', type=int, default=100,
+                            help='Размер страницы для --serialization.')
+        parser.add_argument('--keepdb', action='store_true',
+                            help='Не пересоздавать тестовую базу.')
+
+    def handle(self, *args, **options):
+        sizes = {name: options[name] for name in benchmark.DEFAULT_SIZES}
+        setup_test_environment()
+        # Сценарии повторяют регистрацию и получение токена с одного
+        # адреса: лимиты частоты на время прогона выключены.
+        without_throttling = override_settings(REST_FRAMEWORK=dict(
+            settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES={}
+        ))
+        without_throttling.enable()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options['keepdb']
+        )
+        try:
+            if not options['keepdb'] or not benchmark.Title.objects.exists():
+                self.stdout.write(f'Заполнение базы: {sizes}')
+                benchmark.seed(sizes)
+            results = benchmark.run(
+                benchmark.build_scenarios(),
+                requests=options['requests'], warmup=options['warmup'],
+                cold=options['cold'], only=options['only'],
+            )
+            if options['asgi']:
+                asgi_results = self.run_asgi(options)
+            if options['serialization']:
+                serialization = benchmark.run_serialization(
+                    options['page_size'], repeat=options['warmup'] + 10
+                )
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options['keepdb']
+            )
+            without_throttling.disable()
+            teardown_test_environment()
+        report = {
+            'meta': {
+                'sizes': sizes,
+                'requests': options['requests'],
+                'cold': options['cold'],
+                'concurrency': options['concurrency'],
+                'database': connection.vendor,
+                'django': django.get_version(),
+                'python': platform.python_version(),
+            },
+            'endpoints': results,
+        }
+        self.print_results(results)
+        if options['asgi']:
+            report['asgi'] = asgi_results
+            self.stdout.write(
+                f'\nASGI: {options["concurrency"]} одновременных запросов'
+            )
+            self.print_results(asgi_results)
+        if options['serialization']:
+            report['serialization'] = serialization
+            self.print_serialization(serialization, options['page_size'])
+        if options['output']:
+            benchmark.dump(report, options['output'])
+        if options['baseline']:
+            self.check_baseline(results, options)
+
+    def run_asgi(self, options):
+        application = AsgiApplication(
+            get_wsgi_application(), threads=options['asgi_threads']
+        )
+        try:
+            return benchmark.run_asgi(
+                benchmark.build_scenarios(), application,
+                requests=options['requests'], warmup=options['warmup'],
+                concurrency=options['concurrency'], cold=options['cold'],
+                only=options['only'],
+            )
+        finally:
+            # Соединения потоков приложения должны закрыться до
+            # удаления тестовой базы.
+            application.close()
+
+    def print_results(self, results):
+        header = (f'{"endpoint":<20}{"p50 ms":>10}{"p95 ms":>10}'
+                  f'{"p99 ms":>10}{"req/s":>10}{"queries":>9}  status')
+        self.stdout.write(header)
+        for name, row in results.items():
+            # Под ASGI запросы к базе идут в других потоках и не считаются.
+            queries = '-' if row['queries'] is None else row['queries']
+            self.stdout.write(
+                f'{name:<20}{row["p50_ms"]:>10}{row["p95_ms"]:>10}'
+                f'{row["p99_ms"]:>10}{row["rps"]:>10}{queries:>9}  '
+                + ','.join(map(str, row['statuses']))
+            )
+
+    def print_serialization(self, results, page_size):
+        self.stdout.write(f'\nСтраница из {page_size} объектов')
+        self.stdout.write(f'{"list":<20}{"serializer ms":>15}{"rows ms":>10}'
+                          f'{"speedup":>10}  identical')
+        for name, row in results.items():
+            self.stdout.write(
+                f'{name:<20}{row["serializer_ms"]:>15}{row["rows_ms"]:>10}'
+                f'{row["speedup"]:>10}  {row["identical"]}'
+            )
+
+    def check_baseline(self, results, options):
+        baseline = benchmark.load(options['baseline'])
+        diff = benchmark.compare(results, baseline['endpoints'])
+        self.stdout.write('\nСравнение с ' + options['baseline'])
+        regressions = []
+        for name, metrics in diff.items():
+            self.stdout.write(f'{name}: ' + json.dumps(metrics))
+            change = metrics['p95_ms'][2]
+            limit = options['max_regression']
+            if limit is not None and change is not None and change > limit:
+                regressions.append(f'{name} p95 {change:+}%')
+        if regressions:
+            raise CommandError('Регрессия: ' + ', '.join(regressions))
@@ -0,0 +1,88 @@
+from api import benchmark, explain
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+
+class Command(BaseCommand):
+    help = ('Заполняет временную тестовую базу синтетическими данными, '
+            'выполняет GET-запросы к эндпоинтам API и EXPLAIN для каждого '
+            'их SELECT. Отмечает полные просмотры больших таблиц.')
+
+    def add_arguments(self, parser):
+        for name, default in benchmark.DEFAULT_SIZES.items():
+            parser.add_argument(
+                f'--{name}', type=int, default=default,
+                help=f'Размер набора данных: {name}.'
+            )
+        parser.add_argument(
+            '--min-rows', type=int, default=1000,
+            help='Отмечать полный просмотр таблиц не меньше N строк.'
+        )
+        parser.add_argument('--only', nargs='*',
+                            help='Проверить только эти эндпоинты.')
+        parser.add_argument('--plans', action='store_true',
+                            help='Выводить запросы и планы целиком.')
+        parser.add_argument(
+            '--fail', action='store_true',
+            help='Завершиться с ошибкой, если есть отмеченные запросы.'
+        )
+        parser.add_argument('--keepdb', action='store_true',
+                            help='Не пересоздавать тестовую базу.')
+
+    def handle(self, *args, **options):
+        if connection.vendor not in explain.SEQ_SCAN:
+            raise CommandError(
+                f'База {connection.vendor} не поддерживается.'
+            )
+        sizes = {name: options[name] for name in benchmark.DEFAULT_SIZES}
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options['keepdb']
+        )
+        try:
+            if not options['keepdb'] or not benchmark.Title.objects.exists():
+                self.stdout.write(f'Заполнение базы: {sizes}')
+                benchmark.seed(sizes)
+            if connection.vendor == 'postgresql':
+                # Статистика для планировщика после массовой вставки.
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE')
+            endpoints = explain.build_endpoints()
+            if options['only']:
+                endpoints = {name: endpoints[name] for name in endpoints
+                             if name in options['only']}
+            results = explain.explain_endpoints(endpoints,
+                                                options['min_rows'])
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options['keepdb']
+            )
+            teardown_test_environment()
+        flagged = self.print_results(results, options['plans'])
+        if flagged and options['fail']:
+            raise CommandError(
+                'Полный просмотр таблиц: ' + ', '.join(flagged)
+            )
+
+    def print_results(self, results, plans):
+        flagged = []
+        for name, result in results.items():
+            status = 'OK'
+            if result['flagged']:
+                status = 'SEQ SCAN ' + ', '.join(result['flagged'])
+                flagged.append(name)
+            self.stdout.write(
+                f'{name:<22}{result["status"]:>4}'
+                f'{len(result["queries"]):>4} запр.  {status}'
+            )
+            for query in result['queries']:
+                if not plans and not set(query['seq_scans']) & set(
+                    result['flagged']
+                ):
+                    continue
+                self.stdout.write(f'    {query["sql"]}')
+                for line in query['plan']:
+                    self.stdout.write(f'        {line}')
+        return flagged
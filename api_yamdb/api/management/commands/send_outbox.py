@@ -0,0 +1,67 @@
+import time
+
+from api.email import purge_outbox, send_outbox_batch
+from django.core.management.base import BaseCommand
+
+# Как часто --loop удаляет старые письма, секунды.
+PURGE_INTERVAL = 3600
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди пачками через одно SMTP-соединение.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Сколько писем отправлять за одно соединение.'
+        )
+        parser.add_argument(
+            '--max-attempts', type=int, default=5,
+            help='После стольких неудач письмо больше не отправляется.'
+        )
+        parser.add_argument(
+            '--retry-delay', type=int, default=60,
+            help='Начальная задержка повтора, секунды; удваивается.'
+        )
+        parser.add_argument(
+            '--lease', type=int, default=600,
+            help='На сколько секунд пачка забирается у других обработчиков; '
+                 'больше времени отправки пачки.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, опрашивая очередь.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=2,
+            help='Пауза, если в пачке ничего не отправилось, секунды.'
+        )
+        parser.add_argument(
+            '--keep-days', type=float, default=7,
+            help='Сколько дней хранить отправленные и брошенные письма.'
+        )
+
+    def purge(self, options):
+        deleted = purge_outbox(options['keep_days'], options['max_attempts'])
+        if deleted:
+            self.stdout.write(f'Удалено старых писем: {deleted}.')
+        return time.monotonic()
+
+    def handle(self, *args, **options):
+        purged_at = self.purge(options)
+        while True:
+            sent, failed = send_outbox_batch(
+                batch_size=options['batch_size'],
+                max_attempts=options['max_attempts'],
+                retry_delay=options['retry_delay'],
+                lease=options['lease'],
+            )
+            if sent or failed:
+                self.stdout.write(f'Отправлено {sent}, ошибок {failed}.')
+            if not options['loop']:
+                break
+            if time.monotonic() - purged_at > PURGE_INTERVAL:
+                purged_at = self.purge(options)
+            # Пустая очередь или недоступный SMTP: ждём, а не крутимся.
+            if not sent:
+                time.sleep(options['interval'])
@@ -0,0 +1,191 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+from api_yamdb.db_router import read_from_replicas
+
+from .cache import cache_stats
+from .connections import db_stats
+
+logger = logging.getLogger('api.stats')
+
+METRICS = ('time', 'db_time', 'serializer_time', 'queries', 'size')
+
+
+class EndpointStats:
+    '''Суммы и максимумы метрик запросов по именам URL в этом процессе.'''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.endpoints = {}
+
+    def add(self, endpoint, values):
+        with self.lock:
+            row = self.endpoints.setdefault(endpoint, {
+                'count': 0,
+                **{f'{name}_sum': 0 for name in METRICS},
+                **{f'{name}_max': 0 for name in METRICS},
+            })
+            row['count'] += 1
+            for name in METRICS:
+                row[f'{name}_sum'] += values[name]
+                row[f'{name}_max'] = max(row[f'{name}_max'], values[name])
+
+    def snapshot(self):
+        with self.lock:
+            return OrderedDict(
+                (endpoint, dict(row))
+                for endpoint, row in sorted(self.endpoints.items())
+            )
+
+
+endpoint_stats = EndpointStats()
+
+
+class RequestStats:
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.view_started = self.view_finished = None
+        self.db_before_view = self.db_time_in_view = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+
+class QueryStatsMiddleware:
+    '''
+    Считает для каждого запроса число SQL-запросов, время в базе,
+    время view без учёта базы (в основном сериализация), время
+    отрисовки ответа и его размер. Статистика копится по имени URL
+    (title-list, reviews-detail, ...) и доступна на /api/v1/stats/.
+    Медленные запросы пишутся в лог api.stats.
+    '''
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.API_STATS_ENABLED:
+            return self.get_response(request)
+        stats = request._query_stats = RequestStats()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(stats))
+            response = self.get_response(request)
+        self.record(request, response, stats, time.perf_counter() - started)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        stats = getattr(request, '_query_stats', None)
+        if stats is not None:
+            stats.view_started = time.perf_counter()
+            stats.db_before_view = stats.db_time
+
+    def process_template_response(self, request, response):
+        # DRF Response ещё не отрисован: здесь заканчивается работа view.
+        stats = getattr(request, '_query_stats', None)
+        if stats is not None and stats.view_started is not None:
+            stats.view_finished = time.perf_counter()
+            stats.db_time_in_view = stats.db_time - stats.db_before_view
+        return response
+
+    def record(self, request, response, stats, elapsed):
+        match = request.resolver_match
+        endpoint = match.url_name if match and match.url_name else (
+            'unresolved'
+        )
+        serializer_time = 0.0
+        if stats.view_finished is not None:
+            serializer_time = max(
+                0.0, stats.view_finished - stats.view_started
+                - stats.db_time_in_view
+            )
+        size = 0 if response.streaming else len(response.content)
+        values = {
+            'time': elapsed,
+            'db_time': stats.db_time,
+            'serializer_time': serializer_time,
+            'queries': stats.queries,
+            'size': size,
+        }
+        endpoint_stats.add(endpoint, values)
+        if (elapsed * 1000 >= settings.SLOW_REQUEST_MS
+                or stats.queries >= settings.SLOW_REQUEST_QUERIES):
+            logger.warning(
+                'Медленный запрос %s %s (%s): %.1f мс, %d SQL-запросов '
+                'за %.1f мс, сериализация %.1f мс, %d байт',
+                request.method, request.get_full_path(), endpoint,
+                elapsed * 1000, stats.queries, stats.db_time * 1000,
+                serializer_time * 1000, size,
+            )
+
+
+def pin_key(request):
+    '''Клиент определяется по токену, анонимный — по IP-адресу.'''
+    client = (request.META.get('HTTP_AUTHORIZATION')
+              or request.META.get('REMOTE_ADDR', ''))
+    return 'db_pin:' + hashlib.md5(client.encode()).hexdigest()
+
+
+class ReplicaRoutingMiddleware:
+    '''
+    Разрешает ReplicaRouter читать с реплик для безопасных запросов
+    к представлениям api. Клиент, который успешно что-то изменил,
+    REPLICA_PIN_SECONDS читает с основной базы и видит свои изменения,
+    даже если реплики отстают.
+    '''
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = read_from_replicas.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            read_from_replicas.reset(token)
+        if (settings.DATABASE_REPLICAS
+                and request.method not in SAFE_METHODS
+                and response.status_code < 400):
+            cache.set(pin_key(request), True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'cls', None)
+        if (settings.DATABASE_REPLICAS
+                and request.method in SAFE_METHODS
+                and view_class is not None
+                and view_class.__module__.startswith('api.')
+                and not cache.get(pin_key(request))):
+            read_from_replicas.set(True)
+
+
+def collect_stats():
+    '''Данные для /api/v1/stats/: запросы по эндпоинтам, кэш и соединения.'''
+    return OrderedDict((
+        ('pid', os.getpid()),
+        ('endpoints', endpoint_stats.snapshot()),
+        ('cache', cache_stats(('category', 'genre', 'title'))),
+        ('db', db_stats()),
+    ))
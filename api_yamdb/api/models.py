@@ -0,0 +1,33 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutgoingEmail(models.Model):
+    '''Письмо в очереди на отправку фоновым обработчиком send_outbox.'''
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    body = models.TextField(verbose_name='Текст')
+    from_email = models.CharField(max_length=254,
+                                  verbose_name='Отправитель')
+    to = models.EmailField(max_length=254, verbose_name='Получатель')
+    created = models.DateTimeField(auto_now_add=True,
+                                   verbose_name='Дата создания')
+    send_after = models.DateTimeField(default=timezone.now,
+                                      verbose_name='Отправить после')
+    sent_at = models.DateTimeField(null=True, blank=True,
+                                   verbose_name='Дата отправки')
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='Попыток отправки'
+    )
+    last_error = models.TextField(blank=True,
+                                  verbose_name='Последняя ошибка')
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            models.Index(fields=('sent_at', 'send_after'),
+                         name='outgoing_email_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.to}: {self.subject}'
@@ -0,0 +1,69 @@
+from rest_framework.pagination import (CursorPagination, LimitOffsetPagination,
+                                       PageNumberPagination)
+
+
+class TitlePagination(PageNumberPagination):
+    '''Постраничный вывод произведений с настраиваемым размером страницы.'''
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class PubDateCursorPagination(CursorPagination):
+    '''
+    Курсорная пагинация по (pub_date, id): страница выбирается
+    по индексу без OFFSET, общее количество считается только
+    по запросу ?count=true.
+    '''
+    ordering = ('pub_date', 'id')
+    page_size_query_param = 'limit'
+    max_page_size = 100
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.queryset = queryset
+        self.with_count = request.query_params.get(
+            self.count_query_param, ''
+        ).lower() in ('1', 'true')
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.with_count:
+            response.data['count'] = self.queryset.count()
+            response.data.move_to_end('count', last=False)
+        return response
+
+
+class AuthorFeedPagination(PubDateCursorPagination):
+    '''Лента автора: сначала новые, по индексу (author, pub_date, id).'''
+    ordering = ('-pub_date', '-id')
+
+
+class OptionalCursorPagination(LimitOffsetPagination):
+    '''
+    По умолчанию limit/offset; с ?pagination=cursor (или при переходе
+    по ссылке с курсором) включается курсорная пагинация.
+    '''
+    mode_query_param = 'pagination'
+    cursor_pagination_class = PubDateCursorPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.use_cursor(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_pagination_class.cursor_query_param
+            in request.query_params
+        )
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,95 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ENDPOINT_METRICS = (
+    ('requests_total', 'counter', 'count'),
+    ('request_seconds_sum', 'counter', 'time_sum'),
+    ('request_seconds_max', 'gauge', 'time_max'),
+    ('db_queries_total', 'counter', 'queries_sum'),
+    ('db_queries_max', 'gauge', 'queries_max'),
+    ('db_seconds_sum', 'counter', 'db_time_sum'),
+    ('serializer_seconds_sum', 'counter', 'serializer_time_sum'),
+    ('response_bytes_sum', 'counter', 'size_sum'),
+)
+POOL_METRICS = (
+    ('in_use', 'gauge', 'in_use'),
+    ('idle', 'gauge', 'idle'),
+    ('created_total', 'counter', 'created'),
+    ('reused_total', 'counter', 'reused'),
+    ('discarded_total', 'counter', 'discarded'),
+    ('waits_total', 'counter', 'waits'),
+    ('timeouts_total', 'counter', 'timeouts'),
+)
+
+
+class FastJSONRenderer(JSONRenderer):
+    '''
+    JSONRenderer, который кодирует через orjson, если он установлен,
+    с тем же результатом. Ответы с отступом и данные, которые orjson
+    кодирует иначе (datetime, Decimal, ленивые строки), отдаются
+    обычному JSONRenderer.
+    '''
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or data is None or self.ensure_ascii
+                or not self.compact or self.get_indent(
+                    accepted_media_type, renderer_context or {}
+                ) is not None):
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        try:
+            content = orjson.dumps(
+                data, option=orjson.OPT_PASSTHROUGH_DATETIME
+            )
+        except TypeError:
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        # Как JSONRenderer: JSON должен оставаться подмножеством JavaScript.
+        return content.replace(
+            '\u2028'.encode(), b'\\u2028'
+        ).replace('\u2029'.encode(), b'\\u2029')
+
+
+class PrometheusRenderer(BaseRenderer):
+    '''Отдаёт статистику /api/v1/stats/ в текстовом формате Prometheus.'''
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if 'endpoints' not in data:
+            return '\n'.join(f'# {key}: {value}'
+                             for key, value in data.items())
+        lines = []
+        for metric, kind, key in ENDPOINT_METRICS:
+            lines.append(f'# TYPE yamdb_{metric} {kind}')
+            for endpoint, row in data['endpoints'].items():
+                lines.append(
+                    f'yamdb_{metric}{{endpoint="{endpoint}"}} {row[key]}'
+                )
+        for event in ('hits', 'misses'):
+            lines.append(f'# TYPE yamdb_cache_{event}_total counter')
+            for resource, row in data['cache'].items():
+                lines.append(
+                    f'yamdb_cache_{event}_total{{resource="{resource}"}} '
+                    f'{row[event]}'
+                )
+        for key in ('connects', 'checkouts'):
+            lines.append(f'# TYPE yamdb_db_{key}_total counter')
+            for alias, row in data['db'].items():
+                lines.append(
+                    f'yamdb_db_{key}_total{{alias="{alias}"}} {row[key]}'
+                )
+        pools = {alias: row['pool'] for alias, row in data['db'].items()
+                 if row['pool']}
+        for metric, kind, key in POOL_METRICS if pools else ():
+            lines.append(f'# TYPE yamdb_db_pool_{metric} {kind}')
+            for alias, pool in pools.items():
+                lines.append(
+                    f'yamdb_db_pool_{metric}{{alias="{alias}"}} {pool[key]}'
+                )
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,141 @@
+'''
+Быстрые списки: страница читается через .values() и собирается
+в словари той же формы, что у сериализаторов, без моделей и полей DRF
+на каждый объект. Значения приводятся полями тех же сериализаторов,
+поэтому ответ совпадает с обычным байт в байт.
+'''
+from collections import defaultdict
+
+from django.conf import settings
+from rest_framework.relations import RelatedField
+from rest_framework.response import Response
+from reviews.models import Genre
+
+
+def identity(value):
+    return value
+
+
+class RowSerializer:
+    '''
+    fields — пары (поле сериализатора, путь для .values()). Связанные
+    поля приходят из .values() уже слагом, остальные приводятся
+    to_representation поля сериализатора.
+    '''
+    fields = ()
+    extra_values = ()
+
+    def __init__(self, serializer):
+        self.representations = []
+        for name, path in self.fields:
+            field = serializer.fields[name]
+            self.representations.append((name, path, (
+                identity if isinstance(field, RelatedField)
+                else field.to_representation
+            )))
+
+    def values(self, queryset):
+        return queryset.prefetch_related(None).values(
+            *(path for _, path in self.fields), *self.extra_values
+        )
+
+    def represent(self, row):
+        data = {}
+        for name, path, to_representation in self.representations:
+            value = row[path]
+            data[name] = None if value is None else to_representation(value)
+        return data
+
+    def to_representation(self, rows, using=None):
+        return [self.represent(row) for row in rows]
+
+
+class ReviewRows(RowSerializer):
+    fields = (('id', 'id'), ('text', 'text'), ('author', 'author__username'),
+              ('score', 'score'), ('pub_date', 'pub_date'))
+
+
+class CommentRows(RowSerializer):
+    fields = (('id', 'id'), ('text', 'text'), ('author', 'author__username'),
+              ('pub_date', 'pub_date'))
+
+
+class ReviewFeedRows(ReviewRows):
+    '''Отзывы автора: произведение приходит тем же запросом через JOIN.'''
+    extra_values = ('title_id', 'title__name')
+
+    def represent(self, row):
+        data = super().represent(row)
+        data['title'] = {'id': row['title_id'], 'name': row['title__name']}
+        return data
+
+
+class CommentFeedRows(CommentRows):
+    '''Комментарии автора: отзыв и произведение — тем же запросом.'''
+    extra_values = ('review_id', 'review__title_id', 'review__title__name')
+
+    def represent(self, row):
+        data = super().represent(row)
+        data['review'] = row['review_id']
+        data['title'] = {'id': row['review__title_id'],
+                         'name': row['review__title__name']}
+        return data
+
+
+class TitleRows(RowSerializer):
+    '''Жанры всей страницы читаются одним запросом, как при prefetch.'''
+    fields = (('id', 'id'), ('name', 'name'), ('year', 'year'),
+              ('rating', 'rating'), ('description', 'description'))
+    extra_values = ('category__name', 'category__slug')
+
+    def to_representation(self, rows, using=None):
+        genres = defaultdict(list)
+        for title_id, name, slug in Genre.objects.using(using).filter(
+            titles__in=[row['id'] for row in rows]
+        ).values_list('titles', 'name', 'slug'):
+            genres[title_id].append({'name': name, 'slug': slug})
+        data = []
+        for row in rows:
+            item = self.represent(row)
+            item['genre'] = genres[row['id']]
+            item['category'] = None if row['category__slug'] is None else {
+                'name': row['category__name'], 'slug': row['category__slug'],
+            }
+            data.append(item)
+        return data
+
+
+class RankedTitleRows(TitleRows):
+    '''Произведения из TitleRanking: к полям списка добавляется балл.'''
+
+    def __init__(self, serializer, score_field):
+        super().__init__(serializer)
+        self.score_path = f'rankings__{score_field}'
+        self.extra_values = (*self.extra_values, self.score_path)
+
+    def to_representation(self, rows, using=None):
+        data = super().to_representation(rows, using)
+        for item, row in zip(data, rows):
+            item['score'] = row[self.score_path]
+        return data
+
+
+class RowListMixin:
+    '''
+    list() через row_serializer_class вместо сериализатора на каждый
+    объект. Выключается настройкой API_ROW_LISTS.
+    '''
+    row_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if not settings.API_ROW_LISTS:
+            return super().list(request, *args, **kwargs)
+        rows = self.row_serializer_class(self.get_serializer())
+        queryset = rows.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        data = rows.to_representation(
+            list(queryset if page is None else page), using=queryset.db
+        )
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
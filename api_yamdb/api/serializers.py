@@ -1,10 +1,26 @@
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404
+from django.utils.encoding import smart_str
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
 from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import (Category, Comment, Genre, Review, ScoreHistogram,
+                            Title)
 from user.models import User
 
+from .slugs import category_slugs, genre_slugs
+
+# Адрес categories/bulk/ и genres/bulk/ занят массовыми операциями.
+RESERVED_SLUGS = ('bulk',)
+RESERVED_SLUG = 'Слаг "{}" зарезервирован.'
+
+
+def validate_not_reserved(value):
+    if value in RESERVED_SLUGS:
+        raise serializers.ValidationError(RESERVED_SLUG.format(value))
+    return value
+
 
 class SignUpSerializer(serializers.ModelSerializer):
 
@@ -87,7 +103,8 @@ class CategorySerializer(serializers.ModelSerializer):
     """Сериализатор для категорий"""
     slug = serializers.CharField(
         allow_blank=False,
-        validators=[UniqueValidator(queryset=Category.objects.all())]
+        validators=[UniqueValidator(queryset=Category.objects.all()),
+                    validate_not_reserved]
     )
 
     class Meta:
@@ -108,7 +125,8 @@ class GenreSerializer(serializers.ModelSerializer):
     """Сериализатор для жанров"""
     slug = serializers.CharField(
         allow_blank=False,
-        validators=[UniqueValidator(queryset=Genre.objects.all())]
+        validators=[UniqueValidator(queryset=Genre.objects.all()),
+                    validate_not_reserved]
     )
 
     class Meta:
@@ -126,26 +144,80 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         fields = ('id', 'text', 'author', 'score', 'pub_date',)
 
-    def validate(self, data):
-        if self.context.get('request').method != 'POST':
-            return data
-        reviewer = self.context.get('request').user
-        title_id = self.context.get('view').kwargs['title_id']
-        if Review.objects.filter(author=reviewer, title__id=title_id).exists():
-            raise serializers.ValidationError(
-                'Оставлять отзыв на одно произведение дважды запрещено!'
-            )
-        return data
+    def create(self, validated_data):
+        # Повторный отзыв ловит ограничение unique_author_title в базе,
+        # без отдельного запроса на проверку. Другие ошибки целостности
+        # (например, произведение удалили) — не повод для этого ответа.
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                author=validated_data['author'],
+                title=validated_data['title'],
+            ).exists():
+                raise
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Оставлять отзыв на одно произведение дважды запрещено!'
+                ]
+            })
+
+
+class BulkSlugSerializer(serializers.ModelSerializer):
+    """
+    Жанр или категория в массовой загрузке: уникальность проверяется
+    сразу для всего списка, а не запросом на каждый объект.
+    """
+
+    class Meta:
+        fields = ('name', 'slug')
+        extra_kwargs = {
+            'name': {'validators': []},
+            'slug': {'validators': []},
+        }
+
+
+class CategoryBulkSerializer(BulkSlugSerializer):
+
+    class Meta(BulkSlugSerializer.Meta):
+        model = Category
+
+
+class GenreBulkSerializer(BulkSlugSerializer):
+
+    class Meta(BulkSlugSerializer.Meta):
+        model = Genre
+
+
+class TitleBulkSerializer(serializers.ModelSerializer):
+    """
+    Произведение в массовой загрузке: жанры и категория передаются
+    слагами и разрешаются одним запросом для всего списка.
+    """
+    id = serializers.IntegerField(required=False)
+    genre = serializers.ListField(child=serializers.SlugField(),
+                                  allow_empty=False)
+    category = serializers.SlugField()
+
+    class Meta:
+        model = Title
+        fields = ('id', 'name', 'year', 'description', 'genre', 'category')
+
+
+class ScoreHistogramSerializer(serializers.ModelSerializer):
+    """Сериализатор распределения оценок произведения"""
+
+    class Meta:
+        model = ScoreHistogram
+        fields = ('count', 'mean', 'median', 'histogram')
 
 
 class TitleSerializer(serializers.ModelSerializer):
     """Сериализатор для заголовков"""
     genre = GenreSerializer(many=True, required=True,)
     category = CategorySerializer(many=False, read_only=True)
-    rating = serializers.FloatField(
-        source='reviews__score__avg',
-        read_only=True
-    )
+    rating = serializers.FloatField(read_only=True)
 
     class Meta:
         model = Title
@@ -155,16 +227,38 @@ class TitleSerializer(serializers.ModelSerializer):
         )
 
 
+class MappedSlugRelatedField(serializers.SlugRelatedField):
+    """
+    Слаг проверяется по карте слагов процесса (api.slugs) без запроса
+    к базе. Вместо объекта возвращается экземпляр только с id и слагом:
+    для сохранения связи и ответа больше ничего не нужно.
+    """
+
+    def __init__(self, slug_map=None, **kwargs):
+        self.slug_map = slug_map
+        super().__init__(slug_field='slug', **kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            pk = self.slug_map.get(data)
+        except TypeError:
+            self.fail('invalid')
+        if pk is None:
+            self.fail('does_not_exist', slug_name=self.slug_field,
+                      value=smart_str(data))
+        return self.get_queryset().model(pk=pk, slug=data)
+
+
 class TitleCreateSerialaizer(serializers.ModelSerializer):
     """Сериализатор для создания заголовков"""
-    genre = serializers.SlugRelatedField(
-        slug_field='slug',
+    genre = MappedSlugRelatedField(
+        slug_map=genre_slugs,
         many=True,
         queryset=Genre.objects.all(),
         required=True,
     )
-    category = serializers.SlugRelatedField(
-        slug_field='slug',
+    category = MappedSlugRelatedField(
+        slug_map=category_slugs,
         queryset=Category.objects.all(),
         required=True,
     )
@@ -180,3 +274,45 @@ class TitleCreateSerialaizer(serializers.ModelSerializer):
                 fields=('name', 'year', 'category',)
             )
         ]
+
+    def create(self, validated_data):
+        return self.save_with_slugs(super().create, validated_data)
+
+    def update(self, instance, validated_data):
+        return self.save_with_slugs(super().update, instance, validated_data)
+
+    def save_with_slugs(self, save, *args):
+        '''
+        Жанр или категорию могли удалить после чтения карты слагов:
+        тогда ограничение внешнего ключа отменяет запись, карты
+        перечитываются, и клиент получает обычную ошибку слага.
+        '''
+        try:
+            with transaction.atomic():
+                return save(*args)
+        except IntegrityError:
+            errors = self.missing_slugs()
+            if not errors:
+                raise
+            raise serializers.ValidationError(errors)
+
+    def missing_slugs(self):
+        errors = {}
+        for name, slug_map in (('genre', genre_slugs),
+                               ('category', category_slugs)):
+            value = self.validated_data.get(name)
+            if value is None:
+                continue
+            ids = slug_map.reload()
+            field = self.fields[name]
+            field = getattr(field, 'child_relation', field)
+            messages = [
+                field.error_messages['does_not_exist'].format(
+                    slug_name='slug', value=item.slug
+                )
+                for item in (value if isinstance(value, list) else [value])
+                if item.slug not in ids
+            ]
+            if messages:
+                errors[name] = messages
+        return errors
@@ -0,0 +1,106 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.signals import rankings_changed, titles_changed
+from user.models import User
+
+from .authentication import forget_token_version, remember_token_version
+from .cache import bump_versions
+
+RESOURCES = {
+    Category: 'category',
+    Genre: 'genre',
+    Title: 'title',
+}
+
+
+def bump_now_and_on_commit(*resources):
+    '''
+    Ещё раз после коммита: до него другой процесс мог прочитать
+    старые данные уже под новой версией и закэшировать их.
+    '''
+    bump_versions(*resources)
+    transaction.on_commit(partial(bump_versions, *resources))
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_catalog(sender, **kwargs):
+    if sender in RESOURCES:
+        # Карты слагов в api.slugs тоже перечитываются по этой версии.
+        bump_now_and_on_commit(RESOURCES[sender])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_versions('title')
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_reviews(sender, instance, **kwargs):
+    '''Отзыв меняет рейтинг в списке произведений и в самом произведении.'''
+    bump_now_and_on_commit('reviews', f'reviews:{instance.title_id}')
+
+
+@receiver(post_delete, sender=Title)
+def invalidate_title_reviews(sender, instance, **kwargs):
+    bump_now_and_on_commit(f'reviews:{instance.pk}')
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comments(sender, instance, **kwargs):
+    bump_now_and_on_commit(f'comments:{instance.review_id}')
+
+
+@receiver(post_delete, sender=Review)
+def invalidate_review_comments(sender, instance, **kwargs):
+    bump_now_and_on_commit(f'comments:{instance.pk}')
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_lists(sender, instance, **kwargs):
+    '''
+    Из данных пользователя отзывы и комментарии показывают только логин,
+    поэтому сбрасываются лишь списки с записями переименованного автора.
+    '''
+    if not getattr(instance, 'username_changed', False):
+        return
+    title_ids = Review.objects.filter(author=instance).values_list(
+        'title_id', flat=True
+    ).distinct()
+    review_ids = Comment.objects.filter(author=instance).values_list(
+        'review_id', flat=True
+    ).distinct()
+    bump_versions(*(f'reviews:{pk}' for pk in title_ids),
+                  *(f'comments:{pk}' for pk in review_ids))
+
+
+@receiver(post_save, sender=User)
+def update_token_version(sender, instance, **kwargs):
+    '''
+    Версия попадает в кэш только после коммита: при откате в кэше
+    осталась бы версия, которой нет в базе, и действующие токены
+    отклонялись бы до TOKEN_VERSION_CACHE_TIMEOUT.
+    '''
+    transaction.on_commit(partial(remember_token_version, instance))
+
+
+@receiver(post_delete, sender=User)
+def revoke_user_tokens(sender, instance, **kwargs):
+    forget_token_version(instance.pk)
+
+
+@receiver(titles_changed)
+def invalidate_all(sender, **kwargs):
+    bump_versions('catalog')
+
+
+@receiver(rankings_changed)
+def invalidate_rankings(sender, **kwargs):
+    bump_versions('ranking')
@@ -0,0 +1,54 @@
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from reviews.models import Category, Genre
+
+from .cache import get_versions
+
+
+class SlugMap:
+    '''
+    Слаг → id для маленьких справочников (жанры, категории) в памяти
+    процесса. На каждом обращении сверяются версии ресурса и catalog
+    из общего кэша (один get_many): сигналы и массовые операции
+    увеличивают их, и карта перечитывается одним запросом во всех
+    процессах. Кроме того, карта перечитывается не реже раза
+    в SLUG_MAP_TIMEOUT секунд: версии из кэша в памяти процесса
+    не узнают о записи в других процессах.
+    '''
+
+    def __init__(self, model, resource):
+        self.model = model
+        self.resource = resource
+        self.version = None
+        self.loaded_at = None
+        self.ids = {}
+
+    def load(self, version):
+        # Основная база: реплика может отставать, а карта живёт долго.
+        ids = dict(self.model.objects.using(DEFAULT_DB_ALIAS).values_list(
+            'slug', 'pk'
+        ))
+        self.ids, self.version = ids, version
+        self.loaded_at = time.monotonic()
+        return ids
+
+    def reload(self):
+        return self.load(self.version)
+
+    def get_ids(self):
+        version = get_versions(('catalog', self.resource))
+        if (version != self.version
+                or time.monotonic() - self.loaded_at
+                > settings.SLUG_MAP_TIMEOUT):
+            return self.load(version)
+        return self.ids
+
+    def get(self, slug):
+        '''id по слагу или None, если такого объекта нет.'''
+        return self.get_ids().get(slug)
+
+
+genre_slugs = SlugMap(Genre, 'genre')
+category_slugs = SlugMap(Category, 'category')
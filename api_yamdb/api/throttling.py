@@ -0,0 +1,95 @@
+import hashlib
+
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    '''
+    Скользящее окно на двух счётчиках в общем кэше: число запросов
+    оценивается как текущее окно плюс доля прошлого, которая ещё
+    попадает в последние duration секунд. Счётчик увеличивается атомарно
+    (cache.incr), поэтому лимит держится и при нескольких процессах.
+
+    Скоуп — '<throttle_scope view>_<kind>', частота берётся
+    из DEFAULT_THROTTLE_RATES; без частоты запрос не ограничивается.
+    Проверка идёт до обработчика view, без запросов к базе.
+    '''
+    kind = None
+    cache_format = 'throttle:{scope}:{ident}:{window}'
+
+    def __init__(self):
+        # Частота зависит от view, поэтому выбирается в allow_request.
+        pass
+
+    def get_ident_value(self, request):
+        '''Чем различаются клиенты; None — запрос не ограничивается.'''
+
+    def allow_request(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if scope is None:
+            return True
+        self.scope = f'{scope}_{self.kind}'
+        self.rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        ident = self.get_ident_value(request)
+        if self.rate is None or ident is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        ident = hashlib.md5(ident.encode('utf-8')).hexdigest()
+
+        now = self.timer()
+        window, elapsed = divmod(now, self.duration)
+        current = self.increment(self.window_key(ident, window))
+        previous = self.cache.get(self.window_key(ident, window - 1), 0)
+        estimate = previous * (1 - elapsed / self.duration) + current
+        self.retry_after = self.duration - elapsed
+        return estimate <= self.num_requests
+
+    def window_key(self, ident, window):
+        return self.cache_format.format(scope=self.scope, ident=ident,
+                                        window=int(window))
+
+    def increment(self, key):
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Прошлое окно должно дожить до конца текущего.
+            self.cache.add(key, 0, self.duration * 2)
+            return self.cache.incr(key)
+
+    def wait(self):
+        return self.retry_after
+
+
+class IPThrottle(SlidingWindowThrottle):
+    '''По адресу клиента (учитывает NUM_PROXIES).'''
+    kind = 'ip'
+
+    def get_ident_value(self, request):
+        return self.get_ident(request)
+
+
+class FieldThrottle(SlidingWindowThrottle):
+    '''По значению поля запроса без учёта регистра.'''
+    field = None
+
+    @property
+    def kind(self):
+        return self.field
+
+    def get_ident_value(self, request):
+        try:
+            value = request.data.get(self.field)
+        except AttributeError:
+            return None
+        if not isinstance(value, str) or not value.strip():
+            return None
+        return value.strip().lower()
+
+
+class EmailThrottle(FieldThrottle):
+    field = 'email'
+
+
+class UsernameThrottle(FieldThrottle):
+    field = 'username'
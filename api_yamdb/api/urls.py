@@ -2,9 +2,9 @@ from django.urls import include, path
 from rest_framework import routers
 from rest_framework_simplejwt.views import TokenObtainPairView
 
-from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, TitleViewSet, TokenView, UserRegView,
-                    UsersViewSet)
+from .views import (CategoryViewSet, CommentViewSet, ExportReviewsView,
+                    ExportTitlesView, GenreViewSet, ReviewViewSet, StatsView,
+                    TitleViewSet, TokenView, UserRegView, UsersViewSet)
 
 router1 = routers.DefaultRouter()
 router1.register('users', UsersViewSet, basename='users')
@@ -23,5 +23,10 @@ urlpatterns = [
         path('signup/', UserRegView.as_view()),
         path('token/', TokenView.as_view())
     ])),
+    path('v1/export/', include([
+        path('titles/', ExportTitlesView.as_view(), name='export-titles'),
+        path('reviews/', ExportReviewsView.as_view(), name='export-reviews'),
+    ])),
+    path('v1/stats/', StatsView.as_view(), name='stats'),
     path('token/', TokenObtainPairView.as_view())
 ]
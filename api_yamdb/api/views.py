@@ -1,31 +1,50 @@
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import router
 from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
 from rest_framework import filters, permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.pagination import (LimitOffsetPagination,
                                        PageNumberPagination)
 from rest_framework.permissions import (AllowAny, IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 from reviews.filters import TitleFilterSet
-from reviews.models import Category, Genre, Review, Title
+from reviews.models import (Category, Comment, Genre, Review, ScoreHistogram,
+                            Title, TitleRanking)
 from user.models import User
 
-from .email import send_confirmation_code
+from .authentication import token_for_user
+from .bulk import (BulkWriteMixin, CategoryBulkWriter, GenreBulkWriter,
+                   TitleBulkWriter)
+from .cache import CachedResponseMixin, ConditionalGetMixin
+from .email import queue_mail, send_confirmation_code
+from .export import (REVIEW_FIELDS, TITLE_FIELDS, WRITERS, export_reviews,
+                     export_titles, stream_export)
+from .middleware import collect_stats
 from .mixins import CreateDeleteListViewSet
+from .pagination import (AuthorFeedPagination, OptionalCursorPagination,
+                         TitlePagination)
 from .permissions import AdminOrReadOnly, IsAdmin, IsAuthorOrModer, IsRoleAdmin
+from .renderers import PrometheusRenderer
+from .rows import (CommentFeedRows, CommentRows, RankedTitleRows,
+                   ReviewFeedRows, ReviewRows, RowListMixin, TitleRows)
 from .serializers import (AdminUserSerializer, CategorySerializer,
                           CommentSerializer, GenreSerializer, ReviewSerializer,
-                          SignUpSerializer, TitleCreateSerialaizer,
-                          TitleSerializer, TokenSerializer, UserSerializer)
+                          ScoreHistogramSerializer, SignUpSerializer,
+                          TitleCreateSerialaizer, TitleSerializer,
+                          TokenSerializer, UserSerializer)
+from .slugs import category_slugs, genre_slugs
+from .throttling import EmailThrottle, IPThrottle, UsernameThrottle
 
 
-class CategoryViewSet(CreateDeleteListViewSet):
+class CategoryViewSet(BulkWriteMixin, CachedResponseMixin,
+                      CreateDeleteListViewSet):
+    bulk_writer_class = CategoryBulkWriter
+    cache_resource = 'category'
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = (IsAuthenticatedOrReadOnly, IsAdmin,)
@@ -44,25 +63,36 @@ class CategoryViewSet(CreateDeleteListViewSet):
         category.delete()
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, RowListMixin,
+                     viewsets.ModelViewSet):
+    row_serializer_class = CommentRows
     serializer_class = CommentSerializer
     permission_classes = (IsAuthenticatedOrReadOnly,
                           IsAuthorOrModer)
-    pagination_class = LimitOffsetPagination
+    pagination_class = OptionalCursorPagination
+
+    @cached_property
+    def review(self):
+        '''Отзыв из URL, загружается один раз за запрос.'''
+        return get_object_or_404(Review, pk=self.kwargs.get('review_id'),
+                                 title_id=self.kwargs.get('title_id'))
 
     def get_queryset(self):
-        review_id = self.kwargs.get('review_id')
-        title_id = self.kwargs.get('title_id')
-        review = get_object_or_404(Review, pk=review_id, title__pk=title_id)
-        return review.comments.all()
+        # Без порядка страницы limit/offset могут пересекаться.
+        return self.review.comments.order_by('pk')
+
+    @property
+    def cache_resource(self):
+        return f'comments:{self.kwargs.get("review_id")}'
 
     def perform_create(self, serializer):
-        review_id = self.kwargs.get('review_id')
-        new_review = get_object_or_404(Review, pk=review_id)
-        serializer.save(author=self.request.user, review=new_review)
+        serializer.save(author=self.request.user, review=self.review)
 
 
-class GenreViewSet(CreateDeleteListViewSet):
+class GenreViewSet(BulkWriteMixin, CachedResponseMixin,
+                   CreateDeleteListViewSet):
+    bulk_writer_class = GenreBulkWriter
+    cache_resource = 'genre'
     queryset = Genre.objects.all().order_by('id')
     serializer_class = GenreSerializer
     permission_classes = (AdminOrReadOnly,)
@@ -76,42 +106,128 @@ class GenreViewSet(CreateDeleteListViewSet):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, RowListMixin,
+                    viewsets.ModelViewSet):
+    row_serializer_class = ReviewRows
     serializer_class = ReviewSerializer
     permission_classes = (IsAuthenticatedOrReadOnly,
                           IsAuthorOrModer,)
-    pagination_class = LimitOffsetPagination
+    pagination_class = OptionalCursorPagination
 
-    def get_title(self):
+    @property
+    def cache_resource(self):
+        return f'reviews:{self.kwargs.get("title_id")}'
+
+    @cached_property
+    def title(self):
+        '''Произведение из URL, загружается один раз за запрос.'''
         return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        return self.title.reviews.order_by('pk')
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title())
+        serializer.save(author=self.request.user, title=self.title)
+
 
+RANKING_LIMIT = 10
+RANKING_MAX_LIMIT = 100
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all().annotate(
-        Avg('reviews__score')
+
+class TitleViewSet(BulkWriteMixin, CachedResponseMixin, RowListMixin,
+                   viewsets.ModelViewSet):
+    bulk_writer_class = TitleBulkWriter
+    row_serializer_class = TitleRows
+    cache_resource = 'title'
+    cache_dependencies = ('category', 'genre')
+    queryset = Title.objects.select_related('category').prefetch_related(
+        'genre'
     ).order_by('name')
     permission_classes = (IsAuthenticatedOrReadOnly, IsAdmin,)
-    pagination_class = PageNumberPagination
+    pagination_class = TitlePagination
     filterset_class = TitleFilterSet
+    lookup_value_regex = r'\d+'
 
     def get_serializer_class(self):
         if self.request.method in ('POST', 'PATCH', 'DELETE'):
             return TitleCreateSerialaizer
         return TitleSerializer
 
+    def get_cache_dependencies(self):
+        # В списке рейтинг меняет любой отзыв, в карточке — только свои.
+        if self.action == 'retrieve':
+            reviews = f'reviews:{self.kwargs[self.lookup_field]}'
+        else:
+            reviews = 'reviews'
+        dependencies = (*super().get_cache_dependencies(), reviews)
+        if self.action in ('top', 'trending'):
+            return (*dependencies, 'ranking')
+        return dependencies
+
+    @action(detail=False, methods=['get'])
+    def top(self, request):
+        '''Лучшие по взвешенному рейтингу (reviews.rankings).'''
+        return self.conditional_response(self.ranking, request, 'score')
+
+    @action(detail=False, methods=['get'])
+    def trending(self, request):
+        '''Самые обсуждаемые за последние дни.'''
+        return self.conditional_response(self.ranking, request, 'trending')
+
+    def ranking(self, request, field):
+        '''
+        Первые ?limit= произведений среза ?category= или ?genre=
+        из TitleRanking: чтение по индексу (срез, балл). Если заданы
+        оба, срез — жанр, категория проверяется у произведения.
+        '''
+        category, genre = (request.query_params.get(name)
+                           for name in ('category', 'genre'))
+        category_id = category_slugs.get(category) if category else None
+        genre_id = genre_slugs.get(genre) if genre else None
+        if (category and category_id is None) or (genre and genre_id is None):
+            return Response([])
+        if genre:
+            scope = TitleRanking.genre_scope(genre_id)
+        elif category:
+            scope = TitleRanking.category_scope(category_id)
+        else:
+            scope = TitleRanking.ALL
+        queryset = Title.objects.filter(rankings__scope=scope)
+        if genre and category:
+            queryset = queryset.filter(category_id=category_id)
+        rows = RankedTitleRows(self.get_serializer(), field)
+        queryset = rows.values(queryset.order_by(
+            f'-rankings__{field}', 'pk'
+        ))[:self.get_ranking_limit()]
+        return Response(rows.to_representation(list(queryset),
+                                               using=queryset.db))
+
+    def get_ranking_limit(self):
+        try:
+            limit = int(self.request.query_params['limit'])
+        except (KeyError, ValueError):
+            return RANKING_LIMIT
+        return min(max(limit, 1), RANKING_MAX_LIMIT)
+
+    @action(detail=True, methods=['get'])
+    def ratings(self, request, pk=None):
+        '''Распределение оценок: один запрос к десяти счётчикам.'''
+        histogram = ScoreHistogram.objects.filter(title_id=pk).first()
+        if histogram is None:
+            title = get_object_or_404(Title.objects.only('pk'), pk=pk)
+            histogram = ScoreHistogram(title=title)
+        return Response(ScoreHistogramSerializer(histogram).data)
+
 
 class ConfCodeView(APIView):
     '''
     При получении POST-запроса с email и username отправляет
     письмо с confirmation_code на email.
     '''
+    authentication_classes = ()
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (IPThrottle, EmailThrottle, UsernameThrottle)
+    throttle_scope = 'signup'
 
     def post(self, request):
         serializer = SignUpSerializer(data=request.data)
@@ -119,13 +235,12 @@ class ConfCodeView(APIView):
         user = serializer.save()
         email = serializer.validated_data.get('email')
         confirmation_code = default_token_generator.make_token(user)
-        send_mail(
+        queue_mail(
             subject='Код подтверждения регистрации',
             message='Вы зарегистрировались на YAMDB!'
                     f'Ваш код подтвержения: {confirmation_code}',
             from_email=settings.ADMIN_EMAIL,
             recipient_list=[email],
-            fail_silently=False,
         )
         return Response(serializer.validated_data, status=status.HTTP_200_OK)
 
@@ -135,7 +250,10 @@ class TokenView(APIView):
     При получении POST-запроса с username и confirmation_code
     возвращает JWT-токен.
     '''
+    authentication_classes = ()
     permission_classes = (AllowAny,)
+    throttle_classes = (IPThrottle, UsernameThrottle)
+    throttle_scope = 'token'
 
     def post(self, request):
         serializer = TokenSerializer(data=request.data)
@@ -147,13 +265,72 @@ class TokenView(APIView):
         if not default_token_generator.check_token(user, confirmation_code):
             return Response({'Неверный код'},
                             status=status.HTTP_400_BAD_REQUEST)
-        token = RefreshToken.for_user(user)
-        return Response({'token': token.access_token},
+        token = token_for_user(user)
+        return Response({'token': str(token.access_token)},
                         status=status.HTTP_200_OK)
 
 
+class ExportView(APIView):
+    '''
+    Полная выгрузка для аналитики потоком: ?output=ndjson
+    (по умолчанию) или ?output=csv. Память не зависит от размера таблицы.
+    '''
+    permission_classes = (IsRoleAdmin,)
+    export_model = None
+    export_name = None
+    export_fields = None
+
+    def get(self, request):
+        output = request.query_params.get('output', 'ndjson')
+        if output not in WRITERS:
+            return Response(
+                {'output': [f'Допустимые значения: {", ".join(WRITERS)}.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        # Ответ читается уже после выхода из view и middleware,
+        # поэтому базу (реплику) выбираем сейчас.
+        using = router.db_for_read(self.export_model)
+        return stream_export(self.export_name, self.export_rows(using),
+                             self.export_fields, output)
+
+
+class ExportTitlesView(ExportView):
+    '''Произведения с рейтингом, категорией и слагами жанров.'''
+    export_model = Title
+    export_name = 'titles'
+    export_fields = TITLE_FIELDS
+
+    def export_rows(self, using):
+        return export_titles(using)
+
+
+class ExportReviewsView(ExportView):
+    export_model = Review
+    export_name = 'reviews'
+    export_fields = REVIEW_FIELDS
+
+    def export_rows(self, using):
+        return export_reviews(using)
+
+
+class StatsView(APIView):
+    '''
+    Статистика запросов по эндпоинтам в этом процессе:
+    JSON или ?format=prometheus.
+    '''
+    permission_classes = (IsRoleAdmin,)
+    renderer_classes = (JSONRenderer, PrometheusRenderer)
+
+    def get(self, request):
+        return Response(collect_stats())
+
+
 class UserRegView(APIView):
+    # Частота проверяется до разбора данных, запросов к базе и письма.
+    authentication_classes = ()
     permission_classes = (AllowAny,)
+    throttle_classes = (IPThrottle, EmailThrottle, UsernameThrottle)
+    throttle_scope = 'signup'
 
     def post(self, request):
         serializer = SignUpSerializer(data=request.data)
@@ -176,12 +353,56 @@ class UsersViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get', 'patch'], url_path='me',
             url_name='me', permission_classes=(IsAuthenticated,))
     def about_me(self, request):
-        serializer = UserSerializer(request.user)
+        # Для GET request.user собран из токена: профиль берём из базы.
+        user = get_object_or_404(User, pk=request.user.pk)
+        serializer = UserSerializer(user)
         if request.method == 'PATCH':
             serializer = UserSerializer(
-                request.user, data=request.data, partial=True
+                user, data=request.data, partial=True
             )
             serializer.is_valid(raise_exception=True)
             serializer.save()
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'], permission_classes=(AllowAny,))
+    def reviews(self, request, username=None):
+        '''Отзывы пользователя, сначала новые.'''
+        return self.author_feed(ReviewFeedRows, ReviewSerializer,
+                                Review, self.get_author_id(username))
+
+    @action(detail=True, methods=['get'], permission_classes=(AllowAny,))
+    def comments(self, request, username=None):
+        '''Комментарии пользователя, сначала новые.'''
+        return self.author_feed(CommentFeedRows, CommentSerializer,
+                                Comment, self.get_author_id(username))
+
+    @action(detail=False, methods=['get'], url_path='me/reviews',
+            url_name='me-reviews', permission_classes=(IsAuthenticated,))
+    def my_reviews(self, request):
+        return self.author_feed(ReviewFeedRows, ReviewSerializer,
+                                Review, request.user.pk)
+
+    @action(detail=False, methods=['get'], url_path='me/comments',
+            url_name='me-comments', permission_classes=(IsAuthenticated,))
+    def my_comments(self, request):
+        return self.author_feed(CommentFeedRows, CommentSerializer,
+                                Comment, request.user.pk)
+
+    def get_author_id(self, username):
+        return get_object_or_404(
+            User.objects.values_list('pk', flat=True), username=username
+        )
+
+    def author_feed(self, rows_class, serializer_class, model, author_id):
+        '''
+        Курсорная страница по индексу (author, pub_date, id): одним
+        запросом вместе с названием произведения, без OFFSET.
+        '''
+        rows = rows_class(serializer_class())
+        queryset = rows.values(model.objects.filter(author_id=author_id))
+        paginator = AuthorFeedPagination()
+        page = paginator.paginate_queryset(queryset, self.request, view=self)
+        return paginator.get_paginated_response(
+            rows.to_representation(page)
+        )
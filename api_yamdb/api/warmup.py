@@ -0,0 +1,47 @@
+import inspect
+import time
+
+from api import serializers
+from django.apps import apps
+from django.core.cache import caches
+from django.db import connections
+from django.urls import get_resolver
+from rest_framework.serializers import BaseSerializer, ModelSerializer
+
+
+def serializer_classes():
+    '''Сериализаторы api.serializers, кроме базовых без Meta.model.'''
+    return [
+        value for value in vars(serializers).values()
+        if inspect.isclass(value) and issubclass(value, BaseSerializer)
+        and value.__module__ == serializers.__name__
+        and (not issubclass(value, ModelSerializer)
+             or hasattr(getattr(value, 'Meta', None), 'model'))
+    ]
+
+
+def warm_up():
+    '''
+    Заранее собирает то, что иначе собирается на первых запросах
+    воркера: URL-резолвер, метаданные моделей и поля сериализаторов.
+    При preload прогрев идёт в мастер-процессе gunicorn до fork, поэтому
+    открытые при нём соединения с базой и кэшем закрываются.
+    '''
+    started = time.perf_counter()
+    resolver = get_resolver()
+    resolver.reverse_dict
+    models = apps.get_models()
+    for model in models:
+        model._meta.get_fields()
+    classes = serializer_classes()
+    for serializer_class in classes:
+        serializer_class().fields
+    connections.close_all()
+    for cache in caches.all():
+        cache.close()
+    return {
+        'urls': len(resolver.reverse_dict),
+        'models': len(models),
+        'serializers': len(classes),
+        'ms': round((time.perf_counter() - started) * 1000, 1),
+    }
@@ -1,7 +1,13 @@
 import os
 
-from django.core.asgi import get_asgi_application
+from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
-application = get_asgi_application()
+wsgi_application = get_wsgi_application()
+
+# В Django 2.2 нет django.core.asgi: ASGI-сервер (uvicorn) работает
+# с тем же WSGI-обработчиком через пул потоков, см. api.asgi.
+from api.asgi import AsgiApplication  # noqa: E402
+
+application = AsgiApplication(wsgi_application)
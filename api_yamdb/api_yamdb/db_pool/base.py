@@ -0,0 +1,183 @@
+'''
+Бэкенд PostgreSQL с пулом соединений внутри процесса.
+
+Django закрывает соединение в конце запроса (CONN_MAX_AGE = 0), а этот
+бэкенд вместо закрытия возвращает его в пул, общий для всех потоков
+процесса. Так потоковые воркеры gunicorn держат не больше
+POOL['MAX_SIZE'] соединений на процесс, а не по соединению на поток.
+'''
+import threading
+from collections import Counter
+
+from django.db import OperationalError
+from django.db.backends.postgresql import base, creation
+from psycopg2 import extensions
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    '''Соединения psycopg2 одной базы; ждёт свободное до timeout секунд.'''
+
+    def __init__(self, max_size, timeout, health_checks):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_checks = health_checks
+        self.idle = []
+        self.in_use = 0
+        self.slots = threading.BoundedSemaphore(max_size)
+        self.lock = threading.Lock()
+        self.counters = Counter()
+
+    def acquire(self, connect):
+        if not self.slots.acquire(blocking=False):
+            self.counters['waits'] += 1
+            if not self.slots.acquire(timeout=self.timeout):
+                self.counters['timeouts'] += 1
+                raise OperationalError(
+                    f'Нет свободных соединений в пуле за {self.timeout} с.'
+                )
+        try:
+            connection = self.take_idle()
+            if connection is None:
+                connection = connect()
+                self.counters['created'] += 1
+            else:
+                self.counters['reused'] += 1
+        except Exception:
+            self.slots.release()
+            raise
+        with self.lock:
+            self.in_use += 1
+        return connection
+
+    def take_idle(self):
+        while True:
+            with self.lock:
+                if not self.idle:
+                    return None
+                connection = self.idle.pop()
+            if self.usable(connection):
+                return connection
+            self.discard(connection)
+
+    def usable(self, connection):
+        if connection.closed:
+            return False
+        if not self.health_checks:
+            return True
+        try:
+            connection.cursor().execute('SELECT 1')
+        except Exception:
+            return False
+        return True
+
+    def release(self, connection, discard=False):
+        try:
+            status = connection.info.transaction_status
+            if discard or connection.closed:
+                self.discard(connection)
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+                self.put_idle(connection)
+            else:
+                self.put_idle(connection)
+        except Exception:
+            self.discard(connection)
+        finally:
+            with self.lock:
+                self.in_use -= 1
+            self.slots.release()
+
+    def put_idle(self, connection):
+        with self.lock:
+            self.idle.append(connection)
+
+    def discard(self, connection):
+        self.counters['discarded'] += 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection in idle:
+            connection.close()
+
+    def stats(self):
+        with self.lock:
+            idle, in_use = len(self.idle), self.in_use
+        return {
+            'max_size': self.max_size,
+            'in_use': in_use,
+            'idle': idle,
+            **{name: self.counters[name] for name in (
+                'created', 'reused', 'discarded', 'waits', 'timeouts'
+            )},
+        }
+
+
+def pool_key(alias, settings_dict):
+    return (alias, *(settings_dict.get(name) for name in (
+        'HOST', 'PORT', 'NAME', 'USER'
+    )))
+
+
+def get_pool(alias, settings_dict):
+    key = pool_key(alias, settings_dict)
+    with pools_lock:
+        if key not in pools:
+            options = settings_dict.get('POOL', {})
+            pools[key] = ConnectionPool(
+                max_size=options.get('MAX_SIZE', 10),
+                timeout=options.get('TIMEOUT', 10),
+                health_checks=settings_dict.get('CONN_HEALTH_CHECKS', True),
+            )
+        return pools[key]
+
+
+def close_pools():
+    '''Закрывает свободные соединения всех пулов процесса.'''
+    with pools_lock:
+        current = list(pools.values())
+    for pool in current:
+        pool.close()
+
+
+def pool_stats():
+    '''{псевдоним базы: статистика пула} для /api/v1/stats/.'''
+    with pools_lock:
+        current = list(pools.items())
+    return {key[0]: pool.stats() for key, pool in current}
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # DROP DATABASE не пройдёт, пока в пуле есть соединения к ней.
+        close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def get_new_connection(self, conn_params):
+        pool = get_pool(self.alias, self.settings_dict)
+        connection = pool.acquire(
+            lambda: super(DatabaseWrapper, self).get_new_connection(
+                conn_params
+            )
+        )
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', connection.isolation_level
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            pool = get_pool(self.alias, self.settings_dict)
+            pool.release(self.connection, discard=self.errors_occurred)
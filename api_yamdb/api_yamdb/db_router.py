@@ -0,0 +1,52 @@
+import itertools
+import threading
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Можно ли текущему запросу читать с реплик. Включается в
+# api.middleware.ReplicaRoutingMiddleware только для безопасных
+# запросов к API.
+read_from_replicas = ContextVar('read_from_replicas', default=False)
+
+
+def weighted_cycle(replicas):
+    '''Бесконечный перебор {псевдоним: вес}: реплика с весом 2 — дважды.'''
+    return itertools.cycle([
+        alias for alias, weight in replicas.items() for _ in range(weight)
+    ])
+
+
+class ReplicaRouter:
+    '''
+    Чтения разрешённых запросов идут на реплики из
+    settings.DATABASE_REPLICAS по кругу с учётом весов, всё остальное —
+    на основную базу. После записи в запросе и внутри транзакции чтения
+    тоже идут на основную базу. Миграции выполняются только на ней.
+    '''
+
+    def __init__(self):
+        self.replicas = dict(settings.DATABASE_REPLICAS)
+        self.cycle = weighted_cycle(self.replicas)
+        self.lock = threading.Lock()
+
+    def db_for_read(self, model, **hints):
+        if not self.replicas or not read_from_replicas.get():
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        with self.lock:
+            return next(self.cycle)
+
+    def db_for_write(self, model, **hints):
+        # Запрос, который пишет, дальше читает свои изменения с основной.
+        read_from_replicas.set(False)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная база.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
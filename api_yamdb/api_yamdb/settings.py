@@ -27,6 +27,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.QueryStatsMiddleware',
+    'api.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -60,6 +62,18 @@ WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
 # Database
 
+# Сколько секунд держать соединение открытым между запросами
+# (0 — закрывать после каждого) и проверять ли открытое соединение при
+# первом обращении к нему в запросе (api.connections) и соединение,
+# которое запрос берёт из пула.
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', default=60))
+DB_CONN_HEALTH_CHECKS = (
+    os.getenv('DB_CONN_HEALTH_CHECKS', default='True') == 'True'
+)
+# Пул соединений внутри процесса для потоковых воркеров (только PostgreSQL):
+# соединения возвращаются в пул после каждого запроса.
+DB_POOL = os.getenv('DB_POOL', default='False') == 'True'
+
 DATABASES = {
     'default': {
         'ENGINE': os.getenv('DB_ENGINE', default="django.db.backends.postgresql"),
@@ -67,10 +81,68 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', default="postgres"),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default="postgres"),
         'HOST': os.getenv('DB_HOST', default="db"),
-        'PORT': os.getenv('DB_PORT', default="5432")
+        'PORT': os.getenv('DB_PORT', default="5432"),
+        'CONN_MAX_AGE': 0 if DB_POOL else DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
+        'POOL': {
+            'MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', default=10)),
+            'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', default=10)),
+        },
+    }
+}
+if DB_POOL and DATABASES['default']['ENGINE'].endswith('postgresql'):
+    DATABASES['default']['ENGINE'] = 'api_yamdb.db_pool'
+
+# Реплики только для чтения: DB_REPLICA_HOSTS=host1:5432,host2:5432,
+# веса для распределения запросов — DB_REPLICA_WEIGHTS=2,1.
+# Промахи общего кэша ответов (api.cache.CachedResponseMixin) и карты
+# слагов читают с основной базы, чтобы отставание реплики не попадало
+# в кэш для всех клиентов.
+DATABASE_REPLICAS = {}
+REPLICA_WEIGHTS = os.getenv('DB_REPLICA_WEIGHTS', default='').split(',')
+for number, address in enumerate(
+        filter(None, os.getenv('DB_REPLICA_HOSTS', default='').split(',')),
+        start=1):
+    host, _, port = address.strip().partition(':')
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    weight = REPLICA_WEIGHTS[number - 1:number]
+    DATABASE_REPLICAS[alias] = int(weight[0]) if weight and weight[0] else 1
+
+DATABASE_ROUTERS = ['api_yamdb.db_router.ReplicaRouter']
+# Сколько секунд после записи клиент читает только с основной базы.
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', default=5))
+
+
+# Cache
+
+# Версии ресурсов, кэш ответов, счётчики ограничения частоты и карты
+# слагов согласованы между процессами только через общий кэш: в
+# docker-compose это memcached. LocMemCache по умолчанию — только для
+# разработки в одном процессе.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='yamdb'),
     }
 }
 
+# Время жизни закэшированных ответов API, секунды.
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', default=300))
+# Время жизни версий ресурсов (ETag и ключи кэша ответов), секунды:
+# дольше этого не держится версия, не узнавшая о записи.
+API_CACHE_VERSION_TIMEOUT = int(
+    os.getenv('API_CACHE_VERSION_TIMEOUT', default=API_CACHE_TIMEOUT)
+)
+
 
 # Password validation
 
@@ -117,25 +189,72 @@ EMPTY = '-'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    # Лимиты регистрации и получения токена (api.throttling) по адресу
+    # клиента, почте и имени пользователя: '<число>/<s|m|h|d>',
+    # пустое значение — без ограничения. Счётчики хранятся в кэше.
+    'DEFAULT_THROTTLE_RATES': {
+        scope: os.getenv(f'THROTTLE_{scope.upper()}', default=rate) or None
+        for scope, rate in (
+            ('signup_ip', '20/h'),
+            ('signup_email', '5/h'),
+            ('signup_username', '5/h'),
+            ('token_ip', '60/m'),
+            ('token_username', '10/m'),
+        )
+    },
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', default=1)),
 }
+# Карты слагов жанров и категорий (api.slugs) перечитываются не реже
+# раза в столько секунд.
+SLUG_MAP_TIMEOUT = int(os.getenv('SLUG_MAP_TIMEOUT', default=5))
+# Рейтинг /titles/top/ и /titles/trending/ (reviews.rankings): вес
+# средней оценки в байесовском рейтинге и окно популярности в днях.
+RANKING_PRIOR_WEIGHT = float(os.getenv('RANKING_PRIOR_WEIGHT', default=10))
+RANKING_TRENDING_DAYS = int(os.getenv('RANKING_TRENDING_DAYS', default=7))
+# Списки произведений, отзывов и комментариев собираются из .values()
+# без сериализатора на каждый объект (api.rows).
+API_ROW_LISTS = os.getenv('API_ROW_LISTS', default='True') == 'True'
 
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
+# Сколько секунд процесс доверяет закэшированной версии токенов
+# пользователя: с общим кэшем отзыв виден сразу, с локальным — не позже.
+TOKEN_VERSION_CACHE_TIMEOUT = int(
+    os.getenv('TOKEN_VERSION_CACHE_TIMEOUT', default=60)
+)
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'tmp/email')
 EMAIL_HOST = 'localhost'
 EMAIL_PORT = 25
 ADMIN_EMAIL = 'admin@api_yamdb.com'
+# Письма ставятся в очередь и отправляются командой send_outbox.
+EMAIL_OUTBOX = os.getenv('EMAIL_OUTBOX', default='True') == 'True'
 
 LEN_OUTPUT = 100
+
+# Наибольшее число объектов в одном запросе к .../bulk/.
+BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', default=10000))
+
+# Потоков для выполнения запросов под ASGI-сервером (api_yamdb/asgi.py).
+ASGI_THREADS = int(os.getenv('ASGI_THREADS', default=32))
+
+# Статистика запросов по эндпоинтам (api.middleware.QueryStatsMiddleware).
+API_STATS_ENABLED = os.getenv('API_STATS_ENABLED', default='True') == 'True'
+# Запросы дольше или с большим числом SQL-запросов пишутся в лог api.stats.
+SLOW_REQUEST_MS = int(os.getenv('SLOW_REQUEST_MS', default=500))
+SLOW_REQUEST_QUERIES = int(os.getenv('SLOW_REQUEST_QUERIES', default=50))
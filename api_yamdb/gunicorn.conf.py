@@ -0,0 +1,90 @@
+'''
+Настройки gunicorn: gunicorn -c gunicorn.conf.py api_yamdb.wsgi:application.
+Все значения задаются переменными окружения GUNICORN_*.
+'''
+import multiprocessing
+import os
+
+
+def env_int(name, default):
+    return int(os.getenv(name, default=default))
+
+
+def env_bool(name, default):
+    return os.getenv(name, default=str(default)) == 'True'
+
+
+bind = os.getenv('GUNICORN_BIND', default='0:8000')
+
+# sync, gthread или асинхронные gevent / eventlet (ставятся отдельно).
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', default='gthread')
+workers = env_int('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1)
+threads = env_int('GUNICORN_THREADS', 4 if worker_class == 'gthread' else 1)
+worker_connections = env_int('GUNICORN_WORKER_CONNECTIONS', 1000)
+
+# Приложение загружается в мастер-процессе до fork: воркеры стартуют
+# быстрее и делят прогретую память с мастером.
+preload_app = env_bool('GUNICORN_PRELOAD', True)
+
+# Перезапуск воркера после max_requests запросов (0 — никогда), разброс
+# не даёт всем воркерам перезапуститься одновременно.
+max_requests = env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = env_int('GUNICORN_MAX_REQUESTS_JITTER',
+                              max_requests // 10)
+
+timeout = env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = env_int('GUNICORN_KEEPALIVE', 5)
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', default='info')
+
+warmup = env_bool('GUNICORN_WARMUP', True)
+
+
+def warm_up(log):
+    from api.warmup import warm_up
+
+    log.info('Прогрев приложения: %s', warm_up())
+
+
+def on_starting(server):
+    '''
+    Счётчики ограничения частоты запросов, версии и кэш ответов должны
+    быть общими для воркеров: с кэшем в памяти процесса лимиты
+    умножаются на число воркеров, а сброс кэша до других не доходит.
+    '''
+    if workers < 2:
+        return
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    from django.conf import settings
+
+    backend = settings.CACHES['default']['BACKEND']
+    if backend.endswith('.LocMemCache'):
+        raise RuntimeError(
+            f'Кэш в памяти процесса ({backend}) не работает с {workers} '
+            'воркерами: задайте общий кэш (CACHE_BACKEND, CACHE_LOCATION) '
+            'или GUNICORN_WORKERS=1.'
+        )
+
+
+def when_ready(server):
+    if warmup and preload_app:
+        warm_up(server.log)
+
+
+def post_worker_init(worker):
+    if warmup and not preload_app:
+        warm_up(worker.log)
+
+
+def post_fork(server, worker):
+    if worker_class == 'gevent':
+        try:
+            from psycogreen.gevent import patch_psycopg
+        except ImportError:
+            server.log.warning('psycogreen не установлен: запросы к '
+                               'PostgreSQL будут блокировать воркер gevent')
+        else:
+            patch_psycopg()
@@ -24,8 +24,9 @@ class GenreAdmin(admin.ModelAdmin):
 @admin.register(Title)
 class TitleAdmin(admin.ModelAdmin):
     list_display = ('pk', 'name', 'year',
-                    'description', 'category')
+                    'description', 'category', 'rating')
     list_editable = ('category',)
+    readonly_fields = ('rating', 'review_count', 'score_sum')
     search_fields = ('name',)
     list_filter = ('year',)
     empty_value_display = EMPTY
@@ -1,14 +1,66 @@
+from api.slugs import category_slugs, genre_slugs
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
 from django_filters import CharFilter, FilterSet, NumberFilter
 from reviews.models import Title
 
+# Должна совпадать с конфигурацией в индексе title_search_idx.
+SEARCH_CONFIG = 'russian'
+
 
 class TitleFilterSet(FilterSet):
     '''Фильтр для произведений'''
-    category = CharFilter(field_name='category__slug')
-    genre = CharFilter(field_name='genre__slug')
+    category = CharFilter(method='filter_category')
+    genre = CharFilter(method='filter_genre')
     name = CharFilter(field_name='name', lookup_expr='contains')
     year = NumberFilter(field_name='year')
+    search = CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ('category', 'genre', 'year', 'name')
+        fields = ('category', 'genre', 'year', 'name', 'search')
+
+    def filter_category(self, queryset, name, value):
+        '''Слаг переводится в id по карте слагов: без join с категориями.'''
+        category_id = category_slugs.get(value)
+        if category_id is None:
+            return queryset.none()
+        return queryset.filter(category_id=category_id)
+
+    def filter_genre(self, queryset, name, value):
+        '''По id жанра: join только с промежуточной таблицей.'''
+        genre_id = genre_slugs.get(value)
+        if genre_id is None:
+            return queryset.none()
+        return queryset.filter(genre=genre_id)
+
+    def filter_search(self, queryset, name, value):
+        '''
+        Полнотекстовый поиск по названию и описанию с сортировкой
+        по релевантности. На PostgreSQL выражение совпадает
+        с GIN-индексом title_search_idx, на других базах
+        используется поиск подстроки.
+        '''
+        if connection.vendor == 'postgresql':
+            return search_postgresql(queryset, value)
+        return search_fallback(queryset, value)
+
+
+def search_postgresql(queryset, value):
+    from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                                SearchVector)
+
+    vector = SearchVector('name', 'description', config=SEARCH_CONFIG)
+    query = SearchQuery(value, config=SEARCH_CONFIG)
+    return queryset.annotate(
+        search=vector, rank=SearchRank(vector, query)
+    ).filter(search=query).order_by('-rank', 'name')
+
+
+def search_fallback(queryset, value):
+    return queryset.filter(
+        Q(name__icontains=value) | Q(description__icontains=value)
+    ).annotate(
+        rank=Case(When(name__icontains=value, then=Value(1)),
+                  default=Value(0), output_field=IntegerField())
+    ).order_by('-rank', 'name')
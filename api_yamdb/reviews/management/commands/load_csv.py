@@ -0,0 +1,198 @@
+import csv
+import io
+import os
+from contextlib import contextmanager
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.ratings import rebuild_ratings
+from reviews.signals import titles_changed
+from user.models import User
+
+DEFAULT_DATA_DIR = os.path.join(settings.BASE_DIR, 'api', 'static', 'data')
+
+# Файлы в порядке зависимостей: (файл, модель, {колонка CSV: attname}).
+CSV_FILES = (
+    ('users.csv', User, {
+        'id': 'id', 'username': 'username', 'email': 'email',
+        'role': 'role', 'bio': 'bio', 'first_name': 'first_name',
+        'last_name': 'last_name',
+    }),
+    ('category.csv', Category, {'id': 'id', 'name': 'name', 'slug': 'slug'}),
+    ('genre.csv', Genre, {'id': 'id', 'name': 'name', 'slug': 'slug'}),
+    ('titles.csv', Title, {
+        'id': 'id', 'name': 'name', 'year': 'year',
+        'category': 'category_id',
+    }),
+    ('genre_title.csv', Title.genre.through, {
+        'id': 'id', 'title_id': 'title_id', 'genre_id': 'genre_id',
+    }),
+    ('review.csv', Review, {
+        'id': 'id', 'title_id': 'title_id', 'text': 'text',
+        'author': 'author_id', 'score': 'score', 'pub_date': 'pub_date',
+    }),
+    ('comments.csv', Comment, {
+        'id': 'id', 'review_id': 'review_id', 'text': 'text',
+        'author': 'author_id', 'pub_date': 'pub_date',
+    }),
+)
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+def can_copy(model, attnames):
+    '''
+    COPY возможен на PostgreSQL, если в CSV есть все NOT NULL поля:
+    значения по умолчанию Django подставляет сам, а не база.
+    '''
+    if connection.vendor != 'postgresql':
+        return False
+    return all(
+        field.attname in attnames or field.null
+        for field in model._meta.concrete_fields
+    )
+
+
+@contextmanager
+def keep_auto_dates(model):
+    '''Не даёт auto_now_add затереть даты из файла при bulk_create.'''
+    fields = [field for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now_add', False)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = 'Загружает данные из CSV-файлов api/static/data в базу.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=DEFAULT_DATA_DIR,
+            help='Каталог с CSV-файлами.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Количество строк в одной вставке.'
+        )
+        parser.add_argument(
+            '--no-copy', action='store_true',
+            help='Не использовать COPY даже на PostgreSQL.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.isdir(path):
+            raise CommandError(f'Каталог {path} не найден.')
+        self.batch_size = options['batch_size']
+        self.use_copy = not options['no_copy']
+        loaded_models = []
+        for filename, model, columns in CSV_FILES:
+            file_path = os.path.join(path, filename)
+            if not os.path.exists(file_path):
+                self.stdout.write(f'{filename}: файл не найден, пропущен.')
+                continue
+            with transaction.atomic():
+                loaded, skipped = self.load_file(file_path, model, columns)
+            loaded_models.append(model)
+            self.stdout.write(
+                f'{filename}: загружено {loaded}, пропущено {skipped}.'
+            )
+        self.reset_sequences(loaded_models)
+        if Review in loaded_models:
+            with transaction.atomic():
+                rebuild_ratings(batch_size=self.batch_size)
+        titles_changed.send(sender=self.__class__)
+        self.stdout.write(self.style.SUCCESS('Загрузка завершена.'))
+
+    def load_file(self, file_path, model, columns):
+        attnames = list(columns.values())
+        foreign_keys = {
+            field.attname: set(
+                field.related_model._default_manager.values_list(
+                    'pk', flat=True
+                )
+            )
+            for field in model._meta.concrete_fields
+            if field.is_relation and field.attname in attnames
+        }
+        counter = {'skipped': 0}
+
+        def rows():
+            with open(file_path, encoding='utf-8', newline='') as csv_file:
+                for record in csv.DictReader(csv_file):
+                    row = {columns[key]: value
+                           for key, value in record.items() if key in columns}
+                    for attname in foreign_keys:
+                        row[attname] = row[attname] or None
+                    if any(row[attname] is not None
+                           and int(row[attname]) not in ids
+                           for attname, ids in foreign_keys.items()):
+                        counter['skipped'] += 1
+                        continue
+                    yield row
+
+        if self.use_copy and can_copy(model, attnames):
+            loaded = self.copy_rows(model, attnames, rows())
+        else:
+            loaded = self.bulk_create_rows(model, rows())
+        return loaded, counter['skipped']
+
+    def copy_rows(self, model, attnames, rows):
+        quote = connection.ops.quote_name
+        table = quote(model._meta.db_table)
+        fields = ', '.join(map(quote, attnames))
+        # Пустая строка в CSV для COPY означает NULL, кроме этих колонок.
+        not_null = ', '.join(
+            quote(field.column) for field in model._meta.concrete_fields
+            if field.attname in attnames and not field.null
+        )
+        sql = (f'COPY {table} ({fields}) FROM STDIN '
+               f'WITH (FORMAT csv, FORCE_NOT_NULL ({not_null}))')
+        loaded = 0
+        with connection.cursor() as cursor:
+            for batch in batches(rows, self.batch_size):
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerows(
+                    [row[attname] for attname in attnames] for row in batch
+                )
+                buffer.seek(0)
+                cursor.copy_expert(sql, buffer)
+                loaded += len(batch)
+        return loaded
+
+    def bulk_create_rows(self, model, rows):
+        loaded = 0
+        with keep_auto_dates(model):
+            for batch in batches(rows, self.batch_size):
+                objects = [model(**row) for row in batch]
+                if model is User:
+                    for user in objects:
+                        user.password = make_password(None)
+                model.objects.bulk_create(objects)
+                loaded += len(objects)
+        return loaded
+
+    def reset_sequences(self, models):
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        if not statements:
+            return
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
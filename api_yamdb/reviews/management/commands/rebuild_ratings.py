@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from reviews.ratings import rebuild_ratings
+from reviews.signals import titles_changed
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает сохранённые рейтинги произведений по отзывам. '
+            'С --check только проверяет их.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Только проверить, ничего не изменяя.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Размер пачки при обновлении произведений.'
+        )
+
+    def handle(self, *args, **options):
+        check = options['check']
+        with transaction.atomic():
+            stale = rebuild_ratings(fix=not check,
+                                    batch_size=options['batch_size'])
+        if not stale:
+            self.stdout.write(self.style.SUCCESS('Рейтинги актуальны.'))
+            return
+        if check:
+            raise CommandError(
+                f'Рейтинги устарели у {len(stale)} произведений: '
+                + ', '.join(map(str, stale[:20]))
+            )
+        titles_changed.send(sender=self.__class__)
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитаны рейтинги {len(stale)} произведений.'
+        ))
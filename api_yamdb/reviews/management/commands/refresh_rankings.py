@@ -0,0 +1,50 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from reviews.rankings import refresh_rankings
+from reviews.signals import rankings_changed
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает рейтинг произведений для /titles/top/ '
+            'и /titles/trending/.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Размер пачки при записи рейтинга.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Пересчитывать постоянно с паузой --interval.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=300,
+            help='Пауза между пересчётами, секунды.'
+        )
+
+    def check_cache(self, loop):
+        '''
+        Версию рейтинга команда увеличивает в кэше. Кэш в памяти этого
+        процесса веб-воркеры не видят: ответы /titles/top/ обновятся
+        только по API_CACHE_VERSION_TIMEOUT.
+        '''
+        backend = settings.CACHES['default']['BACKEND']
+        if not backend.endswith('.LocMemCache'):
+            return
+        message = (f'Кэш в памяти процесса ({backend}) не виден веб-воркерам: '
+                   'задайте общий кэш (CACHE_BACKEND, CACHE_LOCATION).')
+        if loop:
+            raise CommandError(message)
+        self.stderr.write(message)
+
+    def handle(self, *args, **options):
+        self.check_cache(options['loop'])
+        while True:
+            rows = refresh_rankings(batch_size=options['batch_size'])
+            rankings_changed.send(sender=self.__class__)
+            self.stdout.write(f'Записано строк рейтинга: {rows}.')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
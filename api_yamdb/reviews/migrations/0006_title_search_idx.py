@@ -0,0 +1,30 @@
+from django.db import migrations
+
+CREATE_INDEX = '''
+CREATE INDEX title_search_idx ON reviews_title USING gin (
+    to_tsvector('russian'::regconfig,
+                COALESCE(name, '') || ' ' || COALESCE(description, ''))
+)
+'''
+DROP_INDEX = 'DROP INDEX IF EXISTS title_search_idx'
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_INDEX)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_pub_date_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:01
+
+import django.core.validators
+from django.db import migrations, models
+
+# Фильтр по жанру идёт от жанра к произведениям: в автоматической
+# промежуточной таблице нет индекса с genre_id в начале, который
+# покрывал бы и title_id.
+CREATE_GENRE_INDEX = (
+    'CREATE INDEX title_genre_genre_title_idx '
+    'ON reviews_title_genre (genre_id, title_id)'
+)
+DROP_GENRE_INDEX = 'DROP INDEX IF EXISTS title_genre_genre_title_idx'
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_score_histogram'),
+    ]
+
+    operations = [
+        # Одиночный индекс по году заменяет составной (year, name).
+        # Валидаторы те же, что в 0001_initial.
+        migrations.AlterField(
+            model_name='title',
+            name='year',
+            field=models.PositiveSmallIntegerField(help_text='Укажите дату выхода', validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(2022)], verbose_name='Дата выхода произведения'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['review', 'id'], name='comment_review_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['title', 'id'], name='review_title_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['name'], name='title_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', 'name'], name='title_category_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year', 'name'], name='title_year_name_idx'),
+        ),
+        migrations.RunSQL(CREATE_GENRE_INDEX, DROP_GENRE_INDEX),
+    ]
@@ -4,6 +4,9 @@ from django.db import models
 from django.utils import timezone
 from user.models import User
 
+RATING_FIELDS = ('rating', 'review_count', 'score_sum')
+SCORES = range(1, 11)
+
 
 class Genre(models.Model):
     '''Модель Жанры'''
@@ -49,7 +52,6 @@ class Title(models.Model):
                             verbose_name='Произведение',
                             help_text='Укажите название произведения')
     year = models.PositiveSmallIntegerField(
-        db_index=True,
         verbose_name='Дата выхода произведения',
         help_text='Укажите дату выхода',
         validators=(MinValueValidator(0),
@@ -70,15 +72,163 @@ class Title(models.Model):
                                  on_delete=models.SET_NULL,
                                  blank=True,
                                  null=True)
+    rating = models.FloatField(verbose_name='Рейтинг',
+                               help_text='Средняя оценка произведения',
+                               null=True,
+                               blank=True,
+                               editable=False)
+    review_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0,
+        editable=False)
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False)
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ('-year',)
+        # Список сортируется по названию, в том числе после фильтра
+        # по категории или году; (year, name) заменяет индекс по году.
+        indexes = [
+            models.Index(fields=('name',), name='title_name_idx'),
+            models.Index(fields=('category', 'name'),
+                         name='title_category_name_idx'),
+            models.Index(fields=('year', 'name'), name='title_year_name_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        '''
+        Поля рейтинга обновляются только сигналами отзывов,
+        поэтому при изменении произведения они не перезаписываются.
+        '''
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in RATING_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+
+class ScoreHistogram(models.Model):
+    '''
+    Число отзывов с каждой оценкой для произведения.
+    Обновляется сигналами отзывов, статистика считается по десяти
+    счётчикам без чтения таблицы отзывов.
+    '''
+    title = models.OneToOneField(Title,
+                                 on_delete=models.CASCADE,
+                                 primary_key=True,
+                                 related_name='score_histogram',
+                                 verbose_name='Произведение')
+    score_1 = models.PositiveIntegerField('Оценок 1', default=0)
+    score_2 = models.PositiveIntegerField('Оценок 2', default=0)
+    score_3 = models.PositiveIntegerField('Оценок 3', default=0)
+    score_4 = models.PositiveIntegerField('Оценок 4', default=0)
+    score_5 = models.PositiveIntegerField('Оценок 5', default=0)
+    score_6 = models.PositiveIntegerField('Оценок 6', default=0)
+    score_7 = models.PositiveIntegerField('Оценок 7', default=0)
+    score_8 = models.PositiveIntegerField('Оценок 8', default=0)
+    score_9 = models.PositiveIntegerField('Оценок 9', default=0)
+    score_10 = models.PositiveIntegerField('Оценок 10', default=0)
+
+    class Meta:
+        verbose_name = 'Распределение оценок'
+        verbose_name_plural = 'Распределения оценок'
+
+    def __str__(self):
+        return f'{self.title_id}: {self.counts}'
+
+    @staticmethod
+    def field_name(score):
+        return f'score_{score}'
+
+    @property
+    def counts(self):
+        return [getattr(self, self.field_name(score)) for score in SCORES]
+
+    @property
+    def histogram(self):
+        return {str(score): count for score, count in zip(SCORES, self.counts)}
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    @property
+    def mean(self):
+        count = self.count
+        if not count:
+            return None
+        return sum(
+            score * number for score, number in zip(SCORES, self.counts)
+        ) / count
+
+    @property
+    def median(self):
+        count = self.count
+        if not count:
+            return None
+        middle = [(count - 1) // 2, count // 2]
+        values = []
+        seen = 0
+        for score, number in zip(SCORES, self.counts):
+            while middle and middle[0] < seen + number:
+                values.append(score)
+                middle.pop(0)
+            seen += number
+        return sum(values) / 2
+
+
+class TitleRanking(models.Model):
+    '''
+    Готовый рейтинг произведений для /titles/top/ и /titles/trending/.
+    У произведения по строке на каждый срез: все произведения, его
+    категория и каждый жанр, поэтому первые N любого среза читаются
+    по индексу без агрегации отзывов. Пересчитывается командой
+    refresh_rankings (reviews.rankings).
+    '''
+    ALL = 'all'
+
+    title = models.ForeignKey(Title,
+                              on_delete=models.CASCADE,
+                              related_name='rankings',
+                              verbose_name='Произведение')
+    scope = models.CharField('Срез', max_length=32,
+                             help_text='all, category:<id> или genre:<id>')
+    score = models.FloatField('Взвешенный рейтинг')
+    trending = models.FloatField('Популярность за последние дни')
+
+    class Meta:
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Рейтинг произведений'
+        constraints = [
+            models.UniqueConstraint(fields=('scope', 'title'),
+                                    name='unique_ranking_scope_title'),
+        ]
+        indexes = [
+            models.Index(fields=('scope', '-score', 'title'),
+                         name='ranking_scope_score_idx'),
+            models.Index(fields=('scope', '-trending', 'title'),
+                         name='ranking_scope_trending_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.scope}: {self.title_id}'
+
+    @staticmethod
+    def category_scope(category_id):
+        return f'category:{category_id}'
+
+    @staticmethod
+    def genre_scope(genre_id):
+        return f'genre:{genre_id}'
+
 
 class Review(models.Model):
     '''Модель Отзыв'''
@@ -111,10 +261,31 @@ class Review(models.Model):
                 name='unique_author_title'
             )
         ]
+        indexes = [
+            models.Index(fields=('title', 'pub_date', 'id'),
+                         name='review_title_pub_date_idx'),
+            models.Index(fields=('title', 'id'), name='review_title_id_idx'),
+            # Лента отзывов автора (/users/{username}/reviews/).
+            models.Index(fields=('author', 'pub_date', 'id'),
+                         name='review_author_pub_date_idx'),
+            # Отзывы последних дней для популярности (refresh_rankings).
+            models.Index(fields=('pub_date',), name='review_pub_date_idx'),
+        ]
 
     def __str__(self):
         return self.text[:settings.LEN_OUTPUT]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_loaded_score()
+        return instance
+
+    def remember_loaded_score(self):
+        '''Запоминает оценку, учтённую в рейтинге произведения.'''
+        self._loaded_score = (self.__dict__.get('title_id'),
+                              self.__dict__.get('score'))
+
 
 class Comment(models.Model):
     '''Модель комментариев'''
@@ -135,6 +306,15 @@ class Comment(models.Model):
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(fields=('review', 'pub_date', 'id'),
+                         name='comment_review_pub_date_idx'),
+            models.Index(fields=('review', 'id'),
+                         name='comment_review_id_idx'),
+            # Лента комментариев автора (/users/{username}/comments/).
+            models.Index(fields=('author', 'pub_date', 'id'),
+                         name='comment_author_pub_date_idx'),
+        ]
 
     def __str__(self):
         return self.text[:settings.LEN_OUTPUT]
@@ -0,0 +1,98 @@
+'''
+Пересчёт таблицы TitleRanking.
+
+Взвешенный рейтинг — байесовское среднее: к оценкам произведения
+добавляется prior_weight средних оценок по всем отзывам, поэтому одна
+десятка не поднимает произведение выше оценённых многими. Считается
+по сохранённым сумме и числу оценок произведений, без чтения отзывов.
+
+Популярность — скорость появления отзывов: их число за последние
+trending_days дней, где отзыв весит тем меньше, чем он старше, и перестаёт
+учитываться в конце окна. Оценки на популярность не влияют: обсуждаемое
+произведение может быть и плохим.
+'''
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import Review, Title, TitleRanking
+
+
+def bayesian_score(total, count, mean, prior_weight):
+    return (prior_weight * mean + total) / (prior_weight + count)
+
+
+def collect_trending(now, days):
+    '''{id произведения: популярность} по отзывам за последние days дней.'''
+    window = timedelta(days=days)
+    seconds = window.total_seconds()
+    trending = defaultdict(float)
+    reviews = Review.objects.filter(pub_date__gt=now - window).values_list(
+        'title_id', 'pub_date'
+    )
+    for title_id, pub_date in reviews.iterator():
+        age = (now - pub_date).total_seconds()
+        trending[title_id] += min(1.0, 1 - age / seconds)
+    return trending
+
+
+def collect_genres():
+    genres = defaultdict(list)
+    for title_id, genre_id in Title.genre.through.objects.values_list(
+        'title_id', 'genre_id'
+    ).iterator():
+        genres[title_id].append(genre_id)
+    return genres
+
+
+def build_rankings(now, prior_weight, trending_days):
+    '''Строки рейтинга для всех произведений, у которых есть отзывы.'''
+    totals = Title.objects.aggregate(total=Sum('score_sum'),
+                                     count=Sum('review_count'))
+    if not totals['count']:
+        return []
+    mean = totals['total'] / totals['count']
+    trending = collect_trending(now, trending_days)
+    genres = collect_genres()
+    titles = Title.objects.filter(review_count__gt=0).values_list(
+        'pk', 'score_sum', 'review_count', 'category_id'
+    )
+    rankings = []
+    for title_id, total, count, category_id in titles.iterator():
+        scopes = [TitleRanking.ALL]
+        if category_id is not None:
+            scopes.append(TitleRanking.category_scope(category_id))
+        scopes.extend(map(TitleRanking.genre_scope, genres[title_id]))
+        score = bayesian_score(total, count, mean, prior_weight)
+        rankings.extend(
+            TitleRanking(title_id=title_id, scope=scope, score=score,
+                         trending=trending.get(title_id, 0.0))
+            for scope in scopes
+        )
+    return rankings
+
+
+def refresh_rankings(now=None, prior_weight=None, trending_days=None,
+                     batch_size=1000):
+    '''
+    Заменяет рейтинг целиком в одной транзакции: читатели видят старый
+    рейтинг до коммита. Возвращает число записанных строк.
+    '''
+    rankings = build_rankings(
+        now or timezone.now(),
+        settings.RANKING_PRIOR_WEIGHT if prior_weight is None
+        else prior_weight,
+        trending_days or settings.RANKING_TRENDING_DAYS,
+    )
+    table = connection.ops.quote_name(TitleRanking._meta.db_table)
+    with transaction.atomic():
+        # Не QuerySet.delete(): из-за общих обработчиков post_delete
+        # он загружает и удаляет строки по одной пачке.
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {table}')
+        TitleRanking.objects.bulk_create(rankings, batch_size=batch_size)
+    return len(rankings)
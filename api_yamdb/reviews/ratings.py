@@ -0,0 +1,156 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, FloatField, Sum
+from django.db.models.functions import Cast, NullIf
+
+from .models import SCORES, Review, ScoreHistogram, Title
+
+HISTOGRAM_FIELDS = tuple(ScoreHistogram.field_name(score) for score in SCORES)
+
+
+def change_title_rating(title_id, score_delta, count_delta):
+    '''
+    Атомарно сдвигает сумму оценок и число отзывов произведения
+    и пересчитывает рейтинг в одном UPDATE без чтения отзывов.
+    '''
+    Title.objects.filter(pk=title_id).update(
+        score_sum=F('score_sum') + score_delta,
+        review_count=F('review_count') + count_delta,
+        rating=(
+            Cast(F('score_sum') + score_delta, FloatField())
+            / NullIf(F('review_count') + count_delta, 0)
+        ),
+    )
+
+
+def collect_ratings(title_ids=None):
+    '''Считает по таблице отзывов (сумма, количество) для произведений.'''
+    reviews = Review.objects.all()
+    if title_ids is not None:
+        reviews = reviews.filter(title_id__in=title_ids)
+    rows = reviews.order_by().values('title_id').annotate(
+        total=Sum('score'), count=Count('id')
+    )
+    return {row['title_id']: (row['total'], row['count']) for row in rows}
+
+
+def rating_fields(total, count):
+    return {
+        'score_sum': total,
+        'review_count': count,
+        'rating': total / count if count else None,
+    }
+
+
+def recount_title_rating(title_id):
+    '''Полностью пересчитывает рейтинг одного произведения.'''
+    total, count = collect_ratings([title_id]).get(title_id, (0, 0))
+    Title.objects.filter(pk=title_id).update(**rating_fields(total, count))
+
+
+def change_score_histogram(title_id, old_score=None, new_score=None,
+                           recount=True):
+    '''
+    Переносит один отзыв между счётчиками оценок произведения.
+    Если распределения ещё нет и recount=True, оно строится по отзывам.
+    '''
+    if old_score == new_score:
+        return
+    changes = {}
+    if old_score is not None:
+        field = ScoreHistogram.field_name(old_score)
+        changes[field] = F(field) - 1
+    if new_score is not None:
+        field = ScoreHistogram.field_name(new_score)
+        changes[field] = F(field) + 1
+    updated = ScoreHistogram.objects.filter(title_id=title_id).update(
+        **changes
+    )
+    if not updated and recount:
+        recount_score_histogram(title_id)
+
+
+def collect_histograms(title_ids=None):
+    '''Считает по таблице отзывов {id произведения: {поле: количество}}.'''
+    reviews = Review.objects.all()
+    if title_ids is not None:
+        reviews = reviews.filter(title_id__in=title_ids)
+    rows = reviews.order_by().values('title_id', 'score').annotate(
+        count=Count('id')
+    )
+    histograms = {}
+    for row in rows:
+        histogram = histograms.setdefault(
+            row['title_id'], dict.fromkeys(HISTOGRAM_FIELDS, 0)
+        )
+        histogram[ScoreHistogram.field_name(row['score'])] = row['count']
+    return histograms
+
+
+def recount_score_histogram(title_id):
+    '''Полностью пересчитывает распределение оценок одного произведения.'''
+    counts = collect_histograms([title_id]).get(title_id, {})
+    try:
+        with transaction.atomic():
+            ScoreHistogram.objects.update_or_create(
+                title_id=title_id, defaults=counts
+            )
+    except IntegrityError:
+        # Распределение одновременно создал другой запрос.
+        ScoreHistogram.objects.filter(title_id=title_id).update(**counts)
+
+
+def rebuild_histograms(fix=True, batch_size=1000):
+    '''
+    Сверяет распределения оценок с отзывами, создаёт недостающие.
+    Возвращает список id произведений с расхождениями.
+    '''
+    actual = collect_histograms()
+    stale = []
+    histograms = ScoreHistogram.objects.order_by('pk')
+    for histogram in histograms.iterator(chunk_size=batch_size):
+        expected = actual.pop(histogram.pk, None) or dict.fromkeys(
+            HISTOGRAM_FIELDS, 0
+        )
+        if all(getattr(histogram, name) == value
+               for name, value in expected.items()):
+            continue
+        for name, value in expected.items():
+            setattr(histogram, name, value)
+        stale.append(histogram)
+    missing = [ScoreHistogram(title_id=title_id, **counts)
+               for title_id, counts in actual.items()]
+    if fix and stale:
+        ScoreHistogram.objects.bulk_update(stale, HISTOGRAM_FIELDS,
+                                           batch_size=batch_size)
+    if fix and missing:
+        ScoreHistogram.objects.bulk_create(missing)
+    return [histogram.title_id for histogram in stale + missing]
+
+
+def rebuild_ratings(fix=True, batch_size=1000):
+    '''
+    Сверяет сохранённые рейтинги и распределения оценок с отзывами.
+    Возвращает список id произведений с расхождениями;
+    при fix=True расхождения исправляются.
+    '''
+    actual = collect_ratings()
+    stale = []
+    titles = Title.objects.order_by('pk').only(
+        'pk', 'rating', 'review_count', 'score_sum'
+    )
+    for title in titles.iterator(chunk_size=batch_size):
+        total, count = actual.get(title.pk, (0, 0))
+        expected = rating_fields(total, count)
+        if all(getattr(title, name) == value
+               for name, value in expected.items()):
+            continue
+        for name, value in expected.items():
+            setattr(title, name, value)
+        stale.append(title)
+    if fix and stale:
+        Title.objects.bulk_update(
+            stale, ('rating', 'review_count', 'score_sum'),
+            batch_size=batch_size
+        )
+    stale_histograms = rebuild_histograms(fix=fix, batch_size=batch_size)
+    return sorted({title.pk for title in stale}.union(stale_histograms))
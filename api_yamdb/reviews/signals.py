@@ -0,0 +1,49 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .models import Review
+from .ratings import (change_score_histogram, change_title_rating,
+                      recount_score_histogram, recount_title_rating)
+
+# Отправляется после массовых изменений в обход сигналов моделей
+# (загрузка CSV, пересчёт рейтингов).
+titles_changed = Signal()
+# Отправляется после пересчёта TitleRanking.
+rankings_changed = Signal()
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw=False, **kwargs):
+    '''Учитывает новую или изменённую оценку в рейтинге произведения.'''
+    if raw:
+        return
+    old_title_id, old_score = getattr(instance, '_loaded_score',
+                                      (None, None))
+    if created:
+        change_title_rating(instance.title_id, instance.score, 1)
+        change_score_histogram(instance.title_id, new_score=instance.score)
+    elif old_title_id is None or old_score is None:
+        recount_title_rating(instance.title_id)
+        recount_score_histogram(instance.title_id)
+    elif old_title_id != instance.title_id:
+        change_title_rating(old_title_id, -old_score, -1)
+        change_score_histogram(old_title_id, old_score=old_score)
+        change_title_rating(instance.title_id, instance.score, 1)
+        change_score_histogram(instance.title_id, new_score=instance.score)
+    elif old_score != instance.score:
+        change_title_rating(instance.title_id, instance.score - old_score, 0)
+        change_score_histogram(instance.title_id, old_score, instance.score)
+    instance.remember_loaded_score()
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    '''
+    Срабатывает и для QuerySet.delete(), и для каскадного удаления
+    вместе с автором или произведением.
+    '''
+    change_title_rating(instance.title_id, -instance.score, -1)
+    # При каскадном удалении произведения распределение уже удалено,
+    # заново его создавать нельзя.
+    change_score_histogram(instance.title_id, old_score=instance.score,
+                           recount=False)
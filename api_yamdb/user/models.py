@@ -1,5 +1,5 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
 
 from .validators import validate_user
 
@@ -13,6 +13,9 @@ USER_ROLE = (
     (ADMIN, 'admin'),
 )
 
+# Поля, которые попадают в токен и определяют права доступа.
+ACCESS_FIELDS = ('role', 'is_staff', 'is_superuser', 'is_active')
+
 
 class User(AbstractUser):
     username = models.CharField(max_length=100,
@@ -45,10 +48,50 @@ class User(AbstractUser):
                             choices=USER_ROLE,
                             default=USER,
                             help_text='Роль пользователя')
+    token_version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Версия токенов',
+        help_text='Растёт при смене прав и отзывает выданные токены'
+    )
 
     def __str__(self):
         return self.username
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_loaded_access()
+        return instance
+
+    def remember_loaded_access(self):
+        '''Запоминает права, с которыми выдавались токены, и логин.'''
+        self._loaded_access = tuple(
+            self.__dict__.get(name) for name in ACCESS_FIELDS
+        )
+        self._loaded_username = self.__dict__.get('username')
+
+    def save(self, *args, **kwargs):
+        loaded = getattr(self, '_loaded_access', None)
+        access = tuple(self.__dict__.get(name) for name in ACCESS_FIELDS)
+        revoke = loaded is not None and loaded != access
+        if revoke:
+            # Увеличивается в базе: одновременные смены прав не дают
+            # одну и ту же версию.
+            self.token_version = models.F('token_version') + 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'token_version'}
+        loaded_username = getattr(self, '_loaded_username', None)
+        # Для сигналов: логин автора выводится в отзывах и комментариях.
+        self.username_changed = (loaded_username is not None
+                                 and loaded_username != self.username)
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            if revoke:
+                self.refresh_from_db(fields=('token_version',))
+        self.remember_loaded_access()
+
     @property
     def is_admin(self):
         return self.is_staff or self.role == ADMIN
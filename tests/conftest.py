@@ -1,9 +1,25 @@
 import sys
 from os.path import abspath, dirname, join
 
+import pytest
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
+    'tests.fixtures.fixture_user',
+    'tests.fixtures.fixture_data',
 ]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+
+    from api.slugs import category_slugs, genre_slugs
+
+    cache.clear()
+    # Карты слагов живут в процессе, а данные теста откатываются.
+    for slug_map in (category_slugs, genre_slugs):
+        slug_map.version = None
@@ -0,0 +1,63 @@
+import pytest
+
+
+def auth_client(user):
+    from api.authentication import token_for_user
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    token = token_for_user(user)
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.access_token}')
+    return client
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestAdmin', email='testadmin@yamdb.fake',
+        password='1234567', role='admin'
+    )
+
+
+@pytest.fixture
+def moderator(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestModerator', email='testmoder@yamdb.fake',
+        password='1234567', role='moderator'
+    )
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestUser', email='testuser@yamdb.fake',
+        password='1234567', role='user'
+    )
+
+
+@pytest.fixture
+def another_user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestUserAnother', email='testuseranother@yamdb.fake',
+        password='1234567', role='user'
+    )
+
+
+@pytest.fixture
+def admin_client(admin):
+    return auth_client(admin)
+
+
+@pytest.fixture
+def moderator_client(moderator):
+    return auth_client(moderator)
+
+
+@pytest.fixture
+def user_client(user):
+    return auth_client(user)
+
+
+@pytest.fixture
+def another_user_client(another_user):
+    return auth_client(another_user)
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+from django.core.wsgi import get_wsgi_application
+
+from api.asgi import AsgiApplication, AsgiClient
+from api.authentication import token_for_user
+
+
+@pytest.fixture
+def application():
+    application = AsgiApplication(get_wsgi_application(), threads=2)
+    yield application
+    application.close()
+
+
+async def gather(requests):
+    return await asyncio.gather(*requests)
+
+
+def run(*requests):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(gather(requests))
+    finally:
+        loop.close()
+
+
+# Запросы выполняются в потоках приложения со своими соединениями:
+# данные должны быть закоммичены.
+@pytest.mark.django_db(transaction=True)
+class TestAsgi:
+
+    def test_same_json_as_wsgi(self, application, client, title, review):
+        titles = '/api/v1/titles/'
+        reviews = f'{titles}{title.pk}/reviews/'
+        paths = (titles, f'{titles}{title.pk}/', f'{titles}?genre=drama',
+                 reviews, f'{reviews}{review.pk}/',
+                 f'{reviews}{review.pk}/comments/')
+        asgi = AsgiClient(application)
+        for path, response in zip(paths, run(*map(asgi.get, paths))):
+            expected = client.get(path)
+            assert response.status_code == expected.status_code == 200, (
+                f'Проверьте, что {path} отвечает под ASGI'
+            )
+            assert response.json() == expected.json(), (
+                f'Проверьте, что под ASGI {path} возвращает тот же JSON'
+            )
+
+    def test_concurrent_requests(self, application, title):
+        asgi = AsgiClient(application)
+        responses = run(*(asgi.get('/api/v1/titles/') for _ in range(10)))
+        assert {response.status_code for response in responses} == {200}
+
+    def test_head(self, application, title):
+        response, = run(AsgiClient(application).get(
+            f'/api/v1/titles/{title.pk}/', method='HEAD'
+        ))
+        # Тело ответа на HEAD отбрасывает ASGI-сервер.
+        assert response.status_code == 200
+        assert response.headers['content-type'] == 'application/json'
+
+    def test_unicode_path(self, application, django_user_model):
+        django_user_model.objects.create_user(username='Пётр',
+                                              email='petr@yamdb.fake')
+        response, = run(AsgiClient(application).get(
+            '/api/v1/users/Пётр/reviews/'
+        ))
+        assert response.status_code == 200, (
+            'Проверьте, что под ASGI работают пути не в ASCII'
+        )
+
+    def test_permissions(self, application, user, title):
+        reviews = f'/api/v1/titles/{title.pk}/reviews/'
+        data = {'text': 'Отзыв', 'score': 5}
+        anonymous, = run(AsgiClient(application).post(reviews, data))
+        assert anonymous.status_code == 401, (
+            'Проверьте, что под ASGI аноним не может оставить отзыв'
+        )
+        token = token_for_user(user).access_token
+        authorized = AsgiClient(application, authorization=f'Bearer {token}')
+        created, = run(authorized.post(reviews, data))
+        assert created.status_code == 201
+        assert created.json()['author'] == user.username
+
+    def test_streaming_export(self, application, admin, title):
+        token = token_for_user(admin).access_token
+        asgi = AsgiClient(application, authorization=f'Bearer {token}')
+        response, = run(asgi.get('/api/v1/export/titles/'))
+        assert response.status_code == 200
+        assert response.headers['content-type'].startswith(
+            'application/x-ndjson'
+        )
+        assert response.content.decode().count('\n') == 1
+
+    def test_lifespan(self, application):
+        messages = [{'type': 'lifespan.startup'},
+                    {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        run(application({'type': 'lifespan'}, receive, send))
+        assert sent == ['lifespan.startup.complete',
+                        'lifespan.shutdown.complete']
@@ -0,0 +1,99 @@
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+def user_queries(context):
+    return [query['sql'] for query in context.captured_queries
+            if '"user_user"' in query['sql']]
+
+
+# Версия токенов попадает в кэш после коммита.
+@pytest.mark.django_db(transaction=True)
+class TestStatelessAuthentication:
+
+    def test_token_claims(self, client, user):
+        response = client.post('/api/v1/auth/token/', {
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user),
+        })
+        assert response.status_code == 200
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {response.json()["token"]}'
+        )
+        assert client.get('/api/v1/users/me/').json()['role'] == 'user'
+
+    def test_safe_request_without_user_query(self, moderator_client, title):
+        with CaptureQueriesContext(connection) as context:
+            response = moderator_client.get(f'/api/v1/titles/{title.pk}/')
+        assert response.status_code == 200
+        assert not user_queries(context), (
+            'Проверьте, что GET-запрос не загружает пользователя из базы'
+        )
+
+    def test_version_loaded_on_cache_miss(self, user_client, title):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(f'/api/v1/titles/{title.pk}/')
+        assert response.status_code == 200
+        assert len(user_queries(context)) == 1
+        with CaptureQueriesContext(connection) as context:
+            user_client.get(f'/api/v1/titles/{title.pk}/')
+        assert not user_queries(context)
+
+    def test_role_change_revokes_tokens(self, admin, admin_client, user):
+        assert admin_client.get('/api/v1/users/').status_code == 200
+        admin.role = 'user'
+        admin.save()
+        assert admin_client.get('/api/v1/users/').status_code == 401, (
+            'Проверьте, что смена роли отзывает выданные токены'
+        )
+        assert admin_client.post('/api/v1/categories/', {
+            'name': 'Книга', 'slug': 'book'
+        }).status_code == 401
+
+    def test_concurrent_role_changes(self, admin, django_user_model):
+        first = django_user_model.objects.get(pk=admin.pk)
+        second = django_user_model.objects.get(pk=admin.pk)
+        first.role = 'moderator'
+        first.save()
+        second.is_staff = True
+        second.save()
+        assert second.token_version == 2, (
+            'Проверьте, что одновременные смены прав дают разные версии '
+            'токенов'
+        )
+        admin.refresh_from_db()
+        assert admin.token_version == 2
+
+    def test_rolled_back_change_keeps_tokens(self, admin, admin_client):
+        assert admin_client.get('/api/v1/users/').status_code == 200
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                admin.role = 'user'
+                admin.save()
+                raise RuntimeError
+        assert admin_client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что версия токенов в кэше не меняется, если '
+            'запись откатилась'
+        )
+
+    def test_profile_change_keeps_tokens(self, user, user_client):
+        user.bio = 'Новая биография'
+        user.save()
+        assert user_client.get('/api/v1/users/me/').status_code == 200
+
+    def test_deleted_user(self, user, user_client):
+        user.delete()
+        assert user_client.get('/api/v1/users/me/').status_code == 401
+
+    def test_token_without_claims(self, admin):
+        client = APIClient()
+        token = RefreshToken.for_user(admin)
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.access_token}')
+        assert client.get('/api/v1/users/').status_code == 200
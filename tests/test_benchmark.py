@@ -0,0 +1,62 @@
+import pytest
+from django.core.wsgi import get_wsgi_application
+
+from api import benchmark
+from api.asgi import AsgiApplication
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db
+class TestBenchmark:
+
+    def test_seed_and_run(self, tmp_path):
+        sizes = dict(benchmark.DEFAULT_SIZES, titles=5, users=4, reviews=3)
+        benchmark.seed(sizes)
+        assert Title.objects.count() == 5
+        assert Review.objects.count() == 15
+
+        results = benchmark.run(
+            benchmark.build_scenarios(), requests=3, warmup=1, cold=True
+        )
+        for name, row in results.items():
+            assert row['statuses'] == [200], (
+                f'Проверьте, что эндпоинт {name} отвечает без ошибок'
+            )
+            assert row['p50_ms'] <= row['p95_ms'] <= row['p99_ms']
+            assert row['queries'] is not None
+
+        path = str(tmp_path / 'baseline.json')
+        benchmark.dump({'endpoints': results}, path)
+        diff = benchmark.compare(results, benchmark.load(path)['endpoints'])
+        assert diff['title-list']['p95_ms'][2] == 0.0
+
+    # ASGI-приложение читает базу из своих потоков.
+    @pytest.mark.django_db(transaction=True)
+    def test_run_asgi(self):
+        benchmark.seed(dict(benchmark.DEFAULT_SIZES, titles=3, users=3,
+                            reviews=2))
+        application = AsgiApplication(get_wsgi_application(), threads=2)
+        try:
+            results = benchmark.run_asgi(
+                benchmark.build_scenarios(), application, requests=4,
+                warmup=1, concurrency=2, only=['title-list', 'signup'],
+            )
+        finally:
+            application.close()
+        assert list(results) == ['title-list', 'signup']
+        for name, row in results.items():
+            assert row['statuses'] == [200], (
+                f'Проверьте, что под ASGI эндпоинт {name} отвечает без ошибок'
+            )
+            assert row['requests'] == 4 and row['queries'] is None
+
+    def test_run_serialization(self):
+        benchmark.seed(dict(benchmark.DEFAULT_SIZES, titles=5, users=4,
+                            reviews=3))
+        results = benchmark.run_serialization(page_size=10, repeat=2)
+        assert list(results) == ['titles', 'reviews', 'comments']
+        for name, row in results.items():
+            assert row['identical'], (
+                f'Проверьте, что быстрый список {name} совпадает '
+                'с ответом сериализатора'
+            )
@@ -0,0 +1,170 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+
+
+def titles_payload(count, category='movie', genres=('drama', 'comedy')):
+    return [{'name': f'Фильм {i}', 'year': 2000 + i % 20,
+             'description': f'Описание {i}', 'category': category,
+             'genre': list(genres)} for i in range(count)]
+
+
+@pytest.mark.django_db
+class TestBulkWrite:
+
+    def test_titles_bulk_create(self, admin_client, category, genres):
+        payload = titles_payload(50)
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post('/api/v1/titles/bulk/', payload,
+                                         format='json')
+        assert response.status_code == 201, response.json()
+        data = response.json()
+        assert len(data) == 50
+        assert data[7]['name'] == 'Фильм 7'
+        assert data[7]['category']['slug'] == 'movie'
+        assert {genre['slug'] for genre in data[7]['genre']} == {
+            'drama', 'comedy'
+        }
+        assert Title.objects.count() == 50
+        assert Title.genre.through.objects.count() == 100
+        assert len(context.captured_queries) < 15, (
+            'Проверьте, что число запросов не зависит от размера списка'
+        )
+
+    def test_titles_bulk_errors(self, admin_client, category, genres, title):
+        payload = titles_payload(3)
+        payload[0]['category'] = 'unknown'
+        payload[1]['genre'] = ['drama', 'missing']
+        payload.append(dict(payload[2]))
+        payload.append({'name': title.name, 'year': title.year,
+                        'category': title.category.slug,
+                        'genre': ['drama']})
+        response = admin_client.post('/api/v1/titles/bulk/', payload,
+                                     format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert len(errors) == 5, (
+            'Проверьте, что ошибки возвращаются по каждому элементу'
+        )
+        assert 'category' in errors[0]
+        assert 'genre' in errors[1]
+        assert errors[2] == errors[3] and 'non_field_errors' in errors[2]
+        assert 'non_field_errors' in errors[4]
+        assert Title.objects.count() == 1, (
+            'Проверьте, что при ошибках ничего не сохраняется'
+        )
+
+    def test_titles_bulk_validation(self, admin_client, category, genres):
+        payload = titles_payload(2)
+        del payload[1]['name']
+        response = admin_client.post('/api/v1/titles/bulk/', payload,
+                                     format='json')
+        assert response.status_code == 400
+        assert response.json()[0] == {} and 'name' in response.json()[1]
+
+    def test_titles_bulk_update(self, admin_client, category, genres, title):
+        other = Category.objects.create(name='Книга', slug='book')
+        response = admin_client.patch('/api/v1/titles/bulk/', [
+            {'id': title.pk, 'name': 'Зелёная миля', 'category': 'book',
+             'genre': ['comedy']},
+        ], format='json')
+        assert response.status_code == 200, response.json()
+        title.refresh_from_db()
+        assert title.name == 'Зелёная миля' and title.year == 1994
+        assert title.category == other
+        assert list(title.genre.values_list('slug', flat=True)) == [
+            'comedy'
+        ]
+        response = admin_client.patch('/api/v1/titles/bulk/', [
+            {'name': 'Без id'}, {'id': 10 ** 6, 'name': 'Нет такого'},
+        ], format='json')
+        assert response.status_code == 400
+        assert 'id' in response.json()[0] and 'id' in response.json()[1]
+
+    def test_bulk_updates_cached_list(self, admin_client, client, category,
+                                      genres):
+        assert client.get('/api/v1/titles/').json()['count'] == 0
+        admin_client.post('/api/v1/titles/bulk/', titles_payload(3),
+                          format='json')
+        assert client.get('/api/v1/titles/').json()['count'] == 3, (
+            'Проверьте, что массовая загрузка сбрасывает кэш списков'
+        )
+
+    def test_genres_and_categories(self, admin_client, genres):
+        response = admin_client.post('/api/v1/genres/bulk/', [
+            {'name': 'Ужасы', 'slug': 'horror'},
+            {'name': 'Драма', 'slug': 'drama-2'},
+            {'name': 'Триллер', 'slug': 'horror'},
+        ], format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert 'slug' in errors[0] and 'slug' in errors[2]
+        assert 'name' in errors[1]
+
+        response = admin_client.post('/api/v1/categories/bulk/', [
+            {'name': 'Книга', 'slug': 'book'},
+            {'name': 'Музыка', 'slug': 'music'},
+        ], format='json')
+        assert response.status_code == 201
+        response = admin_client.patch('/api/v1/categories/bulk/', [
+            {'slug': 'book', 'name': 'Книги'},
+        ], format='json')
+        assert response.status_code == 200
+        assert Category.objects.get(slug='book').name == 'Книги'
+        assert not Genre.objects.filter(slug='horror').exists()
+
+    def test_concurrent_duplicate(self, admin_client, monkeypatch,
+                                  category):
+        from api.bulk import CategoryBulkWriter
+
+        prepare_create = CategoryBulkWriter.prepare_create
+        calls = []
+
+        def racing_prepare(writer):
+            # Первая проверка не видит категорию, созданную другим
+            # администратором одновременно с этим запросом.
+            objects = prepare_create(writer)
+            if not calls:
+                writer.errors = [{} for _ in writer.items]
+            calls.append(1)
+            return objects
+
+        monkeypatch.setattr(CategoryBulkWriter, 'prepare_create',
+                            racing_prepare)
+        response = admin_client.post('/api/v1/categories/bulk/', [
+            {'name': 'Книга', 'slug': 'book'},
+            {'name': 'Кино', 'slug': category.slug},
+        ], format='json')
+        assert response.status_code == 400, (
+            'Проверьте, что нарушение уникальности при одновременной '
+            'загрузке даёт 400 со списком ошибок, а не 500'
+        )
+        errors = response.json()
+        assert errors[0] == {} and 'slug' in errors[1]
+        assert not Category.objects.filter(slug='book').exists()
+
+    @pytest.mark.parametrize('resource', ['categories', 'genres'])
+    def test_reserved_slug(self, admin_client, resource):
+        response = admin_client.post(f'/api/v1/{resource}/', {
+            'name': 'Массовые', 'slug': 'bulk',
+        })
+        assert response.status_code == 400, (
+            'Проверьте, что слаг bulk нельзя занять: адрес '
+            f'{resource}/bulk/ отдан массовым операциям'
+        )
+        assert 'slug' in response.json()
+        response = admin_client.post(f'/api/v1/{resource}/bulk/', [
+            {'name': 'Массовые', 'slug': 'bulk'},
+        ], format='json')
+        assert response.status_code == 400
+        assert 'slug' in response.json()[0]
+
+    def test_bulk_permissions(self, client, user_client, category):
+        payload = [{'name': 'Книга', 'slug': 'book'}]
+        assert client.post('/api/v1/categories/bulk/', payload,
+                           content_type='application/json'
+                           ).status_code == 401
+        assert user_client.post('/api/v1/categories/bulk/', payload,
+                                format='json').status_code == 403
@@ -0,0 +1,92 @@
+import pytest
+from django.db import transaction
+
+from api.cache import cache_stats, get_versions
+from reviews.models import Category, Comment, Review
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+    def test_category_list_is_cached_and_invalidated(self, client, category):
+        response = client.get('/api/v1/categories/')
+        assert response['X-Cache'] == 'MISS'
+        response = client.get('/api/v1/categories/')
+        assert response['X-Cache'] == 'HIT', (
+            'Проверьте, что повторный запрос списка категорий берётся из кэша'
+        )
+        assert response.json()['count'] == 1
+
+        Category.objects.create(name='Книга', slug='book')
+        response = client.get('/api/v1/categories/')
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что изменение категорий сбрасывает кэш'
+        )
+        assert response.json()['count'] == 2
+        assert cache_stats(['category'])['category'] == {
+            'hits': 1, 'misses': 2
+        }
+
+    def test_query_string_is_part_of_key(self, client, category):
+        client.get('/api/v1/categories/')
+        response = client.get('/api/v1/categories/?search=Фильм')
+        assert response['X-Cache'] == 'MISS'
+
+    def test_title_cache_follows_reviews(self, client, title, user,
+                                         another_user):
+        url = f'/api/v1/titles/{title.pk}/'
+        client.get(url)
+        client.get('/api/v1/titles/')
+        assert client.get(url)['X-Cache'] == 'HIT'
+
+        Review.objects.create(title=title, author=user, text='!', score=4)
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что новый отзыв сбрасывает кэш произведения'
+        )
+        assert response.json()['rating'] == 4.0
+        assert client.get('/api/v1/titles/')['X-Cache'] == 'MISS'
+
+    def test_other_title_reviews_keep_detail_cache(self, client, title,
+                                                   category, user):
+        other = title.__class__.objects.create(
+            name='Другое', year=2000, category=category
+        )
+        url = f'/api/v1/titles/{title.pk}/'
+        client.get(url)
+        Review.objects.create(title=other, author=user, text='!', score=4)
+        assert client.get(url)['X-Cache'] == 'HIT', (
+            'Проверьте, что отзыв на другое произведение не сбрасывает '
+            'кэш карточки'
+        )
+
+    def test_genre_change_invalidates_titles(self, client, title, genres):
+        client.get('/api/v1/titles/')
+        title.genre.remove(genres[0])
+        response = client.get('/api/v1/titles/')
+        assert response['X-Cache'] == 'MISS'
+        assert len(response.json()['results'][0]['genre']) == 1
+
+
+@pytest.mark.django_db(transaction=True)
+class TestVersionsAfterCommit:
+
+    def test_review_versions_change_after_commit(self, title, user):
+        resources = ['reviews', f'reviews:{title.pk}']
+        with transaction.atomic():
+            Review.objects.create(title=title, author=user, text='!', score=4)
+            in_transaction = get_versions(resources)
+        assert get_versions(resources) != in_transaction, (
+            'Проверьте, что версии отзывов увеличиваются и после коммита: '
+            'до него другой запрос мог закэшировать старый список'
+        )
+
+    def test_comment_versions_change_after_commit(self, review, user):
+        comment = Comment.objects.create(review=review, author=user, text='!')
+        resources = [f'comments:{review.pk}']
+        with transaction.atomic():
+            comment.delete()
+            in_transaction = get_versions(resources)
+        assert get_versions(resources) != in_transaction, (
+            'Проверьте, что версии комментариев увеличиваются и после коммита'
+        )
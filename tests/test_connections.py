@@ -0,0 +1,150 @@
+import sys
+
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from psycopg2 import extensions
+
+from api.connections import POOL_ENGINE, connects, db_stats
+from api_yamdb.db_pool.base import ConnectionPool
+
+
+class FakeInfo:
+    transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+
+class FakeConnection:
+    closed = 0
+    broken = False
+
+    def __init__(self):
+        self.info = FakeInfo()
+        self.rolled_back = False
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql):
+        if self.broken:
+            raise RuntimeError('server closed the connection')
+
+    def rollback(self):
+        self.rolled_back = True
+        self.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+class TestConnectionPool:
+
+    def test_reuse(self):
+        pool = ConnectionPool(max_size=2, timeout=0.01, health_checks=True)
+        first = pool.acquire(FakeConnection)
+        pool.release(first)
+        assert pool.acquire(FakeConnection) is first, (
+            'Проверьте, что пул отдаёт возвращённое соединение повторно'
+        )
+        stats = pool.stats()
+        assert stats['created'] == 1 and stats['reused'] == 1
+        assert stats['in_use'] == 1 and stats['idle'] == 0
+
+    def test_max_size(self):
+        pool = ConnectionPool(max_size=1, timeout=0.01, health_checks=True)
+        pool.acquire(FakeConnection)
+        with pytest.raises(OperationalError):
+            pool.acquire(FakeConnection)
+        assert pool.stats()['timeouts'] == 1
+
+    def test_broken_connections_discarded(self):
+        pool = ConnectionPool(max_size=2, timeout=0.01, health_checks=True)
+        connection = pool.acquire(FakeConnection)
+        pool.release(connection)
+        connection.broken = True
+        assert pool.acquire(FakeConnection) is not connection, (
+            'Проверьте, что неработающее соединение не отдаётся из пула'
+        )
+        assert connection.closed and pool.stats()['discarded'] == 1
+
+    def test_open_transaction_rolled_back(self):
+        pool = ConnectionPool(max_size=1, timeout=0.01, health_checks=False)
+        connection = pool.acquire(FakeConnection)
+        connection.info.transaction_status = (
+            extensions.TRANSACTION_STATUS_INTRANS
+        )
+        pool.release(connection)
+        assert connection.rolled_back
+        pool.release(pool.acquire(FakeConnection), discard=True)
+        assert pool.stats()['idle'] == 0
+
+
+@pytest.mark.django_db
+class TestConnectionStats:
+
+    def test_stats_include_connections(self, admin_client):
+        data = admin_client.get('/api/v1/stats/').json()
+        assert 'default' in data['db'], (
+            'Проверьте, что статистика соединений есть в /api/v1/stats/'
+        )
+        assert 'conn_max_age' in data['db']['default']
+        text = admin_client.get('/api/v1/stats/?format=prometheus').content
+        assert b'yamdb_db_connects_total{alias="default"}' in text
+
+    @pytest.mark.django_db(transaction=True)
+    def test_health_check_once_per_request(self, client, title,
+                                           monkeypatch):
+        client.get('/api/v1/genres/')
+        checks = []
+        monkeypatch.setattr(connection, 'is_usable',
+                            lambda: checks.append(1) or True)
+        assert client.get('/api/v1/titles/').status_code == 200
+        assert checks == [1], (
+            'Проверьте, что открытое соединение проверяется один раз '
+            'за запрос, при первом обращении к базе'
+        )
+        cache.clear()
+        client.get('/api/v1/titles/')
+        assert checks == [1, 1]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_broken_connection_reopened(self, client, title):
+        if connection.vendor != 'postgresql':
+            pytest.skip('Соединение с базой SQLite в памяти не закрывается')
+        client.get('/api/v1/genres/')
+        broken = connection.connection
+        # Сервер закрывает соединение между запросами.
+        other = connection.get_new_connection(
+            connection.get_connection_params()
+        )
+        other.cursor().execute('SELECT pg_terminate_backend(%s)',
+                               [broken.get_backend_pid()])
+        other.close()
+        assert client.get('/api/v1/titles/').status_code == 200
+        assert connection.connection is not broken, (
+            'Проверьте, что неработающее соединение заменяется новым '
+            'до первого запроса к базе'
+        )
+
+    def test_pool_checkouts_are_not_connects(self, monkeypatch):
+        from api_yamdb.db_pool import base
+
+        monkeypatch.setitem(settings.DATABASES['default'], 'ENGINE',
+                            POOL_ENGINE)
+        monkeypatch.setattr(base, 'pool_stats', lambda: {
+            'default': {'created': 1, 'reused': 4},
+        })
+        monkeypatch.setitem(connects, 'default', 5)
+        stats = db_stats()['default']
+        assert stats['connects'] == 1, (
+            'Проверьте, что с пулом connects считает новые подключения '
+            'к серверу, а не взятия из пула'
+        )
+        assert stats['checkouts'] == 5
+
+    def test_stats_without_pool_backend(self, admin_client, monkeypatch):
+        # Без пула модуль с psycopg2 не импортируется.
+        monkeypatch.setitem(sys.modules, 'api_yamdb.db_pool.base', None)
+        response = admin_client.get('/api/v1/stats/')
+        assert response.status_code == 200
+        assert response.json()['db']['default']['pool'] is None
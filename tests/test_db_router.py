@@ -0,0 +1,111 @@
+import pytest
+from django.test import RequestFactory
+from rest_framework.response import Response
+
+from api.cache import CachedResponseMixin
+from api.middleware import ReplicaRoutingMiddleware
+from api.views import TitleViewSet
+from api_yamdb.db_router import ReplicaRouter, read_from_replicas
+from reviews.models import Title
+
+REPLICAS = {'replica_1': 2, 'replica_2': 1}
+
+
+@pytest.fixture(autouse=True)
+def replicas(settings):
+    settings.DATABASE_REPLICAS = REPLICAS
+
+
+@pytest.fixture
+def replicas_allowed():
+    token = read_from_replicas.set(True)
+    yield
+    read_from_replicas.reset(token)
+
+
+class TestReplicaRouter:
+
+    def test_weighted_round_robin(self, replicas_allowed):
+        router = ReplicaRouter()
+        chosen = [router.db_for_read(Title) for _ in range(6)]
+        assert chosen.count('replica_1') == 4, (
+            'Проверьте, что реплики выбираются по кругу с учётом весов'
+        )
+        assert chosen.count('replica_2') == 2
+
+    def test_reads_primary_by_default(self):
+        assert ReplicaRouter().db_for_read(Title) == 'default', (
+            'Проверьте, что без разрешения middleware чтение идёт '
+            'с основной базы'
+        )
+
+    def test_reads_primary_after_write(self, replicas_allowed):
+        router = ReplicaRouter()
+        assert router.db_for_write(Title) == 'default'
+        assert router.db_for_read(Title) == 'default'
+
+    def test_migrations_on_primary(self):
+        router = ReplicaRouter()
+        assert router.allow_migrate('default', 'reviews')
+        assert not router.allow_migrate('replica_1', 'reviews')
+
+    def test_without_replicas(self, settings, replicas_allowed):
+        settings.DATABASE_REPLICAS = {}
+        assert ReplicaRouter().db_for_read(Title) == 'default'
+
+
+class TestReplicaRoutingMiddleware:
+
+    def process(self, request, status=200):
+        middleware = ReplicaRoutingMiddleware(None)
+        seen = []
+
+        def get_response(request):
+            middleware.process_view(
+                request, TitleViewSet.as_view({'get': 'list'}), (), {}
+            )
+            seen.append(read_from_replicas.get())
+            return type('Response', (), {'status_code': status})()
+
+        middleware.get_response = get_response
+        middleware(request)
+        assert not read_from_replicas.get(), (
+            'Проверьте, что разрешение сбрасывается после запроса'
+        )
+        return seen[0]
+
+    def test_safe_requests_use_replicas(self):
+        factory = RequestFactory()
+        assert self.process(factory.get('/api/v1/titles/'))
+        assert not self.process(factory.post('/api/v1/titles/'))
+
+    def test_pin_after_write(self):
+        factory = RequestFactory()
+        auth = {'HTTP_AUTHORIZATION': 'Bearer writer'}
+        self.process(factory.post('/api/v1/titles/', **auth), status=400)
+        assert self.process(factory.get('/api/v1/titles/', **auth)), (
+            'Проверьте, что неуспешная запись не закрепляет клиента'
+        )
+        self.process(factory.post('/api/v1/titles/', **auth), status=201)
+        assert not self.process(factory.get('/api/v1/titles/', **auth)), (
+            'Проверьте, что после записи клиент читает с основной базы'
+        )
+        assert self.process(factory.get(
+            '/api/v1/titles/', HTTP_AUTHORIZATION='Bearer reader'
+        ))
+
+
+def test_cache_miss_reads_primary(replicas_allowed):
+    seen = []
+
+    def handler(request):
+        seen.append(read_from_replicas.get())
+        return Response(status=500)
+
+    view = CachedResponseMixin()
+    view.cache_resource = 'title'
+    view.build_response('version', handler, None)
+    assert seen == [False], (
+        'Проверьте, что ответ для общего кэша читается с основной базы, '
+        'а не с отстающей реплики'
+    )
@@ -27,3 +27,16 @@ class TestDockerfileCompose:
         assert re.search(r'image:\s+([a-zA-Z0-9]+)\/([a-zA-Z0-9_\.])+(\:[a-zA-Z0-9_-]+)?', docker_compose), (
             'Проверьте, что добавили сборку контейнера из образа на вашем DockerHub в файл docker-compose.yaml'
         )
+
+    def test_shared_cache(self):
+        with open(os.path.join(infra_dir_path, 'docker-compose.yaml')) as f:
+            docker_compose = f.read()
+        assert re.search(r'image:\s+memcached:', docker_compose), (
+            'Проверьте, что в docker-compose.yaml есть общий кэш memcached'
+        )
+        assert re.search(
+            r'CACHE_BACKEND:\s+django\.core\.cache\.backends\.memcached\.',
+            docker_compose
+        )
+        # web, outbox и rankings работают с одним кэшем.
+        assert docker_compose.count('environment: *shared-cache') == 3
@@ -0,0 +1,101 @@
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def test_reviews_not_modified(self, client, title, review, user):
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        response = client.get(url)
+        assert response.status_code == 200
+        etag = response['ETag']
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что при совпадении ETag возвращается 304'
+        )
+        assert response['ETag'] == etag
+        assert not context.captured_queries, (
+            'Проверьте, что ответ 304 не обращается к базе данных'
+        )
+
+        Review.objects.filter(pk=review.pk).first().delete()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что изменение отзывов меняет ETag'
+        )
+        assert response['ETag'] != etag
+
+    def test_version_expires(self, client, settings, monkeypatch, title,
+                             review):
+        settings.API_CACHE_VERSION_TIMEOUT = 60
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        etag = client.get(url)['ETag']
+        # Запись в другом процессе: до этого кэша сигнал не доходит.
+        Review.objects.filter(pk=review.pk).update(text='Изменён')
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        now = time.time()
+        monkeypatch.setattr(time, 'time', lambda: now + 61)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что версия ресурса устаревает '
+            'через API_CACHE_VERSION_TIMEOUT'
+        )
+        assert response.json()['results'][0]['text'] == 'Изменён'
+
+    def test_author_rename_changes_etag(self, client, title, review, user):
+        url = f'/api/v1/titles/{title.pk}/reviews/{review.pk}/'
+        etag = client.get(url)['ETag']
+        user.username = 'renamed'
+        user.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()['author'] == 'renamed'
+
+    def test_user_changes_keep_etag(self, client, title, review, user,
+                                    django_user_model):
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        etag = client.get(url)['ETag']
+        django_user_model.objects.create_user(username='newcomer',
+                                              email='newcomer@yamdb.fake')
+        user.bio = 'Новая биография'
+        user.role = 'moderator'
+        user.save()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304, (
+            'Проверьте, что регистрация и изменения профиля без смены '
+            'логина не сбрасывают кэш отзывов'
+        )
+
+    def test_commenter_rename_changes_etag(self, client, title, review,
+                                           admin):
+        url = f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+        Comment.objects.create(review=review, author=admin, text='Согласен')
+        etag = client.get(url)['ETag']
+        admin.username = 'renamed'
+        admin.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()['results'][0]['author'] == 'renamed'
+
+    def test_comments_etag(self, client, title, review, user):
+        url = f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+        etag = client.get(url)['ETag']
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        Comment.objects.create(review=review, author=user, text='Согласен')
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_titles_etag(self, client, title):
+        etag = client.get('/api/v1/titles/')['ETag']
+        response = client.get('/api/v1/titles/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        title.name = 'Новое название'
+        title.save()
+        response = client.get('/api/v1/titles/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
@@ -0,0 +1,79 @@
+import pytest
+from django.db import connection
+
+from api import benchmark, explain
+
+
+@pytest.mark.django_db
+class TestExplain:
+
+    def test_indexes(self):
+        with connection.cursor() as cursor:
+            indexes = {
+                table: connection.introspection.get_constraints(cursor, table)
+                for table in ('reviews_title', 'reviews_title_genre')
+            }
+        for table, name in (
+            ('reviews_title', 'title_name_idx'),
+            ('reviews_title', 'title_category_name_idx'),
+            ('reviews_title', 'title_year_name_idx'),
+            ('reviews_title_genre', 'title_genre_genre_title_idx'),
+        ):
+            assert name in indexes[table], (
+                f'Проверьте, что миграция создаёт индекс {name}'
+            )
+        assert indexes['reviews_title_genre'][
+            'title_genre_genre_title_idx'
+        ]['columns'] == ['genre_id', 'title_id']
+
+    def test_explain_endpoints(self):
+        # Третья страница списка должна существовать.
+        benchmark.seed(dict(benchmark.DEFAULT_SIZES, titles=25, users=4,
+                            reviews=2))
+        endpoints = explain.build_endpoints()
+        endpoints['title-list-name'] = ('/api/v1/titles/?name=ведение', False)
+        results = explain.explain_endpoints(endpoints, min_rows=0)
+        for name, result in results.items():
+            assert result['status'] == 200, (
+                f'Проверьте, что эндпоинт {name} отвечает без ошибок'
+            )
+            for query in result['queries']:
+                assert query['plan']
+        assert results['title-ratings']['queries']
+        if connection.vendor == 'postgresql':
+            # На таблице в одну страницу PostgreSQL может выбрать Seq Scan
+            # и при поиске по ключу: проверяется, что индекс применим.
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+            try:
+                scans = [explain.seq_scans(explain.explain(query['sql']))
+                         for query in results['title-ratings']['queries']]
+            finally:
+                with connection.cursor() as cursor:
+                    cursor.execute('RESET enable_seqscan')
+            assert scans == [[]] * len(scans)
+        else:
+            assert results['title-ratings']['flagged'] == []
+        if connection.vendor == 'postgresql':
+            # Поиск подстроки в названии читает таблицу целиком
+            # (SQLite вместо этого просматривает индекс по названию).
+            assert 'reviews_title' in results['title-list-name']['flagged']
+
+    def test_seq_scans(self, monkeypatch):
+        plans = {
+            'postgresql': (
+                ['Limit  (cost=0.28..3.00 rows=10 width=110)',
+                 '  ->  Seq Scan on reviews_title  (cost=0.00..143.00)',
+                 '  ->  Index Scan using title_name_idx on reviews_title'],
+                ['reviews_title'],
+            ),
+            'sqlite': (
+                ['SCAN TABLE reviews_title', 'SCAN reviews_genre',
+                 'SCAN reviews_title USING INDEX title_name_idx',
+                 'SEARCH reviews_category USING INTEGER PRIMARY KEY (rowid=?)'],
+                ['reviews_title', 'reviews_genre'],
+            ),
+        }
+        for vendor, (plan, tables) in plans.items():
+            monkeypatch.setattr(connection, 'vendor', vendor)
+            assert explain.seq_scans(plan) == tables
@@ -0,0 +1,55 @@
+import csv
+import io
+import json
+
+import pytest
+
+from reviews.models import Title
+
+
+def content(response):
+    assert response.streaming, (
+        'Проверьте, что выгрузка отдаётся потоком (StreamingHttpResponse)'
+    )
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    def test_titles_ndjson(self, admin_client, title, review, category):
+        Title.objects.create(name='Без жанров', year=2001, category=None)
+        response = admin_client.get('/api/v1/export/titles/')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        rows = [json.loads(line) for line in content(response).splitlines()]
+        assert len(rows) == 2
+        assert rows[0] == {
+            'id': title.pk, 'name': title.name, 'year': 1994,
+            'description': '', 'rating': 10.0, 'review_count': 1,
+            'category': 'movie', 'genre': ['comedy', 'drama'],
+        }
+        assert rows[1]['genre'] == [] and rows[1]['category'] is None
+
+    def test_titles_csv(self, admin_client, title):
+        response = admin_client.get('/api/v1/export/titles/?output=csv')
+        assert response['Content-Type'].startswith('text/csv')
+        rows = list(csv.DictReader(io.StringIO(content(response))))
+        assert len(rows) == 1
+        assert rows[0]['genre'] == 'comedy,drama'
+        assert rows[0]['rating'] == ''
+
+    def test_reviews(self, admin_client, review, user):
+        response = admin_client.get('/api/v1/export/reviews/')
+        row = json.loads(content(response))
+        assert row['author'] == user.username
+        assert row['score'] == 10 and row['title_id'] == review.title_id
+        response = admin_client.get('/api/v1/export/reviews/?output=csv')
+        rows = list(csv.DictReader(io.StringIO(content(response))))
+        assert rows[0]['text'] == review.text
+
+    def test_export_admin_only(self, client, user_client, admin_client):
+        assert client.get('/api/v1/export/titles/').status_code == 401
+        assert user_client.get('/api/v1/export/reviews/').status_code == 403
+        response = admin_client.get('/api/v1/export/titles/?output=xml')
+        assert response.status_code == 400
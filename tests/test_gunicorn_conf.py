@@ -0,0 +1,74 @@
+import multiprocessing
+import os
+import runpy
+
+import pytest
+from gunicorn.config import KNOWN_SETTINGS
+
+from api.warmup import warm_up
+
+from .conftest import root_dir
+
+CONFIG = os.path.join(root_dir, 'api_yamdb', 'gunicorn.conf.py')
+HELPERS = {'env_int', 'env_bool', 'warmup', 'warm_up'}
+
+
+def load(monkeypatch, **env):
+    for name in list(os.environ):
+        if name.startswith('GUNICORN_'):
+            monkeypatch.delenv(name)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_path(CONFIG)
+
+
+class TestGunicornConf:
+
+    def test_defaults(self, monkeypatch):
+        config = load(monkeypatch)
+        assert config['workers'] == multiprocessing.cpu_count() * 2 + 1
+        assert config['worker_class'] == 'gthread'
+        assert config['threads'] == 4
+        assert config['preload_app'] is True
+        assert config['max_requests'] == 1000
+        assert config['max_requests_jitter'] == 100
+        assert config['bind'] == '0:8000'
+
+    def test_env(self, monkeypatch):
+        config = load(
+            monkeypatch, GUNICORN_WORKERS='3', GUNICORN_WORKER_CLASS='gevent',
+            GUNICORN_PRELOAD='False', GUNICORN_MAX_REQUESTS='500',
+        )
+        assert config['workers'] == 3
+        assert config['threads'] == 1
+        assert config['preload_app'] is False
+        assert config['max_requests_jitter'] == 50
+
+    def test_only_known_settings(self, monkeypatch):
+        known = {setting.name for setting in KNOWN_SETTINGS}
+        unknown = {
+            name for name, value in load(monkeypatch).items()
+            if not name.startswith('_') and not hasattr(value, '__spec__')
+        } - known - HELPERS
+        assert not unknown, (
+            f'Проверьте названия настроек gunicorn: {sorted(unknown)}'
+        )
+
+    def test_requires_shared_cache(self, monkeypatch, settings):
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        with pytest.raises(RuntimeError):
+            load(monkeypatch, GUNICORN_WORKERS='3')['on_starting'](None)
+        load(monkeypatch, GUNICORN_WORKERS='1')['on_starting'](None)
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': 'memcached:11211',
+        }}
+        load(monkeypatch, GUNICORN_WORKERS='3')['on_starting'](None)
+
+
+@pytest.mark.django_db
+def test_warm_up():
+    stats = warm_up()
+    assert stats['urls'] and stats['models'] and stats['serializers']
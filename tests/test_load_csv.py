@@ -0,0 +1,29 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Comment, Genre, Review, Title
+from user.models import User
+
+
+@pytest.mark.django_db
+class TestLoadCsv:
+
+    @pytest.mark.parametrize('options', ([], ['--no-copy']))
+    def test_load_static_data(self, options):
+        call_command('load_csv', '--batch-size', '10', *options)
+
+        assert User.objects.count() == 5
+        assert Genre.objects.count() == 15
+        assert Title.objects.count() == 32
+        assert Title.genre.through.objects.count() == 42
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что дата публикации берётся из файла'
+        )
+        call_command('rebuild_ratings', '--check')
+        title = Title.objects.create(name='Новое', year=2000)
+        assert title.pk > 32, (
+            'Проверьте, что после загрузки сброшены последовательности id'
+        )
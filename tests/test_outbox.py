@@ -0,0 +1,186 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from api.models import OutgoingEmail
+
+
+class FailingBackend(BaseEmailBackend):
+
+    def send_messages(self, email_messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+class UnreachableBackend(BaseEmailBackend):
+
+    def open(self):
+        raise ConnectionRefusedError('SMTP не отвечает')
+
+    def send_messages(self, email_messages):
+        raise AssertionError('Соединение не открыто')
+
+
+class ClaimCheckingBackend(BaseEmailBackend):
+    '''Во время отправки письма пачки уже забраны у других обработчиков.'''
+    pending = None
+
+    def send_messages(self, email_messages):
+        ClaimCheckingBackend.pending = OutgoingEmail.objects.filter(
+            sent_at__isnull=True, send_after__lte=timezone.now()
+        ).count()
+        return len(email_messages)
+
+
+class StopLoop(Exception):
+    pass
+
+
+@pytest.mark.django_db
+class TestOutbox:
+
+    def test_signup_queues_email(self, client):
+        response = client.post('/api/v1/auth/signup/', data={
+            'username': 'newuser', 'email': 'newuser@yamdb.fake'
+        })
+        assert response.status_code == 200
+        assert not mail.outbox, (
+            'Проверьте, что регистрация не отправляет письмо в запросе'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.to == 'newuser@yamdb.fake'
+
+        call_command('send_outbox')
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ['newuser@yamdb.fake']
+        email.refresh_from_db()
+        assert email.sent_at is not None
+        assert email.body == '', (
+            'Проверьте, что код подтверждения не хранится после отправки'
+        )
+
+        call_command('send_outbox')
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что отправленные письма не отправляются повторно'
+        )
+
+    def test_failed_email_is_retried_later(self, settings, user):
+        from api.email import queue_mail
+
+        queue_mail('Тема', 'Текст', 'admin@yamdb.fake', [user.email])
+        settings.EMAIL_BACKEND = 'tests.test_outbox.FailingBackend'
+        call_command('send_outbox', '--retry-delay', '0')
+        email = OutgoingEmail.objects.get()
+        assert email.sent_at is None
+        assert email.attempts == 1
+        assert 'SMTP' in email.last_error
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        call_command('send_outbox')
+        email.refresh_from_db()
+        assert email.sent_at is not None
+        assert len(mail.outbox) == 1
+
+    def test_unreachable_smtp_postpones_batch(self, settings, user,
+                                              monkeypatch):
+        from api.email import queue_mail, send_outbox_batch
+
+        queue_mail('Тема', 'Текст', 'admin@yamdb.fake',
+                   [user.email, 'other@yamdb.fake'])
+        settings.EMAIL_BACKEND = 'tests.test_outbox.UnreachableBackend'
+        assert send_outbox_batch(retry_delay=60) == (0, 2)
+        for email in OutgoingEmail.objects.all():
+            assert email.sent_at is None
+            assert email.attempts == 1, (
+                'Проверьте, что ошибка соединения засчитывается '
+                'как попытка отправки'
+            )
+            assert 'SMTP не отвечает' in email.last_error
+        assert send_outbox_batch() == (0, 0), (
+            'Проверьте, что после ошибки соединения письма откладываются'
+        )
+
+        def sleep(seconds):
+            raise StopLoop
+
+        OutgoingEmail.objects.update(send_after=timezone.now())
+        monkeypatch.setattr(time, 'sleep', sleep)
+        with pytest.raises(StopLoop):
+            call_command('send_outbox', '--loop')
+        assert set(OutgoingEmail.objects.values_list(
+            'attempts', flat=True
+        )) == {2}
+
+    def test_batch_is_claimed_before_sending(self, settings, user):
+        from api.email import queue_mail, send_outbox_batch
+
+        queue_mail('Тема', 'Текст', 'admin@yamdb.fake',
+                   [user.email, 'other@yamdb.fake'])
+        settings.EMAIL_BACKEND = 'tests.test_outbox.ClaimCheckingBackend'
+        assert send_outbox_batch(lease=600) == (2, 0)
+        assert ClaimCheckingBackend.pending == 0, (
+            'Проверьте, что пачка забирается до отправки и другие '
+            'обработчики не берут те же письма'
+        )
+        assert not OutgoingEmail.objects.filter(sent_at__isnull=True).exists()
+
+    def test_last_attempt_clears_body(self, settings, user):
+        from api.email import queue_mail
+
+        queue_mail('Тема', 'Код', 'admin@yamdb.fake', [user.email])
+        settings.EMAIL_BACKEND = 'tests.test_outbox.FailingBackend'
+        call_command('send_outbox', '--max-attempts', '2')
+        assert OutgoingEmail.objects.get().body == 'Код'
+        OutgoingEmail.objects.update(send_after=timezone.now())
+        call_command('send_outbox', '--max-attempts', '2')
+        assert OutgoingEmail.objects.get().body == ''
+
+    def test_old_sent_emails_purged(self, user):
+        from api.email import queue_mail
+
+        queue_mail('Тема', 'Текст', 'admin@yamdb.fake',
+                   ['old@yamdb.fake', 'recent@yamdb.fake', 'new@yamdb.fake'])
+        now = timezone.now()
+        OutgoingEmail.objects.filter(to='old@yamdb.fake').update(
+            sent_at=now - timedelta(days=8)
+        )
+        OutgoingEmail.objects.filter(to='recent@yamdb.fake').update(
+            sent_at=now - timedelta(days=1)
+        )
+        call_command('send_outbox', '--keep-days', '7')
+        assert set(OutgoingEmail.objects.values_list('to', flat=True)) == {
+            'recent@yamdb.fake', 'new@yamdb.fake'
+        }, 'Проверьте, что send_outbox удаляет старые отправленные письма'
+
+    def test_old_dead_emails_purged(self, user):
+        from api.email import purge_outbox, queue_mail
+
+        queue_mail('Тема', 'Текст', 'admin@yamdb.fake',
+                   ['dead@yamdb.fake', 'recent@yamdb.fake',
+                    'retry@yamdb.fake'])
+        old = timezone.now() - timedelta(days=8)
+        OutgoingEmail.objects.filter(to='dead@yamdb.fake').update(
+            attempts=5, send_after=old
+        )
+        OutgoingEmail.objects.filter(to='recent@yamdb.fake').update(
+            attempts=5, send_after=timezone.now() - timedelta(days=1)
+        )
+        OutgoingEmail.objects.filter(to='retry@yamdb.fake').update(
+            attempts=2, send_after=old
+        )
+        assert purge_outbox(keep_days=7, max_attempts=5) == 1
+        assert set(OutgoingEmail.objects.values_list('to', flat=True)) == {
+            'recent@yamdb.fake', 'retry@yamdb.fake'
+        }, 'Проверьте, что удаляются старые письма, исчерпавшие попытки'
+
+    def test_outbox_can_be_disabled(self, settings, client):
+        settings.EMAIL_OUTBOX = False
+        client.post('/api/v1/auth/signup/', data={
+            'username': 'newuser', 'email': 'newuser@yamdb.fake'
+        })
+        assert len(mail.outbox) == 1
+        assert not OutgoingEmail.objects.exists()
@@ -0,0 +1,53 @@
+import pytest
+
+from reviews.models import Review
+
+
+@pytest.fixture
+def reviews(title, django_user_model):
+    return [
+        Review.objects.create(
+            title=title, text=f'Отзыв {i}', score=i + 1,
+            author=django_user_model.objects.create_user(
+                username=f'reviewer{i}', email=f'reviewer{i}@yamdb.fake'
+            )
+        )
+        for i in range(5)
+    ]
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    def test_limit_offset_is_default(self, client, title, reviews):
+        response = client.get(f'/api/v1/titles/{title.pk}/reviews/')
+        assert response.status_code == 200
+        assert response.json()['count'] == 5, (
+            'Проверьте, что по умолчанию отзывы выводятся через limit/offset'
+        )
+
+    def test_cursor_pages_through_reviews(self, client, title, reviews):
+        url = f'/api/v1/titles/{title.pk}/reviews/?pagination=cursor&limit=2'
+        seen = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что в курсорном режиме количество не считается '
+                'без параметра count'
+            )
+            seen.extend(item['id'] for item in data['results'])
+            url = data['next']
+        assert seen == [review.pk for review in reviews], (
+            'Проверьте, что курсорная пагинация упорядочена по (pub_date, id)'
+        )
+
+    def test_cursor_count_on_request(self, client, title, reviews):
+        response = client.get(
+            f'/api/v1/titles/{title.pk}/reviews/'
+            '?pagination=cursor&limit=2&count=true'
+        )
+        data = response.json()
+        assert data['count'] == 5
+        assert len(data['results']) == 2
@@ -0,0 +1,164 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from reviews.models import Category, Review, Title, TitleRanking
+from reviews.rankings import bayesian_score, refresh_rankings
+
+TOP = '/api/v1/titles/top/'
+TRENDING = '/api/v1/titles/trending/'
+
+
+@pytest.fixture
+def ranked(django_user_model, category, genres):
+    '''
+    Одна десятка у «Новинки» против пяти девяток у «Классики»;
+    у «Сериала» другая категория и жанр и два свежих плохих отзыва.
+    '''
+    users = [
+        django_user_model.objects.create_user(
+            username=f'critic{i}', email=f'critic{i}@yamdb.fake'
+        )
+        for i in range(5)
+    ]
+    series = Category.objects.create(name='Сериал', slug='series')
+    titles = {
+        name: Title.objects.create(name=name, year=2000, category=category)
+        for name in ('Новинка', 'Классика')
+    }
+    titles['Сериал'] = Title.objects.create(name='Сериал', year=2000,
+                                           category=series)
+    titles['Новинка'].genre.set(genres[:1])
+    titles['Классика'].genre.set(genres)
+    titles['Сериал'].genre.set(genres[1:])
+    Review.objects.create(title=titles['Новинка'], author=users[0],
+                          text='Шедевр', score=10)
+    for user in users:
+        Review.objects.create(title=titles['Классика'], author=user,
+                              text='Хорошо', score=9)
+    Review.objects.create(title=titles['Сериал'], author=users[0],
+                          text='Плохо', score=2)
+    Review.objects.create(title=titles['Сериал'], author=users[1],
+                          text='Скучно', score=1)
+    # Отзывы о «Классике» старые: за пределами окна популярности.
+    Review.objects.filter(title=titles['Классика']).update(
+        pub_date=timezone.now() - timedelta(days=30)
+    )
+    refresh_rankings(prior_weight=5, trending_days=7)
+    return titles
+
+
+def names(response):
+    assert response.status_code == 200
+    return [item['name'] for item in response.json()]
+
+
+@pytest.mark.django_db
+class TestRefreshRankings:
+
+    def test_scores(self, ranked):
+        mean = (10 + 9 * 5 + 2 + 1) / 8
+        classic = TitleRanking.objects.get(title=ranked['Классика'],
+                                           scope=TitleRanking.ALL)
+        assert classic.score == pytest.approx(
+            bayesian_score(45, 5, mean, 5)
+        )
+        assert classic.trending == 0, (
+            'Проверьте, что отзывы старше окна не влияют на популярность'
+        )
+        novelty = TitleRanking.objects.get(title=ranked['Новинка'],
+                                           scope=TitleRanking.ALL)
+        assert novelty.trending == pytest.approx(1, abs=0.01)
+        series = TitleRanking.objects.get(title=ranked['Сериал'],
+                                          scope=TitleRanking.ALL)
+        assert series.trending == pytest.approx(2, abs=0.01)
+
+    def test_scopes(self, ranked, category, genres):
+        scopes = set(TitleRanking.objects.filter(
+            title=ranked['Классика']
+        ).values_list('scope', flat=True))
+        assert scopes == {
+            TitleRanking.ALL, TitleRanking.category_scope(category.pk),
+            *(TitleRanking.genre_scope(genre.pk) for genre in genres),
+        }
+
+    def test_refresh_replaces_rows(self, ranked):
+        rows = TitleRanking.objects.count()
+        assert refresh_rankings() == rows
+        assert TitleRanking.objects.count() == rows
+        Title.objects.filter(pk=ranked['Сериал'].pk).delete()
+        refresh_rankings()
+        assert not TitleRanking.objects.filter(
+            title=ranked['Сериал']
+        ).exists()
+
+
+@pytest.mark.django_db
+class TestRankingEndpoints:
+
+    def test_top(self, client, ranked):
+        assert names(client.get(TOP)) == ['Классика', 'Новинка', 'Сериал'], (
+            'Проверьте, что /titles/top/ учитывает число отзывов, '
+            'а не только среднюю оценку'
+        )
+        item = client.get(TOP).json()[0]
+        assert set(item) == {'id', 'name', 'year', 'rating', 'description',
+                             'genre', 'category', 'score'}
+        assert item['category'] == {'name': 'Фильм', 'slug': 'movie'}
+        assert len(item['genre']) == 2
+
+    def test_trending(self, client, ranked):
+        assert names(client.get(TRENDING)) == [
+            'Сериал', 'Новинка', 'Классика'
+        ], (
+            'Проверьте, что популярность считается по числу свежих отзывов, '
+            'а не по их оценкам'
+        )
+
+    def test_filters(self, client, ranked):
+        assert names(client.get(f'{TOP}?category=series')) == ['Сериал']
+        assert names(client.get(f'{TOP}?genre=comedy')) == [
+            'Классика', 'Сериал'
+        ]
+        assert names(client.get(f'{TOP}?genre=comedy&category=movie')) == [
+            'Классика'
+        ]
+        assert names(client.get(f'{TOP}?genre=nope')) == []
+        assert names(client.get(f'{TOP}?limit=1')) == ['Классика']
+
+    def test_indexed_read(self, client, ranked):
+        client.get(f'{TOP}?genre=drama')
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'{TOP}?genre=comedy')
+        assert response.status_code == 200
+        # Страница рейтинга и жанры её произведений.
+        assert len(context.captured_queries) == 2
+        assert not any('"reviews_review"' in query['sql']
+                       for query in context.captured_queries), (
+            'Проверьте, что рейтинг читается из TitleRanking без отзывов'
+        )
+
+    def test_refresh_command_invalidates_cache(self, client, ranked):
+        assert names(client.get(TOP))[0] == 'Классика'
+        Review.objects.filter(title=ranked['Классика']).delete()
+        assert names(client.get(TOP))[0] == 'Классика'
+        call_command('refresh_rankings')
+        assert names(client.get(TOP))[0] == 'Новинка', (
+            'Проверьте, что после refresh_rankings ответ не берётся из кэша'
+        )
+
+    def test_loop_requires_shared_cache(self, ranked, settings, capsys):
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        with pytest.raises(CommandError, match='CACHE_BACKEND'):
+            call_command('refresh_rankings', '--loop')
+        call_command('refresh_rankings')
+        assert 'CACHE_BACKEND' in capsys.readouterr().err, (
+            'Проверьте, что refresh_rankings предупреждает о кэше '
+            'в памяти процесса'
+        )
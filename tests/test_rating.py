@@ -0,0 +1,82 @@
+import pytest
+from django.core.management import CommandError, call_command
+
+from reviews.models import Review, Title
+
+
+def stored_rating(title):
+    title = Title.objects.get(pk=title.pk)
+    return title.rating, title.review_count, title.score_sum
+
+
+@pytest.mark.django_db
+class TestStoredRating:
+
+    def test_rating_follows_review_changes(self, title, user, another_user):
+        assert stored_rating(title) == (None, 0, 0), (
+            'Проверьте, что у произведения без отзывов нет рейтинга'
+        )
+        review = Review.objects.create(
+            title=title, author=user, text='Отлично', score=10
+        )
+        Review.objects.create(
+            title=title, author=another_user, text='Неплохо', score=5
+        )
+        assert stored_rating(title) == (7.5, 2, 15), (
+            'Проверьте, что рейтинг пересчитывается при создании отзыва'
+        )
+
+        review = Review.objects.get(pk=review.pk)
+        review.score = 1
+        review.save()
+        assert stored_rating(title) == (3.0, 2, 6), (
+            'Проверьте, что рейтинг пересчитывается при изменении оценки'
+        )
+
+        review.delete()
+        assert stored_rating(title) == (5.0, 1, 5), (
+            'Проверьте, что рейтинг пересчитывается при удалении отзыва'
+        )
+
+    def test_rating_after_bulk_and_cascade_delete(self, title, user,
+                                                  another_user):
+        Review.objects.create(title=title, author=user, text='1', score=2)
+        Review.objects.create(
+            title=title, author=another_user, text='2', score=8
+        )
+        another_user.delete()
+        assert stored_rating(title) == (2.0, 1, 2), (
+            'Проверьте, что рейтинг учитывает каскадное удаление автора'
+        )
+        Review.objects.filter(title=title).delete()
+        assert stored_rating(title) == (None, 0, 0), (
+            'Проверьте, что рейтинг учитывает удаление через QuerySet'
+        )
+
+    def test_title_save_keeps_rating(self, title, review):
+        stale_title = Title.objects.get(pk=title.pk)
+        Review.objects.filter(pk=review.pk).delete()
+        stale_title.name = 'Новое название'
+        stale_title.save()
+        assert stored_rating(title) == (None, 0, 0), (
+            'Проверьте, что сохранение произведения не затирает рейтинг'
+        )
+
+    def test_rebuild_ratings_command(self, title, review):
+        Title.objects.filter(pk=title.pk).update(
+            rating=1, review_count=5, score_sum=5
+        )
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--check')
+        call_command('rebuild_ratings')
+        assert stored_rating(title) == (10.0, 1, 10), (
+            'Проверьте, что команда rebuild_ratings пересчитывает рейтинг'
+        )
+        call_command('rebuild_ratings', '--check')
+
+    def test_title_api_returns_stored_rating(self, client, title, review):
+        response = client.get(f'/api/v1/titles/{title.pk}/')
+        assert response.status_code == 200
+        assert response.json()['rating'] == 10.0, (
+            'Проверьте, что в ответе возвращается сохранённый рейтинг'
+        )
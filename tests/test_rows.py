@@ -0,0 +1,89 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import FastJSONRenderer
+from reviews.models import Comment, Review, Title
+
+
+@pytest.fixture
+def catalog(title, review, another_user, genres):
+    Title.objects.create(name='Без категории', year=2001, category=None)
+    rated = Title.objects.create(name='Ещё одно', year=1994,
+                                 description='Строка\u2028разделитель')
+    rated.genre.set(genres[:1])
+    Review.objects.create(title=title, author=another_user, score=3,
+                          text='Кавычки " и \\ слэш')
+    Review.objects.filter(pk=review.pk).update(
+        pub_date=timezone.now().replace(microsecond=123456)
+    )
+    for i in range(3):
+        Comment.objects.create(review=review, author=another_user,
+                               text=f'Комментарий {i} 🎬')
+    return title, review
+
+
+def both_modes(client, settings, url):
+    contents = []
+    for enabled in (True, False):
+        settings.API_ROW_LISTS = enabled
+        cache.clear()
+        response = client.get(url)
+        assert response.status_code == 200
+        contents.append(response.content)
+    return contents
+
+
+@pytest.mark.django_db
+class TestRowLists:
+
+    @pytest.mark.parametrize('query', (
+        '', '?page_size=2', '?page=2&page_size=2', '?genre=drama',
+        '?year=1994', '?search=Побег',
+    ))
+    def test_titles_byte_identical(self, client, settings, catalog, query):
+        fast, slow = both_modes(client, settings, f'/api/v1/titles/{query}')
+        assert fast == slow, (
+            'Проверьте, что быстрый список произведений совпадает '
+            'с ответом TitleSerializer байт в байт'
+        )
+
+    @pytest.mark.parametrize('query', (
+        '', '?limit=1', '?pagination=cursor', '?pagination=cursor&count=1',
+    ))
+    def test_reviews_and_comments_byte_identical(self, client, settings,
+                                                 catalog, query):
+        title, review = catalog
+        reviews = f'/api/v1/titles/{title.pk}/reviews/'
+        for url in (reviews, f'{reviews}{review.pk}/comments/'):
+            fast, slow = both_modes(client, settings, url + query)
+            assert fast == slow, (
+                f'Проверьте, что быстрый список {url} совпадает '
+                'с ответом сериализатора байт в байт'
+            )
+
+
+class TestFastJSONRenderer:
+
+    @pytest.mark.parametrize('data', (
+        {'text': 'Юникод 🎬 \u2028 \u2029 "кавычки"', 'rating': 7.25,
+         'items': [1, None, True, {'nested': []}]},
+        {'when': datetime.datetime(2022, 1, 2, 3, 4, 5, 678901)},
+        {'price': Decimal('1.50')},
+        {'detail': gettext_lazy('Not found.')},
+        [],
+    ))
+    def test_same_as_json_renderer(self, data):
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_indent(self):
+        data = {'a': [1, 2]}
+        media_type = 'application/json; indent=4'
+        assert FastJSONRenderer().render(data, media_type) == (
+            JSONRenderer().render(data, media_type)
+        )
@@ -0,0 +1,64 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, ScoreHistogram
+
+
+def ratings(client, title):
+    return client.get(f'/api/v1/titles/{title.pk}/ratings/')
+
+
+@pytest.mark.django_db
+class TestScoreHistogram:
+
+    def test_empty_title(self, client, title):
+        response = ratings(client, title)
+        assert response.status_code == 200
+        data = response.json()
+        assert data['count'] == 0
+        assert data['mean'] is None and data['median'] is None
+        assert set(data['histogram']) == {str(score) for score in
+                                          range(1, 11)}
+        assert ratings(client, type(title)(pk=10 ** 6)).status_code == 404
+
+    def test_histogram_follows_reviews(self, client, title, review, user,
+                                       another_user, admin):
+        Review.objects.create(title=title, author=another_user, text='2',
+                              score=4)
+        third = Review.objects.create(title=title, author=admin, text='3',
+                                      score=4)
+        with CaptureQueriesContext(connection) as context:
+            data = ratings(client, title).json()
+        assert len(context.captured_queries) == 1, (
+            'Проверьте, что распределение читается одним запросом '
+            'без обращения к отзывам'
+        )
+        assert data['count'] == 3
+        assert data['histogram']['4'] == 2 and data['histogram']['10'] == 1
+        assert data['mean'] == 6
+        assert data['median'] == 4
+
+        third = Review.objects.get(pk=third.pk)
+        third.score = 8
+        third.save()
+        data = ratings(client, title).json()
+        assert data['histogram']['4'] == 1 and data['histogram']['8'] == 1
+        assert data['median'] == 8
+
+        another_user.delete()
+        data = ratings(client, title).json()
+        assert data['count'] == 2 and data['median'] == 9
+
+    def test_title_delete(self, title, review):
+        title.delete()
+        assert not ScoreHistogram.objects.exists()
+
+    def test_rebuild(self, client, title, review):
+        ScoreHistogram.objects.all().delete()
+        call_command('rebuild_ratings')
+        data = ratings(client, title).json()
+        assert data['count'] == 1 and data['histogram']['10'] == 1, (
+            'Проверьте, что rebuild_ratings восстанавливает распределения'
+        )
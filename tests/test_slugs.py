@@ -0,0 +1,121 @@
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.slugs import genre_slugs
+from reviews.models import Genre, Title
+
+TITLES = '/api/v1/titles/'
+
+
+def slug_lookups(context):
+    '''Запросы, которые ищут жанр или категорию по слагу.'''
+    return [query['sql'] for query in context.captured_queries
+            if '"slug" = ' in query['sql'] or '"slug" IN ' in query['sql']]
+
+
+@pytest.mark.django_db
+class TestSlugMap:
+
+    def test_reload_on_version_change(self, genres):
+        assert genre_slugs.get('drama') == genres[0].pk
+        with CaptureQueriesContext(connection) as context:
+            assert genre_slugs.get('comedy') == genres[1].pk
+            assert genre_slugs.get('nope') is None
+        assert not context.captured_queries, (
+            'Проверьте, что карта слагов не читает базу без смены версии'
+        )
+        genre = Genre.objects.create(name='Ужасы', slug='horror')
+        assert genre_slugs.get('horror') == genre.pk, (
+            'Проверьте, что новый жанр попадает в карту слагов'
+        )
+        genre.delete()
+        assert genre_slugs.get('horror') is None
+
+    def test_create_title_without_slug_queries(self, admin_client, category,
+                                               genres):
+        data = {'name': 'Мастер и Маргарита', 'year': 1994,
+                'genre': ['drama', 'comedy'], 'category': 'movie'}
+        admin_client.post(TITLES, {**data, 'name': 'Прогрев'})
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(TITLES, data)
+        assert response.status_code == 201
+        assert set(response.json()['genre']) == {'drama', 'comedy'}
+        assert response.json()['category'] == 'movie'
+        assert not slug_lookups(context), (
+            'Проверьте, что слаги жанров и категории при создании '
+            'произведения берутся из карты слагов'
+        )
+        title = Title.objects.get(pk=response.json()['id'])
+        assert title.category == category
+        assert set(title.genre.all()) == set(genres)
+
+    def test_unknown_slug(self, admin_client, category, genres):
+        response = admin_client.post(TITLES, {
+            'name': 'Неизвестно', 'year': 2000,
+            'genre': ['drama', 'nope'], 'category': 'movie',
+        })
+        assert response.status_code == 400
+        assert 'nope' in response.json()['genre'][0]
+        response = admin_client.post(TITLES, {
+            'name': 'Неизвестно', 'year': 2000,
+            'genre': ['drama'], 'category': {'slug': 'movie'},
+        }, format='json')
+        assert response.status_code == 400
+        assert 'category' in response.json()
+
+    def test_filters_by_id(self, client, title, category):
+        for query in ('genre=drama', 'category=movie'):
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(f'{TITLES}?{query}')
+            assert [item['id'] for item in response.json()['results']] == [
+                title.pk
+            ]
+            assert not slug_lookups(context), (
+                f'Проверьте, что фильтр {query} идёт по id без join '
+                'со справочником'
+            )
+        for query in ('genre=nope', 'category=nope'):
+            response = client.get(f'{TITLES}?{query}')
+            assert response.json()['count'] == 0
+
+
+def delete_behind_map(genre):
+    '''Удаляет жанр, как другой процесс: без сигналов и смены версии.'''
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM reviews_genre WHERE id = %s', [genre.pk])
+
+
+@pytest.mark.django_db
+def test_reload_after_timeout(genres, settings, monkeypatch):
+    settings.SLUG_MAP_TIMEOUT = 5
+    assert genre_slugs.get('drama') == genres[0].pk
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO reviews_genre (name, slug) VALUES ('Ужасы', 'horror')"
+        )
+    assert genre_slugs.get('horror') is None
+    now = time.monotonic()
+    monkeypatch.setattr(time, 'monotonic', lambda: now + 6)
+    assert genre_slugs.get('horror') == Genre.objects.get(slug='horror').pk, (
+        'Проверьте, что карта слагов перечитывается после SLUG_MAP_TIMEOUT '
+        'даже без смены версии'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_deleted_genre_is_validation_error(admin_client, category, genres):
+    assert genre_slugs.get('comedy') == genres[1].pk
+    delete_behind_map(genres[1])
+    response = admin_client.post(TITLES, {
+        'name': 'Удалённый жанр', 'year': 2000,
+        'genre': ['drama', 'comedy'], 'category': 'movie',
+    })
+    assert response.status_code == 400, (
+        'Проверьте, что удалённый в другом процессе жанр даёт 400, а не 500'
+    )
+    assert 'comedy' in response.json()['genre'][0]
+    assert not Title.objects.exists()
+    assert genre_slugs.get('comedy') is None
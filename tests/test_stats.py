@@ -0,0 +1,59 @@
+import logging
+
+import pytest
+
+from api.middleware import endpoint_stats
+
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    endpoint_stats.reset()
+
+
+@pytest.mark.django_db
+class TestStats:
+
+    def test_stats_by_endpoint(self, client, admin_client, title, review):
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        client.get(f'/api/v1/titles/{title.pk}/reviews/')
+        response = admin_client.get('/api/v1/stats/')
+        assert response.status_code == 200
+        endpoints = response.json()['endpoints']
+        titles = endpoints.get('title-list')
+        assert titles and titles['count'] == 2, (
+            'Проверьте, что статистика копится по имени эндпоинта'
+        )
+        assert titles['queries_sum'] > 0
+        assert titles['size_sum'] > 0
+        assert titles['time_sum'] >= titles['db_time_sum']
+        assert endpoints['reviews-list']['count'] == 1
+
+    def test_stats_for_admin_only(self, client, user_client):
+        assert client.get('/api/v1/stats/').status_code == 401
+        assert user_client.get('/api/v1/stats/').status_code == 403
+
+    def test_prometheus_format(self, client, admin_client):
+        client.get('/api/v1/titles/')
+        response = admin_client.get('/api/v1/stats/?format=prometheus')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+        assert 'yamdb_requests_total{endpoint="title-list"} 1' in text, (
+            'Проверьте формат Prometheus для /api/v1/stats/'
+        )
+        assert 'yamdb_cache_misses_total{resource="title"}' in text
+
+    def test_slow_request_logged(self, client, settings, caplog):
+        settings.SLOW_REQUEST_MS = 0
+        with caplog.at_level(logging.WARNING, logger='api.stats'):
+            client.get('/api/v1/titles/')
+        assert any('title-list' in record.getMessage()
+                   for record in caplog.records), (
+            'Проверьте, что медленные запросы пишутся в лог api.stats'
+        )
+
+    def test_disabled(self, client, settings):
+        settings.API_STATS_ENABLED = False
+        client.get('/api/v1/titles/')
+        assert not endpoint_stats.snapshot()
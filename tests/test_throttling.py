@@ -0,0 +1,112 @@
+import pytest
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.throttling import IPThrottle, SlidingWindowThrottle
+
+SIGNUP = '/api/v1/auth/signup/'
+TOKEN = '/api/v1/auth/token/'
+
+
+@pytest.fixture
+def rates(settings):
+    def set_rates(**rates):
+        settings.REST_FRAMEWORK = dict(settings.REST_FRAMEWORK,
+                                       DEFAULT_THROTTLE_RATES=rates)
+    return set_rates
+
+
+def signup(client, username, email, ip='10.0.0.1'):
+    return client.post(SIGNUP, {'username': username, 'email': email},
+                       REMOTE_ADDR=ip)
+
+
+@pytest.mark.django_db
+class TestThrottling:
+
+    def test_signup_email(self, client, rates, django_assert_num_queries):
+        rates(signup_email='2/h')
+        assert signup(client, 'first', 'bot@yamdb.fake').status_code == 200
+        assert signup(client, 'second', 'BOT@yamdb.fake').status_code != 429
+        with django_assert_num_queries(0):
+            response = signup(client, 'third', ' bot@yamdb.fake')
+        assert response.status_code == 429, (
+            'Проверьте, что регистрация ограничена по почте без учёта '
+            'регистра и до запросов к базе'
+        )
+        assert int(response['Retry-After']) > 0
+        assert signup(client, 'fourth', 'other@yamdb.fake').status_code == 200
+
+    def test_signup_ip(self, client, rates):
+        rates(signup_ip='2/m')
+        for i in range(2):
+            response = signup(client, f'user{i}', f'user{i}@yamdb.fake')
+            assert response.status_code == 200
+        assert signup(client, 'user2', 'user2@yamdb.fake').status_code == 429
+        response = signup(client, 'user3', 'user3@yamdb.fake', ip='10.0.0.2')
+        assert response.status_code == 200, (
+            'Проверьте, что лимит по адресу считается для каждого клиента'
+        )
+
+    def test_signup_ip_behind_proxy(self, client, rates):
+        rates(signup_ip='1/m')
+        for i, forwarded in enumerate(('1.1.1.1', '2.2.2.2')):
+            response = client.post(
+                SIGNUP, {'username': f'u{i}', 'email': f'u{i}@yamdb.fake'},
+                HTTP_X_FORWARDED_FOR=f'spoofed, {forwarded}',
+            )
+            assert response.status_code == 200
+
+    def test_token_username(self, client, rates, user,
+                            django_assert_num_queries):
+        rates(token_username='2/m')
+        data = {'username': user.username, 'confirmation_code': 'wrong'}
+        for _ in range(2):
+            assert client.post(TOKEN, data).status_code == 400
+        with django_assert_num_queries(0):
+            response = client.post(TOKEN, data)
+        assert response.status_code == 429
+        data['username'] = 'someone'
+        assert client.post(TOKEN, data).status_code == 404
+
+    def test_no_rate_no_limit(self, client, rates):
+        rates()
+        for i in range(5):
+            response = signup(client, f'free{i}', f'free{i}@yamdb.fake')
+            assert response.status_code == 200
+
+
+class View:
+    throttle_scope = 'test'
+
+
+class TestSlidingWindow:
+
+    def allow(self, monkeypatch, now):
+        monkeypatch.setattr(SlidingWindowThrottle, 'timer', lambda self: now)
+        request = Request(APIRequestFactory().post('/', REMOTE_ADDR='1.2.3.4'))
+        return IPThrottle().allow_request(request, View())
+
+    def test_previous_window_is_weighted(self, monkeypatch, settings):
+        settings.REST_FRAMEWORK = dict(
+            settings.REST_FRAMEWORK,
+            DEFAULT_THROTTLE_RATES={'test_ip': '10/m'},
+        )
+        start = 6000 * 60
+        for i in range(10):
+            assert self.allow(monkeypatch, start + 50 + i / 10)
+        # Через 10 с после начала следующего окна прошлое весит 5/6:
+        # 10 × 5/6 + 1 < 10, но уже следующий запрос лимит превышает.
+        assert self.allow(monkeypatch, start + 70)
+        assert not self.allow(monkeypatch, start + 71)
+        # Ещё через окно прошлые запросы не учитываются.
+        assert self.allow(monkeypatch, start + 180)
+
+    def test_base_class_does_not_limit(self, settings):
+        settings.REST_FRAMEWORK = dict(
+            settings.REST_FRAMEWORK,
+            DEFAULT_THROTTLE_RATES={'test_None': '1/m'},
+        )
+        request = Request(APIRequestFactory().post('/'))
+        throttle = SlidingWindowThrottle()
+        assert all(throttle.allow_request(request, View()) for _ in range(3))
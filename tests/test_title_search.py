@@ -0,0 +1,34 @@
+import pytest
+
+from reviews.models import Title
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    def test_search_by_name_and_description(self, client, category):
+        Title.objects.create(name='Крестный отец', year=1972,
+                             category=category)
+        Title.objects.create(name='Однажды в Америке', year=1984,
+                             category=category,
+                             description='Гангстерская сага')
+        Title.objects.create(name='Побег из Шоушенка', year=1994,
+                             category=category)
+
+        response = client.get('/api/v1/titles/?search=отец')
+        assert response.status_code == 200
+        names = [item['name'] for item in response.json()['results']]
+        assert names == ['Крестный отец'], (
+            'Проверьте, что параметр search ищет по названию произведения'
+        )
+
+        response = client.get('/api/v1/titles/?search=сага')
+        names = [item['name'] for item in response.json()['results']]
+        assert names == ['Однажды в Америке'], (
+            'Проверьте, что параметр search ищет по описанию произведения'
+        )
+
+    def test_search_without_matches(self, client, title):
+        response = client.get('/api/v1/titles/?search=несуществующее')
+        assert response.status_code == 200
+        assert response.json()['results'] == []
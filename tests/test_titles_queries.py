@@ -0,0 +1,56 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+
+
+def create_titles(start, stop):
+    genres = [
+        Genre.objects.get_or_create(name=f'Жанр {i}', slug=f'genre-{i}')[0]
+        for i in range(3)
+    ]
+    for i in range(start, stop):
+        category = Category.objects.create(
+            name=f'Категория {i}', slug=f'category-{i}'
+        )
+        title = Title.objects.create(
+            name=f'Произведение {i}', year=2000, category=category
+        )
+        title.genre.set(genres)
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context.captured_queries), response.json()
+
+
+@pytest.mark.django_db
+class TestTitleQueries:
+
+    def test_title_list_query_count_does_not_grow(self, client):
+        create_titles(0, 2)
+        small_count, data = count_queries(client, '/api/v1/titles/')
+        assert len(data['results']) == 2
+
+        create_titles(2, 50)
+        large_count, data = count_queries(
+            client, '/api/v1/titles/?page_size=50'
+        )
+        assert len(data['results']) == 50
+        assert all(len(item['genre']) == 3 for item in data['results'])
+        assert all(item['category'] for item in data['results'])
+        assert large_count == small_count <= 3, (
+            'Проверьте, что список произведений загружает категории и жанры '
+            'постоянным числом запросов независимо от размера страницы'
+        )
+
+    def test_title_detail_query_count(self, client, title):
+        queries, data = count_queries(client, f'/api/v1/titles/{title.pk}/')
+        assert data['category']['slug'] == 'movie'
+        assert queries <= 2, (
+            'Проверьте, что произведение загружается не более чем '
+            'двумя запросами'
+        )
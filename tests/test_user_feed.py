@@ -0,0 +1,75 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, Title
+
+
+@pytest.fixture
+def feed(user, category, review):
+    '''Три отзыва и комментарий пользователя к разным произведениям.'''
+    for i in range(2):
+        title = Title.objects.create(name=f'Произведение {i}', year=2000,
+                                     category=category)
+        Review.objects.create(title=title, author=user, text=f'Отзыв {i}',
+                              score=5)
+    return Comment.objects.create(review=review, author=user,
+                                  text='Сам себе отвечаю')
+
+
+@pytest.mark.django_db
+class TestUserFeed:
+
+    def test_reviews(self, client, user, feed):
+        url = f'/api/v1/users/{user.username}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200, (
+            'Проверьте, что отзывы пользователя доступны без токена'
+        )
+        results = response.json()['results']
+        assert [item['text'] for item in results] == [
+            'Отзыв 1', 'Отзыв 0', 'Ставлю десять звёзд!'
+        ], 'Проверьте, что лента отзывов начинается с новых'
+        assert results[0]['title']['name'] == 'Произведение 1'
+        assert set(results[0]) == {'id', 'text', 'author', 'score',
+                                   'pub_date', 'title'}
+        # Пользователь по имени и страница вместе с произведениями.
+        assert len(context.captured_queries) == 2
+
+    def test_comments(self, client, user, title, review, feed):
+        response = client.get(f'/api/v1/users/{user.username}/comments/')
+        assert response.status_code == 200
+        assert response.json()['results'] == [{
+            'id': feed.pk, 'text': 'Сам себе отвечаю',
+            'author': user.username,
+            'pub_date': response.json()['results'][0]['pub_date'],
+            'review': review.pk,
+            'title': {'id': title.pk, 'name': title.name},
+        }]
+
+    def test_cursor_pagination(self, client, user, feed):
+        url = f'/api/v1/users/{user.username}/reviews/?limit=2&count=true'
+        first = client.get(url).json()
+        assert first['count'] == 3
+        assert len(first['results']) == 2 and first['previous'] is None
+        second = client.get(first['next']).json()
+        assert [item['text'] for item in second['results']] == [
+            'Ставлю десять звёзд!'
+        ]
+        assert second['next'] is None
+
+    def test_me(self, client, user_client, another_user_client, user, feed):
+        for path in ('reviews', 'comments'):
+            url = f'/api/v1/users/me/{path}/'
+            assert client.get(url).status_code == 401
+            mine = user_client.get(url)
+            assert mine.status_code == 200
+            assert {item['author'] for item in mine.json()['results']} == {
+                user.username
+            }
+            assert another_user_client.get(url).json()['results'] == []
+
+    def test_unknown_user(self, client):
+        response = client.get('/api/v1/users/nobody/reviews/')
+        assert response.status_code == 404
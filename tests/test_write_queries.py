@@ -0,0 +1,68 @@
+import pytest
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title
+
+
+def count_queries(context):
+    '''Запросы без SAVEPOINT: их число зависит от транзакции теста.'''
+    return len([query for query in context.captured_queries
+                if 'SAVEPOINT' not in query['sql'].upper()])
+
+
+@pytest.mark.django_db
+class TestWriteQueries:
+
+    def test_review_create(self, another_user_client, title, review):
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = another_user_client.post(
+                url, {'text': 'Отлично', 'score': 8}
+            )
+        assert response.status_code == 201
+        # Пользователь, произведение, INSERT отзыва, UPDATE рейтинга
+        # и распределения оценок.
+        assert count_queries(context) == 5, (
+            'Проверьте, что при создании отзыва произведение загружается '
+            'один раз, а дубликат не проверяется отдельным запросом'
+        )
+
+    def test_duplicate_review(self, user_client, title, review):
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        response = user_client.post(url, {'text': 'Ещё раз', 'score': 1})
+        assert response.status_code == 400
+        assert response.json() == {'non_field_errors': [
+            'Оставлять отзыв на одно произведение дважды запрещено!'
+        ]}
+        assert Review.objects.filter(title=title).count() == 1
+        title.refresh_from_db()
+        assert title.review_count == 1 and title.rating == 10
+
+    def test_other_integrity_error_not_duplicate(self, another_user,
+                                                 title):
+        from api.serializers import ReviewSerializer
+
+        with pytest.raises(IntegrityError):
+            ReviewSerializer().create({'author': another_user,
+                                       'title': title, 'text': None,
+                                       'score': 5})
+
+    def test_comment_create(self, another_user_client, title, review):
+        url = f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+        with CaptureQueriesContext(connection) as context:
+            response = another_user_client.post(url, {'text': 'Согласен'})
+        assert response.status_code == 201
+        # Пользователь, отзыв, INSERT комментария.
+        assert count_queries(context) == 3
+
+    def test_comment_review_of_other_title(self, user_client, title, review,
+                                           category):
+        other = Title.objects.create(name='Другое', year=2000,
+                                     category=category)
+        url = f'/api/v1/titles/{other.pk}/reviews/{review.pk}/comments/'
+        response = user_client.post(url, {'text': 'Не туда'})
+        assert response.status_code == 404, (
+            'Проверьте, что комментарий нельзя оставить к отзыву '
+            'другого произведения'
+        )